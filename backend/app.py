@@ -3,20 +3,42 @@ import sys
 import logging
 import socket
 import threading
+import time
 import webbrowser
 import random
-import csv
 import json
+import hashlib
+import base64
+import binascii
+import csv
+import io
 from datetime import datetime, timezone, timedelta
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_file, g, has_request_context, abort, make_response, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import check_password_hash, generate_password_hash
 from collections import Counter
-from functools import wraps
+from functools import wraps, lru_cache
 import jwt
+import click
 from dotenv import load_dotenv
+from sqlalchemy import func, or_, and_, case, inspect, text
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.mutable import MutableDict, MutableList
+from csv_log_writer import CsvLogWriter
+from identity_cache import Identity, IdentityCache
+from word_queue import WordQueue
+from word_scoring import ScoringEngine, SelectionState, UserRowCache, WordFeatures
+from password_hasher import PasswordHasher, HasherBusy
+from request_metrics import RequestMetrics, format_metric
+from request_profiler import RequestProfiler
+from serving import file_lock, available_server, run_gunicorn, run_waitress
+from static_assets import StaticManifest, choose_encoding, IMMUTABLE_MAX_AGE
+from storage import configure_storage, init_storage
+from word_index import WordIndex, WordEntry, build_word_lookup, hint_base_counts, separate_article_from_noun
+from word_list_compiler import WordListError, compile_word_list, compiled_path, load_compiled, load_json_index
 
 load_dotenv()
 
@@ -36,9 +58,9 @@ def _get_data_dir() -> str:
 app = Flask(__name__, static_folder='../frontend/build')
 # Secrets and DB
 app.config['SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'a-fallback-secret-key-for-dev')
-# Use absolute SQLite path to avoid CWD surprises
+# Use absolute SQLite path to avoid CWD surprises; DATABASE_URL can point at another backend
 DATA_DIR = _get_data_dir()
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(DATA_DIR, 'database.db')
+configure_storage(app, DATA_DIR)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Fail fast in non-development if no proper secret key is configured
@@ -46,6 +68,26 @@ if os.environ.get('FLASK_ENV', 'development') != 'development' and app.config['S
     raise RuntimeError("JWT_SECRET_KEY environment variable must be set in non-development environments.")
 
 db = SQLAlchemy(app)
+# WAL, busy timeout and the optional serialized write path (see storage.py)
+init_storage(app, db)
+# Per-route latency, status code and SQL statement counters for /api/v2/metrics
+# (request_metrics.py); REQUEST_METRICS=false removes the hooks entirely
+request_metrics = None
+if os.environ.get('REQUEST_METRICS', 'true').lower() == 'true':
+    request_metrics = RequestMetrics()
+    with app.app_context():
+        request_metrics.install(app, db.engine)
+# Opt-in profiling of slow or randomly sampled requests into DATA_DIR/profiles (request_profiler.py)
+request_profiler = RequestProfiler(
+    os.environ.get('PROFILE_DIR') or os.path.join(DATA_DIR, 'profiles'),
+    slow_ms=float(os.environ.get('PROFILE_SLOW_MS', '0')),
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', '0')),
+    interval_ms=float(os.environ.get('PROFILE_INTERVAL_MS', '5')),
+    routes=[route.strip() for route in os.environ.get('PROFILE_ROUTES', '').split(',') if route.strip()],
+    max_bytes=int(float(os.environ.get('PROFILE_MAX_MB', '50')) * 1024 * 1024)
+)
+if request_profiler.enabled:
+    request_profiler.install(app)
 
 # --- Database Models ---
 class User(db.Model):
@@ -56,6 +98,11 @@ class User(db.Model):
     level = db.Column(db.String(10))
     # Beziehung zu UserProfile
     profile = db.relationship('UserProfile', backref='user', uselist=False, cascade="all, delete-orphan")
+    letter_stats = db.relationship('LetterStat', cascade="all, delete-orphan")
+    review_schedule = db.relationship('ReviewSchedule', cascade="all, delete-orphan")
+    seen_word_rows = db.relationship('SeenWord', cascade="all, delete-orphan")
+    # Deleted students take their games along; SQLite may hand their id to a new account
+    game_logs = db.relationship('GameLog', cascade="all, delete-orphan")
 
 class UserProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -71,9 +118,22 @@ class UserProfile(db.Model):
     wins_since_last_hint = db.Column(db.Integer, nullable=False, default=0)
     age = db.Column(db.Integer)
     mother_tongue = db.Column(db.String(120))
+    # Materialized statistics, kept in step with GameLog/SeenWord/ReviewSchedule by apply_game_results
+    games_won = db.Column(db.Integer, nullable=False, default=0)
+    games_lost = db.Column(db.Integer, nullable=False, default=0)
+    seen_count = db.Column(db.Integer, nullable=False, default=0)
+    failed_count = db.Column(db.Integer, nullable=False, default=0)
+    # Incremented whenever a value reported by /api/user/statistics changes (used as ETag)
+    stats_version = db.Column(db.Integer, nullable=False, default=0)
 
 # New: Persisted game logs for statistics and analysis
 class GameLog(db.Model):
+    __table_args__ = (
+        # Per-user result counts and last-played lookups stay index-only
+        db.Index('ix_game_log_user_result_time', 'user_id', 'was_successful', 'timestamp'),
+        # A game event id is applied once per user, however often the client retries it
+        db.Index('ix_game_log_user_event', 'user_id', 'event_id', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     word = db.Column(db.String(200), nullable=False)
@@ -81,7 +141,77 @@ class GameLog(db.Model):
     wrong_guesses = db.Column(db.Integer, nullable=False, default=0)
     # Store wrong letters per game for letter-level analytics
     wrong_letters = db.Column(MutableList.as_mutable(db.JSON), default=list)
-    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    # Callable default, so every row gets its own insertion time
+    timestamp = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    # Client-generated id of the game event (None for clients that send none)
+    event_id = db.Column(db.String(64))
+
+# Running per-user error counters per letter, maintained incrementally by log_game
+class LetterStat(db.Model):
+    __table_args__ = (db.UniqueConstraint('user_id', 'letter'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    letter = db.Column(db.String(1), nullable=False)
+    # Raw number of wrong guesses of this letter
+    count = db.Column(db.Integer, nullable=False, default=0)
+    # Recency-weighted count used for ranking (equals count when decay is disabled)
+    weight = db.Column(db.Float, nullable=False, default=0.0)
+
+# Class-wide letter errors per level and mother tongue, maintained incrementally by log_game
+class ClassLetterStat(db.Model):
+    __table_args__ = (
+        # Both indexes serve /api/v2/letter_confusion, filtered by level and/or mother tongue
+        db.UniqueConstraint('level', 'mother_tongue', 'letter', name='uq_class_letter_stat_group_letter'),
+        db.Index('ix_class_letter_stat_mother_tongue', 'mother_tongue', 'level'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    level = db.Column(db.String(10), nullable=False, default='')
+    mother_tongue = db.Column(db.String(120), nullable=False, default='')
+    letter = db.Column(db.String(1), nullable=False)
+    # Wrong guesses of this letter
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    # Games in which this letter was guessed wrongly at least once
+    game_count = db.Column(db.Integer, nullable=False, default=0)
+
+# Games and wrong guesses per level and mother tongue, next to the group's ClassLetterStat rows
+class ClassGameStat(db.Model):
+    __table_args__ = (db.UniqueConstraint('level', 'mother_tongue', name='uq_class_game_stat_group'),)
+    id = db.Column(db.Integer, primary_key=True)
+    level = db.Column(db.String(10), nullable=False, default='')
+    mother_tongue = db.Column(db.String(120), nullable=False, default='')
+    game_count = db.Column(db.Integer, nullable=False, default=0)
+    # Wrong guesses of all letters
+    wrong_guesses = db.Column(db.Integer, nullable=False, default=0)
+
+# Spaced-repetition state per failed word (replaces UserProfile.failed_words)
+class ReviewSchedule(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'word'),
+        # Due reviews are looked up as a range scan on this index
+        db.Index('ix_review_schedule_user_due', 'user_id', 'next_review'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    word = db.Column(db.String(200), nullable=False)
+    # Number of failures so far; the review interval is 2**count days
+    count = db.Column(db.Integer, nullable=False, default=0)
+    # Naive UTC timestamp
+    next_review = db.Column(db.DateTime, nullable=False)
+
+# Words a user has already played (replaces UserProfile.seen_words); one row per word
+class SeenWord(db.Model):
+    __table_args__ = (db.UniqueConstraint('user_id', 'word'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    word = db.Column(db.String(200), nullable=False)
+
+
+# Applied schema migrations, one row per step of SCHEMA_MIGRATIONS
+class SchemaVersion(db.Model):
+    __tablename__ = 'schema_version'
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(120), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
 
 
 # CORS: be permissive in development, restrict otherwise
@@ -91,21 +221,412 @@ if os.environ.get('FLASK_ENV', 'development') == 'development':
 else:
     CORS(app, resources={r"/api/*": {"origins": frontend_origin}, r"/api/v2/*": {"origins": frontend_origin}})
 
-WORDLISTS_DIR = os.path.join(os.path.dirname(__file__), 'word_lists')
+# Overridable for benchmarks and tests that bring their own word lists
+WORDLISTS_DIR = os.environ.get('WORDLISTS_DIR') or os.path.join(os.path.dirname(__file__), 'word_lists')
+LEVELS = ['a1', 'a2', 'b1', 'b2', 'c1']
+# guess_log.csv / game_log.csv are appended by a background writer thread
+csv_log = CsvLogWriter(
+    os.environ.get('CSV_LOG_DIR') or os.path.dirname(__file__),
+    max_queue=int(os.environ.get('CSV_LOG_QUEUE_SIZE', '10000')),
+    flush_interval=float(os.environ.get('CSV_LOG_FLUSH_SECONDS', '1.0')),
+    flush_size=int(os.environ.get('CSV_LOG_FLUSH_ROWS', '200')),
+    max_bytes=int(os.environ.get('CSV_LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+    rotate_daily=os.environ.get('CSV_LOG_ROTATE_DAILY', 'false').lower() == 'true'
+)
+# Upper bound for events accepted by one /api/v2/events request
+MAX_EVENTS_PER_BATCH = int(os.environ.get('MAX_EVENTS_PER_BATCH', '500'))
+# How long browsers and proxies may reuse a /api/hint answer before revalidating
+HINT_CACHE_SECONDS = int(os.environ.get('HINT_CACHE_SECONDS', '3600'))
+# Authenticated identities are reused for this many seconds (0 disables the cache)
+identity_cache = IdentityCache(
+    ttl=float(os.environ.get('IDENTITY_CACHE_TTL', '30')),
+    max_size=int(os.environ.get('IDENTITY_CACHE_SIZE', '1024'))
+)
+# Words drawn ahead per user for /api/word and /api/v2/next_round (0 disables prefetching)
+word_queue = WordQueue(
+    size=int(os.environ.get('NEXT_ROUND_PREFETCH', '5')),
+    ttl=float(os.environ.get('NEXT_ROUND_QUEUE_TTL', '600')),
+    max_users=int(os.environ.get('NEXT_ROUND_QUEUE_USERS', '1024'))
+)
+# Word selection: the Python priority cascade, or 'vector' for the numpy scoring engine
+# (word_scoring.py) with WORD_SELECTION_PRESET 'cascade' (same rules) or 'adaptive'
+scoring_engine = None
+if os.environ.get('WORD_SELECTION_ENGINE', 'cascade').lower() == 'vector':
+    try:
+        scoring_engine = ScoringEngine(
+            preset=os.environ.get('WORD_SELECTION_PRESET', 'cascade').lower(),
+            temperature=float(os.environ.get('WORD_SELECTION_TEMPERATURE', '0.5'))
+        )
+    except (RuntimeError, ValueError) as exc:
+        logging.warning('%s Using the Python word selection instead.', exc)
+# Seen words and review rows kept per user for the scoring engine (0 reloads them every round)
+user_rows = UserRowCache(max_users=int(os.environ.get('WORD_SELECTION_CACHE_USERS', '1024')))
+# Seconds between refreshes of the per-word loss rates used as a scoring feature
+WORD_DIFFICULTY_TTL = float(os.environ.get('WORD_DIFFICULTY_TTL', '3600'))
+# Login/registration hashing runs in a small process pool; beyond max_pending callers get 429
+# (the packaged desktop build hashes inline, there is only ever one user logging in)
+password_hasher = PasswordHasher(
+    workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '0' if _is_frozen() else str(min(2, os.cpu_count() or 1)))),
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '16')),
+    timeout=float(os.environ.get('PASSWORD_HASH_TIMEOUT', '30'))
+)
+# Per-game decay applied to letter error weights (1.0 = plain counts, e.g. 0.95 favours recent games)
+LETTER_ERROR_DECAY = float(os.environ.get('LETTER_ERROR_DECAY', '1.0'))
 # Die folgenden Dateien werden nicht mehr verwendet
 # USER_PROFILES_FILE = os.path.join(os.path.dirname(__file__), 'user_profiles.json')
 
 # --- User Profile Management (jetzt über DB) ---
 def get_user_profile(user_id):
-    user = User.query.filter_by(id=user_id).first()
-    if user and user.profile:
-        return user.profile
-    # Erstelle ein Profil, falls es nicht existiert
-    profile = UserProfile(user_id=user_id)
-    db.session.add(profile)
-    db.session.commit()
+    """
+    The user's profile, loaded at most once per request: the profile id comes from the
+    cached identity when available and the result is remembered on flask.g.
+    """
+    memo = g.setdefault('user_profiles', {}) if has_request_context() else {}
+    profile = memo.get(user_id)
+    if profile is not None:
+        return profile
+
+    identity = identity_cache.get(user_id)
+    if identity is not None and identity.profile_id is not None:
+        profile = db.session.get(UserProfile, identity.profile_id)
+    if profile is None:
+        profile = UserProfile.query.filter_by(user_id=user_id).first()
+    if profile is None:
+        if db.session.get(User, user_id) is None:
+            # Deleted by another process while its identity was still cached
+            identity_cache.invalidate(user_id)
+            abort(make_response(jsonify({'message': 'User not found!'}), 401))
+        # Erstelle ein Profil, falls es nicht existiert
+        profile = UserProfile(user_id=user_id)
+        db.session.add(profile)
+        db.session.commit()
+        identity_cache.invalidate(user_id)
+    memo[user_id] = profile
     return profile
 
+def load_identity(user_id):
+    """Identity snapshot for a JWT user_id from the cache or one joined query; None if the user is gone."""
+    identity = identity_cache.get(user_id)
+    if identity is not None:
+        return identity
+    row = (db.session.query(User.id, User.username, User.role, User.level, UserProfile.id)
+           .outerjoin(User.profile)
+           .filter(User.id == user_id)
+           .first())
+    if row is None:
+        return None
+    identity = Identity(*row)
+    identity_cache.put(identity)
+    return identity
+
+def _count_wrong_letters(wrong_letters):
+    counts = Counter()
+    for ch in (wrong_letters or []):
+        if isinstance(ch, str) and len(ch) == 1:
+            counts[ch] += 1
+    return counts
+
+def _rank_problem_letters(stats):
+    # sorted() is stable, so ties keep first-seen order like Counter.most_common
+    return [stat.letter for stat in sorted(stats, key=lambda stat: -stat.weight)[:5]]
+
+def update_letter_stats(user_id, games_wrong_letters):
+    """
+    Fold the wrong letters of finished games (one list per game, oldest first) into the
+    user's LetterStat rows and return the new top-5 problem letters. Only the user's
+    per-letter rows are touched, once per call, so the cost does not grow with the number
+    of logged games. Does not commit.
+    """
+    stats = LetterStat.query.filter_by(user_id=user_id).order_by(LetterStat.id).all()
+    by_letter = {stat.letter: stat for stat in stats}
+    for wrong_letters in games_wrong_letters:
+        if LETTER_ERROR_DECAY != 1.0:
+            for stat in stats:
+                stat.weight *= LETTER_ERROR_DECAY
+        for letter, occurrences in _count_wrong_letters(wrong_letters).items():
+            stat = by_letter.get(letter)
+            if stat is None:
+                stat = LetterStat(user_id=user_id, letter=letter, count=0, weight=0.0)
+                db.session.add(stat)
+                stats.append(stat)
+                by_letter[letter] = stat
+            stat.count += occurrences
+            stat.weight += occurrences
+    return _rank_problem_letters(stats)
+
+def backfill_letter_stats():
+    """
+    Rebuild all LetterStat rows and profile.problem_letters by replaying the GameLog
+    history once. Meant for databases created before the incremental counters existed.
+    Returns the number of users with letter statistics.
+    """
+    LetterStat.query.delete()
+    per_user = {}
+    logs = (db.session.query(GameLog.user_id, GameLog.wrong_letters)
+            .join(User, User.id == GameLog.user_id)
+            .order_by(GameLog.user_id, GameLog.id)
+            .execution_options(yield_per=1000))
+    for user_id, wrong_letters in logs:
+        stats = per_user.setdefault(user_id, {})
+        if LETTER_ERROR_DECAY != 1.0:
+            for stat in stats.values():
+                stat.weight *= LETTER_ERROR_DECAY
+        for letter, occurrences in _count_wrong_letters(wrong_letters).items():
+            stat = stats.get(letter)
+            if stat is None:
+                stat = stats[letter] = LetterStat(user_id=user_id, letter=letter, count=0, weight=0.0)
+            stat.count += occurrences
+            stat.weight += occurrences
+
+    for user_id, stats in per_user.items():
+        db.session.add_all(stats.values())
+        profile = UserProfile.query.filter_by(user_id=user_id).first()
+        if profile:
+            profile.problem_letters = _rank_problem_letters(stats.values())
+            # Statistics ETags are derived from the version, so clients refetch
+            bump_stats_version(profile)
+    db.session.commit()
+    return sum(1 for stats in per_user.values() if stats)
+
+def _class_group(level, mother_tongue):
+    # Students without a level or mother tongue are grouped under ''
+    return (level or '').strip().lower()[:10], (mother_tongue or '').strip()[:120]
+
+def _add_class_counters(group, wrong_letters, game_totals, letter_totals):
+    """
+    Add one finished game of a (level, mother tongue) group to game_totals
+    (group -> [games, wrong guesses]) and letter_totals ((*group, letter) -> [errors, games]).
+    """
+    counts = _count_wrong_letters(wrong_letters)
+    game_total = game_totals.setdefault(group, [0, 0])
+    game_total[0] += 1
+    game_total[1] += sum(counts.values())
+    for letter, occurrences in counts.items():
+        letter_total = letter_totals.setdefault((*group, letter), [0, 0])
+        letter_total[0] += occurrences
+        letter_total[1] += 1
+
+def _upsert_counters(model, keys, counters, rows):
+    """
+    Add the counters of rows (dicts of keys and counters) to the model rows with the same
+    keys, inserting missing ones. One atomic statement where the dialect supports
+    upserts. Does not commit.
+    """
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={counter: getattr(model, counter) + stmt.excluded[counter] for counter in counters}
+        )
+        db.session.execute(stmt)
+        return
+    for row in rows:
+        stat = model.query.filter_by(**{key: row[key] for key in keys}).first()
+        if stat is None:
+            db.session.add(model(**row))
+        else:
+            for counter in counters:
+                setattr(stat, counter, getattr(stat, counter) + row[counter])
+
+def update_class_letter_stats(level, mother_tongue, games_wrong_letters):
+    """
+    Add finished games (one wrong-letter list per game) to the class-wide ClassGameStat and
+    ClassLetterStat counters of their (level, mother tongue) group. Every student of a
+    group writes the same rows, so these are atomic upserts rather than read-modify-write.
+    Does not commit.
+    """
+    group = _class_group(level, mother_tongue)
+    game_totals, letter_totals = {}, {}
+    for wrong_letters in games_wrong_letters:
+        _add_class_counters(group, wrong_letters, game_totals, letter_totals)
+    _upsert_counters(ClassGameStat, ('level', 'mother_tongue'), ('game_count', 'wrong_guesses'), [
+        {'level': level, 'mother_tongue': mother_tongue, 'game_count': games, 'wrong_guesses': wrong_guesses}
+        for (level, mother_tongue), (games, wrong_guesses) in game_totals.items()
+    ])
+    _upsert_counters(ClassLetterStat, ('level', 'mother_tongue', 'letter'), ('error_count', 'game_count'), [
+        {'level': level, 'mother_tongue': mother_tongue, 'letter': letter,
+         'error_count': error_count, 'game_count': game_count}
+        for (level, mother_tongue, letter), (error_count, game_count) in letter_totals.items()
+    ])
+
+def backfill_class_letter_stats():
+    """
+    Rebuild ClassGameStat and ClassLetterStat from the GameLog history, grouped by each
+    student's current level and mother tongue (the live counters use the values at the
+    time of the game). Returns the number of (level, mother tongue) groups.
+    """
+    ClassGameStat.query.delete()
+    ClassLetterStat.query.delete()
+    game_totals, letter_totals = {}, {}
+    logs = (db.session.query(User.level, UserProfile.mother_tongue, GameLog.wrong_letters)
+            .join(User, User.id == GameLog.user_id)
+            .outerjoin(UserProfile, UserProfile.user_id == GameLog.user_id)
+            .filter(User.role == 'student')
+            .order_by(GameLog.id)
+            .execution_options(yield_per=1000))
+    for level, mother_tongue, wrong_letters in logs:
+        _add_class_counters(_class_group(level, mother_tongue), wrong_letters, game_totals, letter_totals)
+    db.session.add_all(
+        ClassGameStat(level=level, mother_tongue=mother_tongue, game_count=games, wrong_guesses=wrong_guesses)
+        for (level, mother_tongue), (games, wrong_guesses) in game_totals.items()
+    )
+    db.session.add_all(
+        ClassLetterStat(level=level, mother_tongue=mother_tongue, letter=letter,
+                        error_count=error_count, game_count=game_count)
+        for (level, mother_tongue, letter), (error_count, game_count) in letter_totals.items()
+    )
+    db.session.commit()
+    return len(game_totals)
+
+def _utcnow():
+    # Naive UTC, matching what SQLite hands back for DateTime columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def get_due_review_words(user_id, now=None):
+    """Words whose spaced-repetition review is due, via the (user_id, next_review) index."""
+    now = now or _utcnow()
+    rows = (db.session.query(ReviewSchedule.word)
+            .filter(ReviewSchedule.user_id == user_id, ReviewSchedule.next_review <= now)
+            .all())
+    return [word for (word,) in rows]
+
+def get_review_schedule(user_id, words=None):
+    """Word -> next review of the user's review rows (only those of words, if given)."""
+    query = db.session.query(ReviewSchedule.word, ReviewSchedule.next_review).filter(
+        ReviewSchedule.user_id == user_id)
+    if words is not None:
+        query = query.filter(ReviewSchedule.word.in_(words))
+    return dict(query.all())
+
+def schedule_reviews(user_id, failures, now=None):
+    """
+    Record failed attempts (word -> number of failures) and push each word's next review
+    out to 2**failures days. One read of the affected rows, then the inserts and updates
+    go out as one batch on flush. Returns the number of words that got their first
+    review row. Does not commit.
+    """
+    now = now or _utcnow()
+    schedules = {schedule.word: schedule for schedule in ReviewSchedule.query.filter(
+        ReviewSchedule.user_id == user_id, ReviewSchedule.word.in_(failures))}
+    new_schedules = []
+    for word, count in failures.items():
+        schedule = schedules.get(word)
+        if schedule is None:
+            schedule = ReviewSchedule(user_id=user_id, word=word, count=0)
+            new_schedules.append(schedule)
+        schedule.count += count
+        schedule.next_review = now + timedelta(days=2**schedule.count)
+    db.session.add_all(new_schedules)
+    return len(new_schedules)
+
+def get_seen_words(user_id):
+    """Set of words the user has played, for O(1) membership checks while filtering candidates."""
+    return {word for (word,) in db.session.query(SeenWord.word).filter(SeenWord.user_id == user_id)}
+
+def is_word_seen(user_id, word):
+    # The game client logs words lowercased; two lookups on the (user_id, word) index
+    return db.session.query(SeenWord.id).filter(
+        SeenWord.user_id == user_id, SeenWord.word.in_({word, word.lower()})
+    ).first() is not None
+
+def mark_words_seen(user_id, words):
+    """
+    Insert SeenWord rows for the words not seen yet (same matching as is_word_seen), with
+    one lookup for all of them. Returns the number of rows added. Does not commit.
+    """
+    candidates = {word for word in words if word}
+    if not candidates:
+        return 0
+    seen = {word for (word,) in db.session.query(SeenWord.word).filter(
+        SeenWord.user_id == user_id,
+        SeenWord.word.in_(candidates | {word.lower() for word in candidates}))}
+    new_rows = []
+    for word in words:
+        if word and word not in seen and word.lower() not in seen:
+            seen.add(word)
+            new_rows.append(SeenWord(user_id=user_id, word=word))
+    db.session.add_all(new_rows)
+    return len(new_rows)
+
+def bump_stats_version(profile):
+    profile.stats_version = (profile.stats_version or 0) + 1
+
+def recount_user_statistics():
+    """
+    Recompute the materialized counters on every profile from GameLog, SeenWord and
+    ReviewSchedule. Used after schema and data migrations; returns the number of profiles.
+    """
+    results = {}
+    for user_id, was_successful, count in (db.session.query(GameLog.user_id, GameLog.was_successful, func.count(GameLog.id))
+                                           .group_by(GameLog.user_id, GameLog.was_successful)):
+        results[(user_id, bool(was_successful))] = count
+    seen = dict(db.session.query(SeenWord.user_id, func.count(SeenWord.id)).group_by(SeenWord.user_id))
+    failed = dict(db.session.query(ReviewSchedule.user_id, func.count(ReviewSchedule.id)).group_by(ReviewSchedule.user_id))
+    profiles = UserProfile.query.all()
+    for profile in profiles:
+        profile.games_won = results.get((profile.user_id, True), 0)
+        profile.games_lost = results.get((profile.user_id, False), 0)
+        profile.seen_count = seen.get(profile.user_id, 0)
+        profile.failed_count = failed.get(profile.user_id, 0)
+        bump_stats_version(profile)
+    db.session.commit()
+    return len(profiles)
+
+def migrate_seen_words():
+    """
+    Move the legacy UserProfile.seen_words JSON into SeenWord rows and empty the JSON
+    afterwards, so the migration is idempotent. Returns the number of profiles migrated.
+    """
+    pending = UserProfile.query.filter(
+        UserProfile.seen_words.isnot(None),
+        db.cast(UserProfile.seen_words, db.Text).notin_(['[]', 'null'])
+    ).all()
+    for profile in pending:
+        existing = get_seen_words(profile.user_id)
+        for word in (profile.seen_words or []):
+            if word and isinstance(word, str) and word not in existing:
+                db.session.add(SeenWord(user_id=profile.user_id, word=word))
+                existing.add(word)
+        profile.seen_words = []
+    db.session.commit()
+    return len(pending)
+
+def migrate_failed_words():
+    """
+    Move the legacy UserProfile.failed_words JSON into ReviewSchedule rows and empty the
+    JSON afterwards, so the migration is idempotent. Returns the number of profiles migrated.
+    """
+    pending = UserProfile.query.filter(
+        UserProfile.failed_words.isnot(None),
+        db.cast(UserProfile.failed_words, db.Text).notin_(['{}', 'null'])
+    ).all()
+    now = _utcnow()
+    for profile in pending:
+        existing = {s.word for s in ReviewSchedule.query.filter_by(user_id=profile.user_id)}
+        for word, entry in (profile.failed_words or {}).items():
+            if word in existing:
+                continue
+            entry = entry or {}
+            try:
+                next_review = datetime.fromisoformat(entry['next_review'])
+                if next_review.tzinfo is not None:
+                    next_review = next_review.astimezone(timezone.utc).replace(tzinfo=None)
+            except (KeyError, TypeError, ValueError):
+                next_review = now
+            db.session.add(ReviewSchedule(
+                user_id=profile.user_id,
+                word=word,
+                count=int(entry.get('count', 1) or 1),
+                next_review=next_review
+            ))
+        profile.failed_words = {}
+    db.session.commit()
+    return len(pending)
+
 # update_user_profile wird durch direkte Zuweisung und db.session.commit() ersetzt
 
 def create_token_required_decorator(f, check_teacher=False):
@@ -123,11 +644,13 @@ def create_token_required_decorator(f, check_teacher=False):
 
         try:
             data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            # user_id statt username verwenden
-            current_user = User.query.get(data['user_id'])
+            # user_id statt username verwenden; ein kurzlebiger Cache spart die User-Abfrage
+            current_user = load_identity(data['user_id'])
             
             if current_user is None:
                 return jsonify({'message': 'User not found!'}), 401
+            # Request context for the profiler's file names
+            g.identity = current_user
             
             # Überprüfen, ob der Benutzer die Lehrerrolle hat
             if check_teacher and current_user.role != 'teacher':
@@ -149,87 +672,88 @@ def user_token_required(f):
     return create_token_required_decorator(f, check_teacher=False)
 
 # --- Word List Management ---
-# Cache for word lists
+# Cache for word lists: level -> ((compiled mtime, JSON mtime), WordIndex). The indexes are
+# immutable, so request threads can share them without copying.
 word_cache = {}
-word_cache_meta = {}
 
-def get_words(level='a1'):
-    file_path = os.path.join(WORDLISTS_DIR, f'{level}.json')
-    # Smart cache invalidation based on file mtime
+def _mtime(file_path):
     try:
-        current_mtime = os.path.getmtime(file_path)
+        return os.path.getmtime(file_path)
     except FileNotFoundError:
-        current_mtime = None
+        return None
 
-    if level in word_cache and word_cache_meta.get(level) == current_mtime:
-        return word_cache[level]
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            words_data = json.load(f)
-        
-        # Process words to separate articles from nouns
-        if 'words' in words_data:
-            processed_words = []
-            for word_data in words_data['words']:
-                clean_word, article = separate_article_from_noun(word_data['word'])
-                
-                processed_word = {
-                    'word': clean_word,
-                    'type': word_data['type'],
-                    'category': word_data['category']
-                }
-                
-                # If it's a noun with an article, include the article in the category display
-                if article and word_data['type'] == 'Nomen':
-                    processed_word['category'] = f"{word_data['category']} ({article})"
-                
-                processed_words.append(processed_word)
-            
-            words_data['words'] = processed_words
-        
-        word_cache[level] = words_data
-        word_cache_meta[level] = current_mtime
-        return words_data
-    except FileNotFoundError:
-        print(f"Warning: Word list for level {level} not found.")
-        return []
-
-def generate_game_hints(word, level, difficulty_modifier=1.0, training_letters=None):
+def get_word_index(level='a1'):
+    json_path = os.path.join(WORDLISTS_DIR, f'{level}.json')
+    binary_path = compiled_path(json_path)
+    # Smart cache invalidation based on file mtime
+    current_mtime = (_mtime(binary_path), _mtime(json_path))
+
+    cached = word_cache.get(level)
+    if cached and cached[0] == current_mtime:
+        return cached[1]
+    index = None
+    if current_mtime[0] is not None:
+        # Compiled by `flask compile-word-lists`; ignored once the JSON has been edited
+        try:
+            index = load_compiled(level, binary_path, source_path=json_path)
+        except WordListError as exc:
+            logging.warning('%s: %s; loading the JSON word list instead', exc.source, '; '.join(exc.problems))
+    if index is None:
+        try:
+            index = load_json_index(level, json_path)
+        except FileNotFoundError:
+            print(f"Warning: Word list for level {level} not found.")
+            return WordIndex(level)
+        except WordListError as exc:
+            logging.warning('%s: %s', exc.source, '; '.join(exc.problems))
+            index = WordIndex(level)
+    word_cache[level] = (current_mtime, index)
+    return index
+
+# Global case-folded lookup over all levels: (level indexes it was built from, lookup)
+_word_lookup = ((), {})
+
+def get_word_lookup():
+    """Case-folded word -> (WordEntry, level); rebuilt only when a level's word list reloads."""
+    global _word_lookup
+    indexes = tuple(get_word_index(level) for level in LEVELS)
+    built_from, lookup = _word_lookup
+    if len(built_from) != len(indexes) or any(a is not b for a, b in zip(built_from, indexes)):
+        lookup = build_word_lookup(indexes)
+        _word_lookup = (indexes, lookup)
+    return lookup
+
+
+# Letter classes used by the hint generator
+HINT_VOWELS = frozenset('aeiouäöü')
+HINT_COMMON_CONSONANTS = frozenset('nrtsm')
+HINT_ALL_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyzäöüß')
+HINT_UNCOMMON_LETTERS = frozenset('qxyzvjckwpfgbh')
+# Upper bound for memoized hint results
+HINT_MEMO_SIZE = int(os.environ.get('HINT_MEMO_SIZE', '4096'))
+
+def generate_game_hints(word, level, difficulty_modifier=1.0, training_letters=None, base_counts=None):
     """
     Generate initial hints for a hangman game based on word difficulty, length, and a dynamic modifier.
     If training_letters are provided, avoid revealing these letters and prefer not excluding them so the
-    learner can practice them.
+    learner can practice them. base_counts are the word's precomputed hint_base_counts, if known.
     Returns dict with pre_revealed_letters and excluded_letters.
     """
+    # The result only depends on these arguments, so it is memoized. The modifier is quantized
+    # to two decimals to keep the number of distinct keys bounded.
+    training_key = frozenset(c.lower() for c in training_letters) if training_letters else frozenset()
+    reveal, exclude = _compute_game_hints(word, level, round(float(difficulty_modifier), 2), training_key,
+                                          base_counts)
+    return {
+        'pre_revealed_letters': list(reveal),
+        'excluded_letters': list(exclude)
+    }
+
+@lru_cache(maxsize=HINT_MEMO_SIZE)
+def _compute_game_hints(word, level, difficulty_modifier, training_letters, base_counts=None):
     word_lower = word.lower()
     word_length = len(word_lower)
-    training_letters = set([c.lower() for c in training_letters]) if training_letters else set()
-    
-    # Define difficulty based on level and word length
-    if level in ['a1', 'a2']:
-        difficulty = 'easy'
-    elif level in ['b1']:
-        difficulty = 'medium'
-    else:
-        difficulty = 'hard'
-    
-    # Adjust difficulty based on word length
-    if word_length > 10:
-        if difficulty == 'easy':
-            difficulty = 'medium'
-        elif difficulty == 'medium':
-            difficulty = 'hard'
-    
-    # Determine base number of letters to reveal and exclude
-    if difficulty == 'easy':
-        base_reveal = max(1, word_length // 4)
-        base_exclude = min(8, 26 - len(set(word_lower)))
-    elif difficulty == 'medium':
-        base_reveal = max(1, word_length // 5)
-        base_exclude = min(6, 26 - len(set(word_lower)))
-    else:  # hard
-        base_reveal = max(1, word_length // 6)
-        base_exclude = min(4, 26 - len(set(word_lower)))
+    base_reveal, base_exclude = base_counts or hint_base_counts(word_lower, level)
 
     # Apply the difficulty modifier, ensuring at least one letter is revealed and not too many are excluded
     reveal_count = min(word_length - 1, max(1, round(base_reveal * difficulty_modifier)))
@@ -239,14 +763,11 @@ def generate_game_hints(word, level, difficulty_modifier=1.0, training_letters=N
     word_letters = set(word_lower)
     
     # Select letters to pre-reveal (prefer vowels and common letters)
-    vowels = set('aeiouäöü')
-    common_consonants = set('nrtsm')
-    
     # Prioritize vowels first, then common consonants
     letters_to_reveal = []
-    available_vowels = (word_letters & vowels) - training_letters
-    available_consonants = (word_letters & common_consonants) - training_letters
-    remaining_letters = (word_letters - vowels - common_consonants) - training_letters
+    available_vowels = (word_letters & HINT_VOWELS) - training_letters
+    available_consonants = (word_letters & HINT_COMMON_CONSONANTS) - training_letters
+    remaining_letters = (word_letters - HINT_VOWELS - HINT_COMMON_CONSONANTS) - training_letters
     
     # Add vowels first
     # Deterministic order for UI stability
@@ -269,55 +790,92 @@ def generate_game_hints(word, level, difficulty_modifier=1.0, training_letters=N
         letters_to_reveal.extend(fallback_letters[:needed])
     
     # Select letters to exclude (letters not in the word)
-    all_letters = set('abcdefghijklmnopqrstuvwxyzäöüß')
-    letters_not_in_word = all_letters - word_letters
+    letters_not_in_word = HINT_ALL_LETTERS - word_letters
     
     # Prefer excluding uncommon letters
-    uncommon_letters = set('qxyzvjckwpfgbh')
     # Prefer excluding letters the learner is NOT training right now
-    exclude_candidates = (letters_not_in_word & uncommon_letters) - training_letters
+    exclude_candidates = set((letters_not_in_word & HINT_UNCOMMON_LETTERS) - training_letters)
     
     if len(exclude_candidates) < exclude_count:
         exclude_candidates.update((letters_not_in_word - exclude_candidates) - training_letters)
     
     excluded_letters = sorted(list(exclude_candidates))[:exclude_count]
-    
-    return {
-        'pre_revealed_letters': letters_to_reveal,
-        'excluded_letters': excluded_letters
-    }
 
-@app.route('/api/word')
-@user_token_required
-def get_word(current_user):
-    level = request.args.get('level', default='a1', type=str)
-    use_model = request.args.get('use_model', default='false', type=str).lower() == 'true'
-    user_id = current_user.id
+    # Tuples, so the memoized result cannot be mutated by callers
+    return tuple(letters_to_reveal), tuple(excluded_letters)
+
+# Lowercase word -> (games, losses) over all players, refreshed every WORD_DIFFICULTY_TTL seconds
+_word_difficulty = (None, {})
+_word_difficulty_lock = threading.Lock()
+# level -> (word index, difficulty map, WordFeatures) for the scoring engine
+_word_features = {}
+
+def get_word_difficulty():
+    global _word_difficulty
+    computed_at, difficulty = _word_difficulty
+    if computed_at is not None and time.monotonic() - computed_at < WORD_DIFFICULTY_TTL:
+        return difficulty
+    with _word_difficulty_lock:
+        if _word_difficulty[0] is not computed_at:
+            return _word_difficulty[1]
+        difficulty = {}
+        # One grouped pass over GameLog per refresh, not per request
+        rows = (db.session.query(GameLog.word, func.count(GameLog.id),
+                                 func.sum(case((GameLog.was_successful.is_(False), 1), else_=0)))
+                .group_by(GameLog.word))
+        for word, games, losses in rows:
+            previous_games, previous_losses = difficulty.get(word.lower(), (0, 0))
+            difficulty[word.lower()] = (previous_games + games, previous_losses + int(losses or 0))
+        _word_difficulty = (time.monotonic(), difficulty)
+        return difficulty
+
+def get_word_features(level):
+    index = get_word_index(level)
+    difficulty = get_word_difficulty()
+    cached = _word_features.get(level)
+    if cached and cached[0] is index and cached[1] is difficulty:
+        return cached[2]
+    features = WordFeatures(index, difficulty)
+    _word_features[level] = (index, difficulty, features)
+    return features
+
+def _problem_word_type(profile):
+    """The word type with the most failures, if it is a clear problem field (more than 3)."""
+    failed_types = profile.failed_word_types or {}
+    if not failed_types:
+        return None
+    problem_type = max(failed_types, key=failed_types.get)
+    return problem_type if failed_types[problem_type] > 3 else None
+
+# Served when a level has no words at all
+FALLBACK_WORD = {"word": "software", "type": "Nomen", "category": "Technik"}
+
+def select_words(user_id, profile, level, use_model, count=1, due_words=None):
+    """
+    Pick up to count distinct words from the highest priority tier that has candidates.
+    Returns (word_data, training_letters, unseen_only) triples; unseen_only marks picks
+    that are only valid while the user has not played the word yet.
+    """
+    training_letters = profile.problem_letters if use_model and profile.problem_letters else None
 
-    profile = get_user_profile(user_id)
-    now = datetime.now(timezone.utc)
+    if scoring_engine is not None:
+        return _select_words_scored(user_id, profile, level, use_model, count, training_letters)
 
     # 1. Priorität: Spaced Repetition - fällige Wörter wiederholen
-    due_words = [
-        word for word, data in profile.failed_words.items()
-        if now >= datetime.fromisoformat(data['next_review'])
-    ]
-    
-    words_response = get_words(level)
-    all_words_data = words_response.get('words', []) if isinstance(words_response, dict) else words_response
+    if due_words is None:
+        due_words = get_due_review_words(user_id)
+
+    word_index = get_word_index(level)
 
     if due_words:
-        word_to_review = random.choice(due_words)
-        # Finde die vollen Wortdaten für das zu wiederholende Wort
-        word_data = next((item for item in all_words_data if item['word'] == word_to_review), None)
-        if word_data:
-            # Add game hints
-            hints = generate_game_hints(
-                word_data['word'], level, profile.difficulty_modifier,
-                training_letters=profile.problem_letters if use_model and profile.problem_letters else None
-            )
-            word_data.update(hints)
-            return jsonify(word_data)
+        # Finde die vollen Wortdaten für die zu wiederholenden Wörter
+        candidate_words = list(dict.fromkeys(item for item in map(word_index.get, due_words) if item is not None))
+        if candidate_words:
+            return [(item, training_letters, False)
+                    for item in random.sample(candidate_words, min(count, len(candidate_words)))]
+
+    # Compared case-insensitively, played words are stored as the client sends them
+    seen_words = {word.lower() for word in get_seen_words(user_id)}
 
     # 2. Priorität: Gezieltes Training von Problem-Wortarten
     failed_types = profile.failed_word_types
@@ -327,68 +885,119 @@ def get_word(current_user):
         # Bedingung: mehr als 3 Fehler und es ist ein klares Problemfeld
         if failed_types[problem_type] > 3:
             candidate_words = [
-                item for item in all_words_data
-                if item.get('type') == problem_type and item['word'] not in profile.seen_words
+                item for item in word_index.by_type.get(problem_type, ())
+                if item.lower not in seen_words
             ]
             if candidate_words:
-                word_data = random.choice(candidate_words)
-                # Add game hints
-                hints = generate_game_hints(
-                    word_data['word'], level, profile.difficulty_modifier,
-                    training_letters=profile.problem_letters if use_model and profile.problem_letters else None
-                )
-                word_data.update(hints)
-                return jsonify(word_data)
+                return [(item, training_letters, True)
+                        for item in random.sample(candidate_words, min(count, len(candidate_words)))]
 
     # 3. Priorität: KI-Training mit Problembuchstaben (falls aktiviert)
     if use_model:
         problem_letters = profile.problem_letters
         if problem_letters:
+            # Inverted letter index instead of scanning every word of the level
             candidate_words = [
-                item for item in all_words_data
-                if any(char in item['word'].lower() for char in problem_letters) and item['word'] not in profile.seen_words
+                item for item in word_index.with_any_letter(problem_letters)
+                if item.lower not in seen_words
             ]
             if candidate_words:
-                word_data = random.choice(candidate_words)
-                # Add game hints
-                hints = generate_game_hints(
-                    word_data['word'], level, profile.difficulty_modifier,
-                    training_letters=profile.problem_letters
-                )
-                word_data.update(hints)
-                return jsonify(word_data)
+                return [(item, profile.problem_letters, True)
+                        for item in random.sample(candidate_words, min(count, len(candidate_words)))]
 
     # 4. Priorität: Ein zufälliges, noch nicht gesehenes Wort vom gewählten Level
-    unseen_words = [item for item in all_words_data if item['word'] not in profile.seen_words]
+    unseen_words = [item for item in word_index if item.lower not in seen_words]
     if unseen_words:
-        word_data = random.choice(unseen_words)
-        # Add game hints
-        hints = generate_game_hints(
-            word_data['word'], level, profile.difficulty_modifier,
-            training_letters=profile.problem_letters if use_model and profile.problem_letters else None
-        )
-        word_data.update(hints)
-        return jsonify(word_data)
-        
+        return [(item, training_letters, True)
+                for item in random.sample(unseen_words, min(count, len(unseen_words)))]
+
     # 5. Fallback: Wenn alle Wörter des Levels gesehen wurden, ein zufälliges Wort
-    if all_words_data:
-        word_data = random.choice(all_words_data)
-        # Add game hints
-        hints = generate_game_hints(
-            word_data['word'], level, profile.difficulty_modifier,
-            training_letters=profile.problem_letters if use_model and profile.problem_letters else None
-        )
-        word_data.update(hints)
-        return jsonify(word_data)
+    if len(word_index):
+        return [(item, training_letters, False)
+                for item in random.sample(word_index.entries, min(count, len(word_index)))]
 
     # 6. Absoluter Notfall-Fallback, falls alles andere fehlschlägt
-    fallback_word = {"word": "software", "type": "Nomen", "category": "Technik"}
-    hints = generate_game_hints(
-        fallback_word['word'], level, profile.difficulty_modifier,
-        training_letters=profile.problem_letters if use_model and profile.problem_letters else None
+    return [(FALLBACK_WORD, training_letters, False)]
+
+def _select_words_scored(user_id, profile, level, use_model, count, training_letters):
+    """
+    select_words() through the scoring engine: every word of the level scored at once. Seen
+    words and due reviews come from the user's cached rows, which hold the same state as
+    the database for the profile's stats version.
+    """
+    features = get_word_features(level)
+    if not len(features):
+        return [(FALLBACK_WORD, training_letters, False)]
+    rows = user_rows.get(user_id, profile.stats_version or 0, level, features,
+                         lambda: (get_seen_words(user_id), get_review_schedule(user_id)))
+    state = SelectionState(
+        due_words=frozenset(),
+        seen_words=frozenset(),
+        problem_type=_problem_word_type(profile),
+        problem_letters=tuple(profile.problem_letters or ()) if use_model else (),
+        difficulty_modifier=profile.difficulty_modifier or 1.0,
+        seen_rows=rows.seen,
+        due_rows=rows.due(features, _utcnow())
     )
-    fallback_word.update(hints)
-    return jsonify(fallback_word)
+    return [(entry, training_letters, unseen_only)
+            for entry, unseen_only in scoring_engine.select(features, state, count)]
+
+def _selection_fingerprint(profile, level, use_model, due_words):
+    """
+    Everything select_words() depends on apart from the seen words. The adaptive scoring
+    preset also weighs the difficulty modifier; queued words may lag it by a few rounds.
+    """
+    return (
+        level,
+        use_model,
+        # A changed word list file yields a new index object
+        get_word_index(level),
+        frozenset(due_words),
+        _problem_word_type(profile),
+        tuple(profile.problem_letters or ()) if use_model else None,
+    )
+
+def next_word(user_id, profile, level, use_model):
+    """
+    The user's next (word_data, training_letters), served from the prefetch queue while the
+    selection inputs are unchanged. A miss runs select_words() once for this word and
+    NEXT_ROUND_PREFETCH more from the same tier.
+    """
+    due_words = get_due_review_words(user_id)
+    fingerprint = _selection_fingerprint(profile, level, use_model, due_words)
+    while True:
+        queued = word_queue.pop(user_id, fingerprint)
+        if queued is None:
+            break
+        word_data, training_letters, unseen_only = queued
+        # Words may have been played since (e.g. in another tab)
+        if not unseen_only or not is_word_seen(user_id, word_data.word):
+            return word_data, training_letters
+
+    picks = select_words(user_id, profile, level, use_model, count=1 + word_queue.size, due_words=due_words)
+    word_queue.put(user_id, fingerprint, picks[1:])
+    word_data, training_letters, _ = picks[0]
+    return word_data, training_letters
+
+def _word_payload(word_data, level, profile, training_letters=None):
+    """Build a fresh response dict for a word, never mutating cached word list entries."""
+    is_entry = isinstance(word_data, WordEntry)
+    payload = word_data.to_dict() if is_entry else dict(word_data)
+    payload.update(generate_game_hints(
+        payload['word'], level, profile.difficulty_modifier,
+        training_letters=training_letters,
+        base_counts=(word_data.hint_reveal, word_data.hint_exclude) if is_entry else None
+    ))
+    return payload
+
+@app.route('/api/word')
+@user_token_required
+def get_word(current_user):
+    level = request.args.get('level', default='a1', type=str)
+    use_model = request.args.get('use_model', default='false', type=str).lower() == 'true'
+    profile = get_user_profile(current_user.id)
+    word_data, training_letters = next_word(current_user.id, profile, level, use_model)
+    return jsonify(_word_payload(word_data, level, profile, training_letters))
 
 @app.route('/api/hint')
 def get_hint():
@@ -396,14 +1005,17 @@ def get_hint():
     if not word_to_find:
         return jsonify({'hint': 'Kein Wort angegeben.'}), 400
 
-    # Durchsuche alle Wortlisten nach dem Wort, um die Metadaten zu finden
-    for level in ['a1', 'a2', 'b1', 'b2', 'c1']:
-        words_response = get_words(level)
-        all_words_data = words_response.get('words', []) if isinstance(words_response, dict) else words_response
-        for word_data in all_words_data:
-            if word_data['word'].lower() == word_to_find.lower():
-                hint = f"Tipp: Es ist ein {word_data['type']} aus der Kategorie '{word_data['category']}'."
-                return jsonify({'hint': hint})
+    # Ein Hash-Lookup über alle Wortlisten statt Durchsuchen jeder Liste
+    found = get_word_lookup().get(word_to_find.casefold())
+    if found:
+        word_data, _level = found
+        hint = f"Tipp: Es ist ein {word_data.type} aus der Kategorie '{word_data.category}'."
+        response = jsonify({'hint': hint})
+        # Hints only change with the word lists, so let the browser or a proxy answer repeats
+        response.add_etag()
+        response.cache_control.public = True
+        response.cache_control.max_age = HINT_CACHE_SECONDS
+        return response.make_conditional(request)
 
     return jsonify({'hint': 'Zu diesem Wort konnte kein Tipp gefunden werden.'}), 404
 
@@ -419,7 +1031,8 @@ def get_feedback(current_user):
     # Aggregate total failures across all failed words
     total_failures = 0
     try:
-        total_failures = sum((entry or {}).get('count', 0) for entry in profile.failed_words.values())
+        total_failures = db.session.query(func.coalesce(func.sum(ReviewSchedule.count), 0)) \
+            .filter(ReviewSchedule.user_id == user_id).scalar()
     except Exception:
         total_failures = 0
 
@@ -430,27 +1043,154 @@ def get_feedback(current_user):
     return jsonify({'feedback': feedback_message})
 
 
-@app.route('/api/log_guess', methods=['POST'])
-def log_guess():
-    data = request.get_json()
-    log_entry = {
-        'timestamp': datetime.now(timezone.utc).isoformat(),
+def record_guesses(events):
+    """Queue guess events for guess_log.csv, as one batch."""
+    timestamp = datetime.now(timezone.utc).isoformat()
+    csv_log.write_many('guess_log.csv', [{
+        'timestamp': timestamp,
         'word': data.get('word'),
         'guessed_letter': data.get('letter'),
         'is_correct': data.get('isCorrect')
+    } for data in events])
+
+def apply_game_results(identity, profile, games):
+    """
+    Apply finished games, oldest first, to the user's profile, review schedule, seen words,
+    letter counters and (for students) the class-wide letter counters, and stage their
+    GameLog rows. Every kind of row is read and written once for the whole batch, so a
+    batch costs about as many statements as a single game. Games whose "id" was applied
+    before (a retried request) are skipped. Does not commit, so the games share the
+    caller's transaction. Returns the CSV log entries of the applied games to write once
+    it is committed.
+    """
+    user_id = identity.id
+    timestamp = datetime.now(timezone.utc).isoformat()
+    event_ids = {data['id'] for data in games if data.get('id')}
+    applied_ids = set()
+    if event_ids:
+        applied_ids = {event_id for (event_id,) in db.session.query(GameLog.event_id).filter(
+            GameLog.user_id == user_id, GameLog.event_id.in_(event_ids))}
+    game_logs = []
+    log_entries = []
+    games_wrong_letters = []
+    failures = Counter()
+    for data in games:
+        event_id = data.get('id') or None
+        if event_id is not None:
+            if event_id in applied_ids:
+                continue
+            applied_ids.add(event_id)
+        word = data.get('word') or ''
+        word_type = data.get('wordType')
+        was_successful = bool(data.get('wasSuccessful'))
+        wrong_letters = data.get('wrongLetters', []) or []
+        wrong_guesses = int(data.get('wrongGuesses') or 0)
+
+        if not was_successful:
+            profile.games_lost = (profile.games_lost or 0) + 1
+            profile.difficulty_modifier = min(2.0, (profile.difficulty_modifier or 1.0) * 1.1)
+            failures[word] += 1
+            if word_type:
+                profile.failed_word_types[word_type] = (profile.failed_word_types or {}).get(word_type, 0) + 1
+        else:
+            profile.games_won = (profile.games_won or 0) + 1
+            profile.difficulty_modifier = max(0.5, (profile.difficulty_modifier or 1.0) * 0.95)
+            profile.wins_since_last_hint = (profile.wins_since_last_hint or 0) + 1
+            if profile.wins_since_last_hint >= 3:
+                gained = profile.wins_since_last_hint // 3
+                profile.hint_credits = int(profile.hint_credits or 0) + int(gained)
+                profile.wins_since_last_hint = profile.wins_since_last_hint % 3
+
+        game_logs.append(GameLog(
+            user_id=user_id,
+            word=word,
+            was_successful=was_successful,
+            wrong_guesses=wrong_guesses,
+            wrong_letters=[str(ch) for ch in wrong_letters],
+            event_id=event_id
+        ))
+        games_wrong_letters.append(wrong_letters)
+        log_entries.append({
+            'timestamp': timestamp,
+            'user_id': user_id,
+            'word': word,
+            'wrong_guesses': wrong_guesses,
+            'was_successful': was_successful
+        })
+    if not game_logs:
+        return log_entries
+
+    # The lookups below read other tables, so the profile and the new rows are written once,
+    # on commit, instead of being flushed before every query
+    with db.session.no_autoflush:
+        added = mark_words_seen(user_id, [game_log.word for game_log in game_logs])
+        profile.seen_count = (profile.seen_count or 0) + added
+        if failures:
+            profile.failed_count = (profile.failed_count or 0) + schedule_reviews(user_id, failures)
+        db.session.add_all(game_logs)
+
+        # Incremental per-letter counters, committed together with the GameLog rows
+        profile.problem_letters = update_letter_stats(user_id, games_wrong_letters)
+        if identity.role == 'student':
+            update_class_letter_stats(identity.level, profile.mother_tongue, games_wrong_letters)
+    bump_stats_version(profile)
+
+    return log_entries
+
+def commit_game_results(identity, profile, games):
+    """
+    apply_game_results() and commit. If a concurrent request committed one of the same
+    event ids (or seen words) first, the unique indexes reject this transaction; the games
+    are then applied once more, skipping what is already stored. Returns the CSV entries.
+    """
+    log_entries = apply_game_results(identity, profile, games)
+    if not log_entries:
+        return log_entries
+    version = profile.stats_version
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        log_entries = apply_game_results(identity, profile, games)
+        if not log_entries:
+            return log_entries
+        version = profile.stats_version
+        db.session.commit()
+    if scoring_engine is not None:
+        # Carry the cached seen and review rows over instead of reloading them next round
+        failed = {entry['word'] for entry in log_entries if not entry['was_successful']}
+        user_rows.record(identity.id, version, [entry['word'] for entry in log_entries],
+                         get_review_schedule(identity.id, failed) if failed else {})
+    return log_entries
+
+def _event_id_error(event):
+    event_id = event.get('id')
+    if event_id is not None and (not isinstance(event_id, str) or not 0 < len(event_id) <= 64):
+        return 'Event ids must be strings of 1 to 64 characters'
+    return None
+
+def build_user_statistics(user_id, profile):
+    # Served from the counters on the profile, no aggregate queries
+    wins = int(profile.games_won or 0)
+    losses = int(profile.games_lost or 0)
+
+    total_games = wins + losses
+    win_rate = round((wins / total_games * 100) if total_games > 0 else 0, 1)
+
+    return {
+        'wins': wins,
+        'losses': losses,
+        'total_games': total_games,
+        'win_rate': win_rate,
+        'seen_words': int(profile.seen_count or 0),
+        'failed_words': int(profile.failed_count or 0),
+        'problem_letters': profile.problem_letters or [],
+        'hint_credits': int(profile.hint_credits or 0)
     }
-    
-    log_file = os.path.join(os.path.dirname(__file__), 'guess_log.csv')
-    
-    # Schreibe den Header, wenn die Datei neu ist
-    write_header = not os.path.exists(log_file)
-    
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=log_entry.keys())
-        if write_header:
-            writer.writeheader()
-        writer.writerow(log_entry)
-        
+
+@app.route('/api/log_guess', methods=['POST'])
+def log_guess():
+    record_guesses([request.get_json() or {}])
     return jsonify({'success': True}), 201
 
 
@@ -459,76 +1199,109 @@ def log_guess():
 def log_game(current_user):
     """Persist legacy CSV logging for compatibility but use DB for queries."""
     data = request.get_json() or {}
-    word = data.get('word') or ''
-    word_type = data.get('wordType')
-    was_successful = bool(data.get('wasSuccessful'))
-    wrong_letters = data.get('wrongLetters', []) or []
-    wrong_guesses = int(data.get('wrongGuesses') or 0)
     user_id = current_user.id
 
     profile = get_user_profile(user_id)
+    log_entries = commit_game_results(current_user, profile, [data])
+    csv_log.write_many('game_log.csv', log_entries)
 
-    if word and word not in (profile.seen_words or []):
-        profile.seen_words.append(word)
+    return jsonify({'success': True, 'problem_letters': profile.problem_letters}), 201
 
-    if not was_successful:
-        profile.difficulty_modifier = min(2.0, (profile.difficulty_modifier or 1.0) * 1.1)
-        failure_count = (profile.failed_words or {}).get(word, {}).get('count', 0) + 1
-        profile.failed_words[word] = {
-            "count": failure_count,
-            "next_review": (datetime.now(timezone.utc) + timedelta(days=2**failure_count)).isoformat()
-        }
-        if word_type:
-            profile.failed_word_types[word_type] = (profile.failed_word_types or {}).get(word_type, 0) + 1
-    else:
-        profile.difficulty_modifier = max(0.5, (profile.difficulty_modifier or 1.0) * 0.95)
-        profile.wins_since_last_hint = (profile.wins_since_last_hint or 0) + 1
-        if profile.wins_since_last_hint >= 3:
-            gained = profile.wins_since_last_hint // 3
-            profile.hint_credits = int(profile.hint_credits or 0) + int(gained)
-            profile.wins_since_last_hint = profile.wins_since_last_hint % 3
 
-    try:
-        game_log = GameLog(
-            user_id=user_id,
-            word=word,
-            was_successful=was_successful,
-            wrong_guesses=wrong_guesses,
-            wrong_letters=[str(ch) for ch in wrong_letters]
-        )
-        db.session.add(game_log)
-    except Exception:
-        pass
+@app.route('/api/v2/events', methods=['POST'])
+@user_token_required
+def log_events(current_user):
+    """
+    Batched ingestion of guess and game events. Accepts either a JSON array of events or
+    {"events": [...]}; each event has "type": "guess" or "game" plus the fields of
+    /api/log_guess resp. /api/log_game and optionally a client-generated "id". All games
+    are applied in one transaction and the updated statistics are returned once. Games
+    whose id was applied before are skipped, so a batch can be retried safely; guesses
+    only go to the CSV log and are not deduplicated.
+    """
+    data = request.get_json(silent=True)
+    events = data.get('events') if isinstance(data, dict) else data
+    if not isinstance(events, list):
+        return jsonify({'message': 'Expected a list of events'}), 400
+    if len(events) > MAX_EVENTS_PER_BATCH:
+        return jsonify({'message': f'At most {MAX_EVENTS_PER_BATCH} events per batch'}), 413
+    for event in events:
+        if not isinstance(event, dict) or event.get('type') not in ('guess', 'game'):
+            return jsonify({'message': 'Each event needs a type of "guess" or "game"'}), 400
+        message = _event_id_error(event)
+        if message:
+            return jsonify({'message': message}), 400
 
-    try:
-        logs = GameLog.query.filter_by(user_id=user_id).all()
-        aggregate = Counter()
-        for gl in logs:
-            for ch in (gl.wrong_letters or []):
-                if isinstance(ch, str) and len(ch) == 1:
-                    aggregate[ch] += 1
-        profile.problem_letters = [letter for letter, _ in aggregate.most_common(5)]
-    except Exception:
-        pass
+    user_id = current_user.id
+    profile = get_user_profile(user_id)
 
-    db.session.commit()
+    games = [event for event in events if event['type'] == 'game']
+    game_entries = commit_game_results(current_user, profile, games)
 
-    log_entry = {
-        'timestamp': datetime.now(timezone.utc).isoformat(),
-        'user_id': user_id,
-        'word': word,
-        'wrong_guesses': wrong_guesses,
-        'was_successful': was_successful
-    }
-    log_file = os.path.join(os.path.dirname(__file__), 'game_log.csv')
-    write_header = not os.path.exists(log_file)
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=log_entry.keys())
-        if write_header:
-            writer.writeheader()
-        writer.writerow(log_entry)
+    guesses = [event for event in events if event['type'] == 'guess']
+    if guesses:
+        record_guesses(guesses)
+    if game_entries:
+        csv_log.write_many('game_log.csv', game_entries)
 
-    return jsonify({'success': True, 'problem_letters': profile.problem_letters}), 201
+    return jsonify({
+        'success': True,
+        'accepted': len(events),
+        'duplicate_games': len(games) - len(game_entries),
+        'statistics': build_user_statistics(user_id, profile)
+    }), 201
+
+def _json_flag(value, default):
+    """A boolean request field: a JSON boolean or "true"/"false"; None if it is neither."""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return None
+
+@app.route('/api/v2/next_round', methods=['POST'])
+@user_token_required
+def next_round(current_user):
+    """
+    Finish a round and start the next one in a single request. Body: {"game": {...}} with
+    the fields of /api/log_game and an optional event "id" as for /api/v2/events
+    (optional, e.g. for the very first round), "level" (default:
+    the user's level), "use_model" (default false) and "next_word" (default true; false
+    only logs); both take a JSON boolean or "true"/"false", anything else is a 400.
+    The game is committed before the next word is picked, so it already counts as seen.
+    Returns {"word": {...} or null, "statistics": {...}}.
+    """
+    data = request.get_json(silent=True) or {}
+    game = data.get('game')
+    if game is not None and not isinstance(game, dict):
+        return jsonify({'message': 'game must be an object'}), 400
+    if game and _event_id_error(game):
+        return jsonify({'message': _event_id_error(game)}), 400
+    level = data.get('level') or current_user.level or 'a1'
+    if level not in LEVELS:
+        return jsonify({'message': f"level must be one of {', '.join(LEVELS)}"}), 400
+    use_model = _json_flag(data.get('use_model'), False)
+    fetch_next = _json_flag(data.get('next_word'), True)
+    if use_model is None or fetch_next is None:
+        return jsonify({'message': 'use_model and next_word must be true or false'}), 400
+
+    user_id = current_user.id
+    profile = get_user_profile(user_id)
+    if game:
+        log_entries = commit_game_results(current_user, profile, [game])
+        csv_log.write_many('game_log.csv', log_entries)
+
+    word = None
+    if fetch_next:
+        word_data, training_letters = next_word(user_id, profile, level, use_model)
+        word = _word_payload(word_data, level, profile, training_letters)
+
+    return jsonify({
+        'word': word,
+        'statistics': build_user_statistics(user_id, profile)
+    }), 201 if game else 200
 
 @app.route('/api/user/statistics')
 @user_token_required
@@ -536,30 +1309,14 @@ def get_user_statistics(current_user):
     """Get user statistics including wins, losses, and other game data (DB-backed)."""
     user_id = current_user.id
     profile = get_user_profile(user_id)
+    response = jsonify(build_user_statistics(user_id, profile))
+    # The version changes with every game or hint, so unchanged statistics come back as 304
+    response.set_etag(f"stats-{profile.id}-{profile.stats_version or 0}")
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Authorization')
+    return response.make_conditional(request)
 
-    # Count wins and losses from GameLog table
-    try:
-        wins = GameLog.query.filter_by(user_id=user_id, was_successful=True).count()
-        losses = GameLog.query.filter_by(user_id=user_id, was_successful=False).count()
-    except Exception:
-        wins = 0
-        losses = 0
-
-    total_games = wins + losses
-    win_rate = round((wins / total_games * 100) if total_games > 0 else 0, 1)
-
-    statistics = {
-        'wins': wins,
-        'losses': losses,
-        'total_games': total_games,
-        'win_rate': win_rate,
-        'seen_words': len(profile.seen_words or []),
-        'failed_words': len(profile.failed_words or {}),
-        'problem_letters': profile.problem_letters or [],
-        'hint_credits': int(profile.hint_credits or 0)
-    }
-
-    return jsonify(statistics)
 
 # --- V2 AUTH AND MULTI-USER SYSTEM ---
 
@@ -583,59 +1340,38 @@ def get_user_statistics(current_user):
 #         json.dump(users_data, f, indent=2) # Removed as per new_code
 
 # --- V2 PLACEMENT TEST ---
-def separate_article_from_noun(word_with_article):
-    """
-    Separates German articles from nouns and returns both the clean word and the article.
-    """
-    word_with_article = word_with_article.strip()
-    
-    # Check for definite articles
-    if word_with_article.startswith('der '):
-        return word_with_article[4:], 'der'
-    elif word_with_article.startswith('die '):
-        return word_with_article[4:], 'die'
-    elif word_with_article.startswith('das '):
-        return word_with_article[4:], 'das'
-    
-    # If no article found, return the word as is
-    return word_with_article, None
-
-@app.route('/api/placement-test/questions')
-def get_placement_test_questions():
-    """
-    Stellt eine feste Liste von Wörtern für den Einstufungstest bereit.
-    Die Wörter sind nach ansteigendem Schwierigkeitsgrad geordnet.
-    """
-    test_words = [
-        # A1 Level
-        {"word": "Apfel", "type": "Nomen", "category": "Essen", "level": "a1"},
-        {"word": "Haus", "type": "Nomen", "category": "Wohnen", "level": "a1"},
-        {"word": "schwimmen", "type": "Verb", "category": "Freizeit", "level": "a1"},
-        {"word": "groß", "type": "Adjektiv", "category": "Beschreibung", "level": "a1"},
-        {"word": "die Familie", "type": "Nomen", "category": "Person", "level": "a1"},
-        # A2 Level
-        {"word": "der Ausweis", "type": "Nomen", "category": "Alltag", "level": "a2"},
-        {"word": "berühmt", "type": "Adjektiv", "category": "Person", "level": "a2"},
-        {"word": "der Bahnhof", "type": "Nomen", "category": "Reisen", "level": "a2"},
-        {"word": "erklären", "type": "Verb", "category": "Kommunikation", "level": "a2"},
-        {"word": "die Mannschaft", "type": "Nomen", "category": "Freizeit", "level": "a2"},
-        # B1 Level
-        {"word": "die Fähigkeit", "type": "Nomen", "category": "Abstrakta", "level": "b1"},
-        {"word": "beeinflussen", "type": "Verb", "category": "Person", "level": "b1"},
-        {"word": "die Umweltverschmutzung", "type": "Nomen", "category": "Umwelt", "level": "b1"},
-        {"word": "verantwortlich", "type": "Adjektiv", "category": "Arbeit", "level": "b1"},
-        {"word": "die Gesellschaft", "type": "Nomen", "category": "Gesellschaft", "level": "b1"},
-        # B2 Level
-        {"word": "die Voraussetzung", "type": "Nomen", "category": "Ausbildung", "level": "b2"},
-        {"word": "wissenschaftlich", "type": "Adjektiv", "category": "Ausbildung", "level": "b2"},
-        {"word": "die Wirtschaft", "type": "Nomen", "category": "Wirtschaft", "level": "b2"},
-        {"word": "komplex", "type": "Adjektiv", "category": "Beschreibung", "level": "b2"},
-        {"word": "die Herausforderung", "type": "Nomen", "category": "Gesellschaft", "level": "b2"}
-    ]
-    
-    # Process words to separate articles from nouns
+# Feste Liste von Wörtern für den Einstufungstest, nach ansteigendem Schwierigkeitsgrad geordnet
+PLACEMENT_TEST_WORDS = [
+    # A1 Level
+    {"word": "Apfel", "type": "Nomen", "category": "Essen", "level": "a1"},
+    {"word": "Haus", "type": "Nomen", "category": "Wohnen", "level": "a1"},
+    {"word": "schwimmen", "type": "Verb", "category": "Freizeit", "level": "a1"},
+    {"word": "groß", "type": "Adjektiv", "category": "Beschreibung", "level": "a1"},
+    {"word": "die Familie", "type": "Nomen", "category": "Person", "level": "a1"},
+    # A2 Level
+    {"word": "der Ausweis", "type": "Nomen", "category": "Alltag", "level": "a2"},
+    {"word": "berühmt", "type": "Adjektiv", "category": "Person", "level": "a2"},
+    {"word": "der Bahnhof", "type": "Nomen", "category": "Reisen", "level": "a2"},
+    {"word": "erklären", "type": "Verb", "category": "Kommunikation", "level": "a2"},
+    {"word": "die Mannschaft", "type": "Nomen", "category": "Freizeit", "level": "a2"},
+    # B1 Level
+    {"word": "die Fähigkeit", "type": "Nomen", "category": "Abstrakta", "level": "b1"},
+    {"word": "beeinflussen", "type": "Verb", "category": "Person", "level": "b1"},
+    {"word": "die Umweltverschmutzung", "type": "Nomen", "category": "Umwelt", "level": "b1"},
+    {"word": "verantwortlich", "type": "Adjektiv", "category": "Arbeit", "level": "b1"},
+    {"word": "die Gesellschaft", "type": "Nomen", "category": "Gesellschaft", "level": "b1"},
+    # B2 Level
+    {"word": "die Voraussetzung", "type": "Nomen", "category": "Ausbildung", "level": "b2"},
+    {"word": "wissenschaftlich", "type": "Adjektiv", "category": "Ausbildung", "level": "b2"},
+    {"word": "die Wirtschaft", "type": "Nomen", "category": "Wirtschaft", "level": "b2"},
+    {"word": "komplex", "type": "Adjektiv", "category": "Beschreibung", "level": "b2"},
+    {"word": "die Herausforderung", "type": "Nomen", "category": "Gesellschaft", "level": "b2"}
+]
+
+def _build_placement_test_payload():
+    """Process the fixed test words once and return the serialized JSON body and its ETag."""
     processed_words = []
-    for word_data in test_words.copy():
+    for word_data in PLACEMENT_TEST_WORDS:
         clean_word, article = separate_article_from_noun(word_data['word'])
         
         # Create processed word data
@@ -656,7 +1392,25 @@ def get_placement_test_questions():
         
         processed_words.append(processed_word)
 
-    return jsonify(processed_words)
+    # Same serialization as jsonify()
+    body = app.json.response(processed_words).get_data()
+    return body, hashlib.sha1(body).hexdigest()
+
+# The test is static, so it is processed and serialized once at startup
+PLACEMENT_TEST_BODY, PLACEMENT_TEST_ETAG = _build_placement_test_payload()
+
+@app.route('/api/placement-test/questions')
+def get_placement_test_questions():
+    """
+    Stellt eine feste Liste von Wörtern für den Einstufungstest bereit.
+    Die Wörter sind nach ansteigendem Schwierigkeitsgrad geordnet.
+    """
+    response = app.response_class(PLACEMENT_TEST_BODY, mimetype='application/json')
+    response.set_etag(PLACEMENT_TEST_ETAG)
+    # Always revalidate; unchanged payloads come back as 304 without a body
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @app.route('/api/placement-test/submit', methods=['POST'])
@@ -676,12 +1430,20 @@ def submit_placement_test(current_user):
         level = 'a1'
         
     # Speichere das Level im Profil des Benutzers
-    current_user.level = level
+    user = db.session.get(User, current_user.id)
+    user.level = level
     db.session.commit()
+    identity_cache.invalidate(user.id)
 
     return jsonify({'level': level})
 
 
+def _hasher_busy_response(busy):
+    response = jsonify({'message': 'Too many logins at once, please try again shortly.'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(busy.retry_after)
+    return response
+
 @app.route('/api/v2/login', methods=['POST'])
 def login_v2():
     data = request.get_json()
@@ -693,7 +1455,11 @@ def login_v2():
 
     user = User.query.filter_by(username=username).first()
 
-    if not user or not check_password_hash(user.password_hash, password):
+    try:
+        valid = user is not None and password_hasher.verify(user.password_hash, password)
+    except HasherBusy as busy:
+        return _hasher_busy_response(busy)
+    if not valid:
         return jsonify({'message': 'Invalid credentials'}), 401
     
     token = jwt.encode({
@@ -739,9 +1505,14 @@ def register_v2():
         except (ValueError, TypeError):
             parsed_age = None
 
+    try:
+        password_hash = password_hasher.hash(password)
+    except HasherBusy as busy:
+        return _hasher_busy_response(busy)
+
     new_user = User(
         username=username,
-        password_hash=generate_password_hash(password),
+        password_hash=password_hash,
         role=role
     )
     db.session.add(new_user)
@@ -759,28 +1530,327 @@ def register_v2():
     return jsonify({'message': 'User registered successfully'}), 201
 
 
+STUDENT_SORT_KEYS = ('username', 'level', 'last_played', 'wins', 'losses', 'games')
+_EPOCH = datetime(1970, 1, 1)
+
+def _encode_cursor(sort_value, user_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort_value, user_id]).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor, sort):
+    sort_value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    if sort == 'last_played':
+        sort_value = datetime.fromisoformat(sort_value)
+    return sort_value, int(user_id)
+
 @app.route('/api/v2/students_data')
 @teacher_token_required
 def get_students_data_v2(current_user):
-    students = User.query.filter_by(role='student').all()
+    """
+    Paginated student overview for the teacher dashboard.
+    Query parameters: limit (1-200, default 50), cursor (next_cursor of the previous page),
+    sort (username, level, last_played, wins, losses, games), order (asc/desc) and level.
+    Profiles with their materialized counters and the last game time come from one joined query.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+    except (TypeError, ValueError):
+        return jsonify({'message': 'limit must be a number'}), 400
+    sort = request.args.get('sort', 'username')
+    if sort not in STUDENT_SORT_KEYS:
+        return jsonify({'message': f"sort must be one of {', '.join(STUDENT_SORT_KEYS)}"}), 400
+    descending = request.args.get('order', 'asc').lower() == 'desc'
+    level = request.args.get('level')
+
+    games = (
+        db.session.query(GameLog.user_id.label('user_id'), func.max(GameLog.timestamp).label('last_played'))
+        .group_by(GameLog.user_id)
+        .subquery()
+    )
+    wins = func.coalesce(UserProfile.games_won, 0)
+    losses = func.coalesce(UserProfile.games_lost, 0)
+    sort_column = {
+        'username': User.username,
+        'level': func.coalesce(User.level, ''),
+        'last_played': func.coalesce(games.c.last_played, _EPOCH),
+        'wins': wins,
+        'losses': losses,
+        'games': wins + losses,
+    }[sort]
+
+    query = (
+        db.session.query(
+            User,
+            wins.label('wins'),
+            losses.label('losses'),
+            games.c.last_played,
+            func.coalesce(UserProfile.seen_count, 0).label('seen_words'),
+            func.coalesce(UserProfile.failed_count, 0).label('failed_words'),
+            sort_column.label('sort_key')
+        )
+        .outerjoin(User.profile)
+        .options(contains_eager(User.profile))
+        .outerjoin(games, games.c.user_id == User.id)
+        .filter(User.role == 'student')
+    )
+    if level:
+        query = query.filter(User.level == level)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after_value, after_id = _decode_cursor(cursor, sort)
+        except (ValueError, TypeError, binascii.Error):
+            return jsonify({'message': 'Invalid cursor'}), 400
+        if descending:
+            query = query.filter(or_(sort_column < after_value, and_(sort_column == after_value, User.id < after_id)))
+        else:
+            query = query.filter(or_(sort_column > after_value, and_(sort_column == after_value, User.id > after_id)))
+
+    order = (sort_column.desc(), User.id.desc()) if descending else (sort_column, User.id)
+    rows = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].sort_key, rows[-1][0].id)
+
     student_data = []
-    for student in students:
+    for student, student_wins, student_losses, last_played, seen_words, failed_words, _ in rows:
         profile = student.profile
         student_data.append({
             'username': student.username,
             'level': student.level,
             'age': profile.age if profile else None,
             'motherTongue': profile.mother_tongue if profile else None,
+            'games': {
+                'wins': int(student_wins),
+                'losses': int(student_losses),
+                'last_played': last_played.isoformat() if last_played else None
+            },
             'progress': {
-                'seen_words': len(profile.seen_words) if profile else 0,
-                'failed_words': len(profile.failed_words) if profile else 0,
+                'seen_words': seen_words,
+                'failed_words': failed_words,
                 'problem_letters': profile.problem_letters if profile else [],
                 'failed_word_types': profile.failed_word_types if profile else {},
                 'difficulty_modifier': round(profile.difficulty_modifier, 2) if profile else 1.0
             }
         })
-    return jsonify(student_data)
+    return jsonify({'students': student_data, 'next_cursor': next_cursor})
+
+
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+EXPORT_COLUMNS = ('id', 'timestamp', 'username', 'level', 'word', 'was_successful', 'wrong_guesses', 'wrong_letters')
+# Rows fetched per round trip and bytes collected before a chunk is sent
+EXPORT_BATCH_ROWS = int(os.environ.get('EXPORT_BATCH_ROWS', '1000'))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+def _parse_export_time(value):
+    """ISO date or datetime from a query parameter as naive UTC, like GameLog.timestamp."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@app.route('/api/v2/export/games')
+@teacher_token_required
+def export_games(current_user):
+    """
+    Stream the game history joined with usernames as NDJSON (default) or CSV.
+    Query parameters: format (ndjson/csv), from and to (ISO date or datetime, UTC, 'to'
+    exclusive), student (username) and level (the student's current level).
+    Rows are read in batches of EXPORT_BATCH_ROWS, so memory stays flat for any size.
+    """
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'message': 'format must be ndjson or csv'}), 400
+
+    query = (
+        db.session.query(
+            GameLog.id, GameLog.timestamp, User.username, User.level, GameLog.word,
+            GameLog.was_successful, GameLog.wrong_guesses, GameLog.wrong_letters
+        )
+        .join(User, User.id == GameLog.user_id)
+    )
+    try:
+        if request.args.get('from'):
+            query = query.filter(GameLog.timestamp >= _parse_export_time(request.args['from']))
+        if request.args.get('to'):
+            query = query.filter(GameLog.timestamp < _parse_export_time(request.args['to']))
+    except ValueError:
+        return jsonify({'message': 'from and to must be ISO dates, e.g. 2025-09-01'}), 400
+    if request.args.get('student'):
+        query = query.filter(User.username == request.args['student'])
+    if request.args.get('level'):
+        query = query.filter(User.level == request.args['level'])
+    query = query.order_by(GameLog.id).execution_options(yield_per=EXPORT_BATCH_ROWS)
+
+    def rows():
+        for row in query:
+            yield {
+                'id': row.id,
+                'timestamp': row.timestamp.isoformat() if row.timestamp else None,
+                'username': row.username,
+                'level': row.level,
+                'word': row.word,
+                'was_successful': bool(row.was_successful),
+                'wrong_guesses': row.wrong_guesses,
+                'wrong_letters': row.wrong_letters or []
+            }
 
+    def generate():
+        buffer = io.StringIO()
+        if export_format == 'csv':
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+        for number, record in enumerate(rows()):
+            if export_format == 'csv':
+                record['wrong_letters'] = ''.join(record['wrong_letters'])
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(record, ensure_ascii=False))
+                buffer.write('\n')
+            # The first row goes out at once so the download starts immediately
+            if number == 0 or buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    filename = f"spielverlauf-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    response = app.response_class(stream_with_context(generate()), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.cache_control.no_store = True
+    return response
+
+
+def _letter_confusion_summary(game_totals, letter_totals, limit):
+    """Games of a group and its letters ranked by wrong guesses per game."""
+    games, errors_total = game_totals
+    letters = [
+        {
+            'letter': letter,
+            'errors': errors,
+            'games': letter_games,
+            'errors_per_game': round(errors / games, 3) if games else 0.0,
+            'game_share': round(letter_games / games, 3) if games else 0.0,
+        }
+        for letter, (errors, letter_games) in letter_totals.items()
+    ]
+    letters.sort(key=lambda item: (-item['errors'], item['letter']))
+    return {'games': games, 'wrong_guesses': errors_total, 'letters': letters[:limit]}
+
+@app.route('/api/v2/letter_confusion')
+@teacher_token_required
+def get_letter_confusion(current_user):
+    """
+    Class-wide letter weaknesses from the ClassGameStat and ClassLetterStat counters, for
+    the whole class, per level, per mother tongue and per (level, mother tongue) group.
+    Query parameters: level, mother_tongue and limit (letters per entry, 1-50, default 10).
+    One query per counter table over its group index; GameLog is not read.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except (TypeError, ValueError):
+        return jsonify({'message': 'limit must be a number'}), 400
+    level = request.args.get('level')
+    if level and level.lower() not in LEVELS:
+        return jsonify({'message': f"level must be one of {', '.join(LEVELS)}"}), 400
+    mother_tongue = request.args.get('mother_tongue')
+
+    def group_filter(query, model):
+        if level:
+            query = query.filter(model.level == level.lower())
+        if mother_tongue is not None:
+            query = query.filter(model.mother_tongue == mother_tongue.strip())
+        return query
+
+    def scope_keys(row_level, row_tongue):
+        return (('class', None), ('level', row_level), ('mother_tongue', row_tongue),
+                ('group', (row_level, row_tongue)))
+
+    # scope -> key -> (games, wrong guesses), and scope -> key -> letter -> (errors, games)
+    game_scopes = {'class': {None: (0, 0)}, 'level': {}, 'mother_tongue': {}, 'group': {}}
+    letter_scopes = {'class': {}, 'level': {}, 'mother_tongue': {}, 'group': {}}
+    game_rows = group_filter(db.session.query(
+        ClassGameStat.level, ClassGameStat.mother_tongue, ClassGameStat.game_count, ClassGameStat.wrong_guesses
+    ), ClassGameStat)
+    for row_level, row_tongue, game_count, wrong_guesses in game_rows:
+        for scope, key in scope_keys(row_level, row_tongue):
+            games, errors = game_scopes[scope].get(key, (0, 0))
+            game_scopes[scope][key] = (games + game_count, errors + wrong_guesses)
+    letter_rows = group_filter(db.session.query(
+        ClassLetterStat.level, ClassLetterStat.mother_tongue, ClassLetterStat.letter,
+        ClassLetterStat.error_count, ClassLetterStat.game_count
+    ), ClassLetterStat)
+    for row_level, row_tongue, letter, error_count, game_count in letter_rows:
+        for scope, key in scope_keys(row_level, row_tongue):
+            totals = letter_scopes[scope].setdefault(key, {})
+            errors, games = totals.get(letter, (0, 0))
+            totals[letter] = (errors + error_count, games + game_count)
+
+    def summaries(scope):
+        return {key: _letter_confusion_summary(game_totals, letter_scopes[scope].get(key, {}), limit)
+                for key, game_totals in sorted(game_scopes[scope].items())}
+
+    return jsonify({
+        'class': summaries('class')[None],
+        'by_level': summaries('level'),
+        'by_mother_tongue': summaries('mother_tongue'),
+        'groups': [
+            {'level': group_level, 'mother_tongue': group_tongue, **summary}
+            for (group_level, group_tongue), summary in summaries('group').items()
+        ],
+    })
+
+@app.route('/api/v2/class_progress')
+@teacher_token_required
+def get_class_progress(current_user):
+    """
+    Class-wide failure charts of the teacher dashboard over all students, not just the
+    loaded page of /api/v2/students_data: the most failed words, the students with the
+    most failed words and the failed word types.
+    Query parameters: level and limit (entries per ranking, 1-50, default 10).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except (TypeError, ValueError):
+        return jsonify({'message': 'limit must be a number'}), 400
+    level = request.args.get('level')
+    if level and level.lower() not in LEVELS:
+        return jsonify({'message': f"level must be one of {', '.join(LEVELS)}"}), 400
+
+    students = db.session.query(User.username, UserProfile.failed_count, UserProfile.failed_word_types) \
+        .join(User.profile).filter(User.role == 'student')
+    # Failures per word from the ReviewSchedule counters, ranked in SQL; the client logs
+    # words lowercased, so spellings are merged
+    word = func.lower(ReviewSchedule.word)
+    failures = func.sum(ReviewSchedule.count)
+    words = db.session.query(word, failures) \
+        .join(User, User.id == ReviewSchedule.user_id).filter(User.role == 'student')
+    if level:
+        students = students.filter(User.level == level.lower())
+        words = words.filter(User.level == level.lower())
+    words = words.group_by(word).order_by(failures.desc(), word).limit(limit)
+
+    student_count = 0
+    by_student = []
+    failed_word_types = Counter()
+    for username, failed_count, word_types in students:
+        student_count += 1
+        if failed_count:
+            by_student.append({'username': username, 'failed_words': failed_count})
+        failed_word_types.update(word_types or {})
+    by_student.sort(key=lambda item: (-item['failed_words'], item['username']))
+
+    return jsonify({
+        'students': student_count,
+        'most_failed_words': [{'word': word, 'failures': int(count)} for word, count in words],
+        'students_by_failed_words': by_student[:limit],
+        'failed_word_types': dict(failed_word_types.most_common()),
+    })
 
 @app.route('/api/v2/user/<string:username>', methods=['DELETE'])
 @teacher_token_required
@@ -793,8 +1863,12 @@ def delete_user_v2(current_user, username):
     if not user_to_delete:
         return jsonify({'message': 'User not found'}), 404
 
+    user_id = user_to_delete.id
     db.session.delete(user_to_delete)
     db.session.commit()
+    identity_cache.invalidate(user_id)
+    word_queue.invalidate(user_id)
+    user_rows.invalidate(user_id)
 
     return jsonify({'message': f'User {username} deleted successfully'}), 200
 
@@ -821,6 +1895,7 @@ def set_student_difficulty(current_user, username):
     profile = get_user_profile(student.id)
     profile.difficulty_modifier = new_modifier
     db.session.commit()
+    identity_cache.invalidate(student.id)
 
     return jsonify({'message': f"Difficulty for {username} updated successfully."})
 
@@ -866,71 +1941,351 @@ def use_hint(current_user):
 
     # Deduct credit
     profile.hint_credits = max(0, (profile.hint_credits or 0) - 1)
+    bump_stats_version(profile)
     db.session.commit()
 
     return jsonify({'revealed_letter': chosen, 'hint_credits': profile.hint_credits})
 
 
+@app.route('/api/v2/metrics')
+@teacher_token_required
+def get_metrics(current_user):
+    """
+    Runtime metrics of this server process in Prometheus text format: request latency and
+    status codes, SQL statements per request, password hashing, word prefetching and the
+    CSV log queue. ?format=json returns the password hashing summary as JSON instead.
+    """
+    hashing = password_hasher.metrics()
+    if request.args.get('format') == 'json':
+        return jsonify({'password_hashing': hashing})
+
+    lines = request_metrics.render() if request_metrics is not None else []
+    lines += format_metric('dazhangai_password_hash_in_flight', 'gauge',
+                           'Password hashes queued or running.', [((), hashing['in_flight'])])
+    lines += format_metric('dazhangai_password_hash_max_pending', 'gauge',
+                           'Password hashes allowed to queue before answering 429.', [((), hashing['max_pending'])])
+    lines += format_metric('dazhangai_password_hashes_total', 'counter',
+                           'Password hashes by outcome.',
+                           [((('outcome', 'completed'),), hashing['completed']),
+                            ((('outcome', 'rejected'),), hashing['rejected']),
+                            ((('outcome', 'failed'),), hashing['failed']),
+                            ((('outcome', 'timed_out'),), hashing['timed_out'])])
+    lines += format_metric('dazhangai_word_queue_lookups_total', 'counter',
+                           'Prefetched word queue lookups by result.',
+                           [((('result', 'hit'),), word_queue.hits), ((('result', 'miss'),), word_queue.misses)])
+    lines += format_metric('dazhangai_word_selection_cache_lookups_total', 'counter',
+                           'Cached seen and review rows lookups of the scoring engine by result.',
+                           [((('result', 'hit'),), user_rows.hits), ((('result', 'miss'),), user_rows.misses)])
+    lines += format_metric('dazhangai_csv_log_dropped_rows_total', 'counter',
+                           'CSV log rows dropped because the write queue was full.', [((), csv_log.dropped)])
+    if request_profiler.enabled:
+        lines += format_metric('dazhangai_request_profiles_written_total', 'counter',
+                               'Request profiles written to the profile directory.', [((), request_profiler.written)])
+    response = app.response_class('\n'.join(lines) + '\n', mimetype='text/plain')
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
 # Serve React App
+# Manifest of the frontend build, created on first use (or by warm_caches) and never re-checked
+_static_manifest = None
+_static_manifest_lock = threading.Lock()
+# Brotli 5 compresses almost as well as 11 at a small fraction of the startup time
+STATIC_BROTLI_QUALITY = int(os.environ.get('STATIC_BROTLI_QUALITY', '5'))
+# The packaged desktop build serves localhost only, where compression buys nothing
+STATIC_PRECOMPRESS = os.environ.get('STATIC_PRECOMPRESS', 'false' if _is_frozen() else 'true').lower() == 'true'
+
+def get_static_manifest():
+    global _static_manifest
+    if _static_manifest is None:
+        with _static_manifest_lock:
+            if _static_manifest is None:
+                _static_manifest = StaticManifest.build(app.static_folder, brotli_quality=STATIC_BROTLI_QUALITY,
+                                                        compress=STATIC_PRECOMPRESS)
+    return _static_manifest
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder = app.static_folder or ''
-    if path != "" and os.path.exists(os.path.join(static_folder, path)):
-        return send_from_directory(static_folder, path)
+    manifest = get_static_manifest()
+    static_file = manifest.get(path) if path else None
+    if static_file is None:
+        # Client-side routes fall back to the single page app
+        static_file = manifest.get('index.html')
+        if static_file is None:
+            abort(404)
+
+    if static_file.bodies is None:
+        response = send_file(static_file.disk_path, mimetype=static_file.mimetype, etag=static_file.etag)
+        _set_static_cache_control(response, static_file)
+        return response
+
+    encoding = choose_encoding(static_file, request.accept_encodings)
+    response = app.response_class(static_file.bodies[encoding], mimetype=static_file.mimetype)
+    if encoding != 'identity':
+        response.content_encoding = encoding
+    # Every encoding is its own representation with its own ETag
+    response.set_etag(static_file.etag if encoding == 'identity' else f"{static_file.etag}-{encoding}")
+    if len(static_file.bodies) > 1:
+        response.vary.add('Accept-Encoding')
+    _set_static_cache_control(response, static_file)
+    return response.make_conditional(request, accept_ranges=True,
+                                     complete_length=len(static_file.bodies[encoding]))
+
+def _set_static_cache_control(response, static_file):
+    if static_file.immutable:
+        # Content-hashed file names change with every build
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
     else:
-        return send_from_directory(static_folder, 'index.html')
+        response.cache_control.no_cache = True
 
 def init_db():
+    # Server workers and CLI commands may import the app at the same time; migrate one at a time
+    with file_lock(os.path.join(DATA_DIR, '.init_db.lock')):
+        _init_db()
+
+def _add_missing_columns(table, columns):
+    """ALTER TABLE ... ADD COLUMN for every (name, ddl) pair the table does not have yet."""
+    existing = {c['name'] for c in inspect(db.engine).get_columns(table)}
+    added = []
+    with db.engine.begin() as connection:
+        for name, ddl in columns:
+            if name not in existing:
+                connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl};'))
+                added.append(name)
+    return added
+
+def _migrate_profile_columns():
+    _add_missing_columns('user_profile', [
+        ('difficulty_modifier', 'FLOAT NOT NULL DEFAULT 1.0'),
+        ('hint_credits', 'INTEGER NOT NULL DEFAULT 0'),
+        ('wins_since_last_hint', 'INTEGER NOT NULL DEFAULT 0'),
+        ('age', 'INTEGER'),
+        ('mother_tongue', 'VARCHAR(120)'),
+    ])
+
+def _migrate_letter_stats():
+    if LetterStat.query.first() is None and GameLog.query.first() is not None:
+        backfill_letter_stats()
+
+def _migrate_statistics_columns():
+    _add_missing_columns('user_profile', [
+        (counter, 'INTEGER NOT NULL DEFAULT 0')
+        for counter in ('games_won', 'games_lost', 'seen_count', 'failed_count', 'stats_version')
+    ])
+    # create_all() does not add indexes to tables that already exist
+    _create_index(GameLog, 'ix_game_log_user_result_time')
+
+def _migrate_game_event_ids():
+    _add_missing_columns('game_log', [('event_id', 'VARCHAR(64)')])
+    _create_index(GameLog, 'ix_game_log_user_event')
+
+def _migrate_class_game_totals():
+    # Group totals used to be ClassLetterStat rows with letter ''; create_all() made the new table
+    totals = ClassLetterStat.query.filter(ClassLetterStat.letter == '').all()
+    _upsert_counters(ClassGameStat, ('level', 'mother_tongue'), ('game_count', 'wrong_guesses'), [
+        {'level': total.level, 'mother_tongue': total.mother_tongue,
+         'game_count': total.game_count, 'wrong_guesses': total.error_count}
+        for total in totals
+    ])
+    ClassLetterStat.query.filter(ClassLetterStat.letter == '').delete()
+
+def _create_index(model, name):
+    # One named index: later steps may add indexes over columns that do not exist yet
+    index = next(index for index in model.__table__.indexes if index.name == name)
+    index.create(db.engine, checkfirst=True)
+
+# Ordered migrations for databases created before a change: (version, name, function,
+# changes_schema). A new column or index needs a new schema step at the end, a data move a
+# new data step. Data steps go through the current models, so all pending schema steps run
+# first. Fresh databases are created by create_all() at the latest version and skip them all.
+SCHEMA_MIGRATIONS = [
+    (1, 'user_profile: difficulty, hint credits, age, mother tongue', _migrate_profile_columns, True),
+    (2, 'failed_words JSON -> review_schedule', migrate_failed_words, False),
+    (3, 'seen_words JSON -> seen_word', migrate_seen_words, False),
+    (4, 'letter_stat backfill', _migrate_letter_stats, False),
+    (5, 'user_profile statistics counters, game_log index', _migrate_statistics_columns, True),
+    (6, 'statistics counters backfill', recount_user_statistics, False),
+    (7, 'class_letter_stat backfill', backfill_class_letter_stats, False),
+    (8, 'game_log event ids', _migrate_game_event_ids, True),
+    (9, 'class_letter_stat group totals -> class_game_stat', _migrate_class_game_totals, False),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+def get_applied_migrations():
+    """Versions recorded in schema_version; None for an empty database."""
+    inspector = inspect(db.engine)
+    if not inspector.has_table('schema_version'):
+        return set() if inspector.has_table('user') else None
+    return {version for (version,) in db.session.query(SchemaVersion.version)}
+
+def run_schema_migrations():
+    """
+    Bring the database to SCHEMA_VERSION and return the (version, name) pairs applied.
+    A current database costs one table probe and one query. Stops at the first failing
+    step, which is retried on the next start.
+    """
+    applied_versions = get_applied_migrations()
+    if applied_versions is not None and len(applied_versions) >= len(SCHEMA_MIGRATIONS):
+        return []
+    db.create_all()
+    if applied_versions is None:
+        for version, name, _, _ in SCHEMA_MIGRATIONS:
+            db.session.add(SchemaVersion(version=version, name=name))
+        db.session.commit()
+        return []
+
+    pending = [step for step in SCHEMA_MIGRATIONS if step[0] not in applied_versions]
+    # Schema steps first (in order), then data steps (in order)
+    pending.sort(key=lambda step: (not step[3], step[0]))
+    applied = []
+    for version, name, migrate, _ in pending:
+        try:
+            migrate()
+            db.session.add(SchemaVersion(version=version, name=name))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logging.exception('Schema migration %d (%s) failed', version, name)
+            break
+        applied.append((version, name))
+    return applied
+
+def ensure_teacher_account():
+    """Create the demo teacher account, or reset its password only if it no longer verifies."""
+    teacher_username = os.environ.get('TEACHER_USERNAME', 'Lehrer')
+    teacher_password = os.environ.get('TEACHER_PASSWORD', 'BWKI2025!')
+    teacher = User.query.filter_by(username=teacher_username).first()
+    if teacher is None:
+        db.session.add(User(
+            username=teacher_username,
+            password_hash=generate_password_hash(teacher_password),
+            role='teacher'
+        ))
+    else:
+        if not check_password_hash(teacher.password_hash, teacher_password):
+            teacher.password_hash = generate_password_hash(teacher_password)
+        teacher.role = 'teacher'
+    db.session.commit()
+
+def _init_db():
     with app.app_context():
-        db.create_all()
-        # Lightweight auto-migration for new columns on existing installs
         try:
-            from sqlalchemy import inspect, text
-            inspector = inspect(db.engine)
-            columns = {c['name'] for c in inspector.get_columns('user_profile')}
-            with db.engine.connect() as connection:
-                if 'difficulty_modifier' not in columns:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN difficulty_modifier FLOAT NOT NULL DEFAULT 1.0;'))
-                    columns.add('difficulty_modifier')
-                if 'hint_credits' not in columns:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN hint_credits INTEGER NOT NULL DEFAULT 0;'))
-                    columns.add('hint_credits')
-                if 'wins_since_last_hint' not in columns:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN wins_since_last_hint INTEGER NOT NULL DEFAULT 0;'))
-                    columns.add('wins_since_last_hint')
-                if 'age' not in columns:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN age INTEGER;'))
-                    columns.add('age')
-                if 'mother_tongue' not in columns:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN mother_tongue VARCHAR(120);'))
-                    columns.add('mother_tongue')
+            run_schema_migrations()
         except Exception:
             # Best-effort: never block app startup because of migration issues
-            pass
+            db.session.rollback()
+            logging.exception('Database initialization failed')
 
         # Ensure demo teacher account exists with known password
         try:
-            teacher_username = os.environ.get('TEACHER_USERNAME', 'Lehrer')
-            teacher_password = os.environ.get('TEACHER_PASSWORD', 'BWKI2025!')
-            teacher = User.query.filter_by(username=teacher_username).first()
-            if teacher is None:
-                teacher = User(
-                    username=teacher_username,
-                    password_hash=generate_password_hash(teacher_password),
-                    role='teacher'
-                )
-                db.session.add(teacher)
-            else:
-                teacher.password_hash = generate_password_hash(teacher_password)
-                teacher.role = 'teacher'
-            db.session.commit()
+            ensure_teacher_account()
         except Exception:
             # Do not block startup if teacher creation fails
-            pass
+            db.session.rollback()
+
+# Ensure DB is initialized when module is imported (e.g., via `flask run`).
+# Hashing pool workers started with spawn re-import this file as __mp_main__; they need no DB.
+# `serve` sets DAZHANGAI_INIT_DB=false once it has initialized, for processes that re-import.
+if __name__ != '__mp_main__' and os.environ.get('DAZHANGAI_INIT_DB', 'true').lower() == 'true':
+    init_db()
+
+def warm_caches():
+    """Load every level's word index (and scoring features), the hint lookup and the static manifest, so forked workers start warm."""
+    for level in LEVELS:
+        get_word_index(level)
+        if scoring_engine is not None:
+            get_word_features(level)
+    get_word_lookup()
+    get_static_manifest()
+
+@app.cli.command('compile-word-lists')
+@click.option('--level', 'levels', multiple=True, type=click.Choice(LEVELS),
+              help='Level to compile (repeatable); all levels by default.')
+def compile_word_lists_command(levels):
+    """Validate, deduplicate and normalize the JSON word lists and write the compiled <level>.bin files."""
+    failed = False
+    for level in levels or LEVELS:
+        json_path = os.path.join(WORDLISTS_DIR, f'{level}.json')
+        if not os.path.exists(json_path):
+            print(f"{level}: {json_path} nicht gefunden, übersprungen.")
+            continue
+        try:
+            output_path, words, duplicates = compile_word_list(level, json_path)
+        except (WordListError, ValueError) as exc:
+            failed = True
+            print(f"{level}: nicht kompiliert.")
+            for problem in getattr(exc, 'problems', [str(exc)]):
+                print(f"  {problem}")
+            continue
+        print(f"{level}: {words} Wörter ({duplicates} Duplikat(e) entfernt) -> {output_path} "
+              f"({os.path.getsize(output_path)} Bytes)")
+    if failed:
+        raise click.ClickException('Mindestens eine Wortliste enthält Fehler.')
+
+@app.cli.command('backfill-letter-stats')
+def backfill_letter_stats_command():
+    """Rebuild the per-user letter error counters from the full GameLog history."""
+    with app.app_context():
+        users = backfill_letter_stats()
+    print(f"Buchstabenstatistik für {users} Benutzer neu aufgebaut.")
+
+@app.cli.command('backfill-class-letter-stats')
+def backfill_class_letter_stats_command():
+    """Rebuild the class-wide letter error counters from the full GameLog history."""
+    with app.app_context():
+        groups = backfill_class_letter_stats()
+    print(f"Klassenweite Buchstabenstatistik für {groups} Gruppe(n) neu aufgebaut.")
 
-# Ensure DB is initialized when module is imported (e.g., via `flask run`)
-init_db()
+@app.cli.command('recount-statistics')
+def recount_statistics_command():
+    """Recompute the wins/losses/seen/failed counters of every profile."""
+    with app.app_context():
+        profiles = recount_user_statistics()
+    print(f"Statistikzähler für {profiles} Profil(e) neu berechnet.")
+
+@app.cli.command('serve')
+@click.option('--bind', default=lambda: os.environ.get('SERVE_BIND', '0.0.0.0:8000'), show_default='0.0.0.0:8000',
+              help='Address:port to listen on (SERVE_BIND).')
+@click.option('--workers', type=int, default=lambda: int(os.environ.get('SERVE_WORKERS', str(min(4, (os.cpu_count() or 1) * 2)))),
+              show_default='min(4, 2 x CPUs)', help='Worker processes, Gunicorn only (SERVE_WORKERS).')
+@click.option('--threads', type=int, default=lambda: int(os.environ.get('SERVE_THREADS', '4')), show_default='4',
+              help='Threads per worker (SERVE_THREADS).')
+@click.option('--timeout', type=int, default=lambda: int(os.environ.get('SERVE_TIMEOUT', '60')), show_default='60',
+              help='Seconds before a stuck worker is restarted, Gunicorn only (SERVE_TIMEOUT).')
+@click.option('--server', type=click.Choice(['auto', 'gunicorn', 'waitress']), default='auto', show_default=True)
+def serve_command(bind, workers, threads, timeout, server):
+    """Run the app under a production WSGI server (Gunicorn with several workers, or Waitress)."""
+    try:
+        server = available_server(server)
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc))
+
+    # The database was initialized when this module was imported; make sure it happened
+    # here, once, and never again in the workers
+    if os.environ.get('DAZHANGAI_INIT_DB', 'true').lower() != 'true':
+        init_db()
+    os.environ['DAZHANGAI_INIT_DB'] = 'false'
+    warm_caches()
+
+    def _post_fork():
+        # Never share pooled connections with the parent process
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+    with app.app_context():
+        db.engine.dispose()
+
+    logging.info('Serving DaZHangAI with %s on %s (%d worker(s), %d thread(s))',
+                 server, bind, workers if server == 'gunicorn' else 1, threads)
+    if server == 'gunicorn':
+        run_gunicorn(app, bind, workers, threads, timeout, post_fork=_post_fork)
+    else:
+        run_waitress(app, bind, threads)
 
 def _pick_port(preferred: int = 5000) -> int:
     def is_free(p: int) -> bool:
@@ -980,5 +2335,15 @@ if __name__ == '__main__':
         except Exception:
             logging.warning('Auto-open browser failed', exc_info=True)
 
+    # Load word lists and the frontend build while the server starts; a request that
+    # arrives first waits only for the part it needs
+    def _warm():
+        try:
+            with app.app_context():
+                warm_caches()
+        except Exception:
+            logging.warning('Warming the caches failed', exc_info=True)
+
+    threading.Thread(target=_warm, name='warm-caches', daemon=True).start()
     threading.Timer(1.0, _open).start()
     app.run(host=host, port=port, debug=False)
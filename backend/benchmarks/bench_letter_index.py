@@ -0,0 +1,75 @@
+"""
+Micro-benchmark for the KI-Modus candidate selection.
+
+Compares the old per-request scan (any(char in word.lower() ...)) with the letter
+bitmask scan and the inverted letter index of WordIndex on synthetic word lists of
+growing size. Run from the backend directory:
+
+    python benchmarks/bench_letter_index.py [--sizes 1000,10000,50000] [--repeat 200]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_index import WordIndex  # noqa: E402
+
+# Rough German letter frequencies so common and rare letters both show up
+ALPHABET = 'eeeeeeennnnniiiiissssrrrraaaatttdddhhhuuulllcccgggmmoobbwwffkkzzpvüäößjyxq'
+TYPES = ['Nomen', 'Verb', 'Adjektiv']
+
+
+def synthetic_words(size, seed=42):
+    rng = random.Random(seed)
+    words = []
+    for i in range(size):
+        length = rng.randint(3, 14)
+        word = ''.join(rng.choice(ALPHABET) for _ in range(length))
+        words.append({'word': f'{word}{i}', 'type': rng.choice(TYPES), 'category': 'Synthetisch'})
+    return words
+
+
+def naive(raw_words, problem_letters):
+    return [item for item in raw_words if any(char in item['word'].lower() for char in problem_letters)]
+
+
+def mask_scan(index, problem_letters):
+    mask = index.letter_mask(problem_letters)
+    return [entry for entry in index.entries if entry.mask & mask]
+
+
+def inverted(index, problem_letters):
+    return index.with_any_letter(problem_letters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='1000,10000,50000,200000')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    scenarios = {
+        'rare (q, x)': ['q', 'x'],
+        'umlauts (ä, ö, ü)': ['ä', 'ö', 'ü'],
+        'common (e, n, s)': ['e', 'n', 's'],
+    }
+    print(f"{'words':>8}  {'letters':<18} {'naive ms':>9} {'mask ms':>9} {'index ms':>9} {'matches':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        raw_words = synthetic_words(size)
+        index = WordIndex.from_words('bench', raw_words)
+        for label, letters in scenarios.items():
+            expected = [item['word'] for item in naive(raw_words, letters)]
+            assert [e.word for e in mask_scan(index, letters)] == expected
+            assert [e.word for e in inverted(index, letters)] == expected
+            timings = []
+            for fn, arg in ((naive, raw_words), (mask_scan, index), (inverted, index)):
+                seconds = min(timeit.repeat(lambda: fn(arg, letters), number=1, repeat=args.repeat))
+                timings.append(seconds * 1000)
+            print(f"{size:>8}  {label:<18} {timings[0]:>9.3f} {timings[1]:>9.3f} {timings[2]:>9.3f} {len(expected):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+"""
+HTTP load test of the backend.
+
+Creates a temporary SQLite database with --students students and synthetic word lists
+(--words per level), starts the app in a separate server process and drives it for
+--duration seconds:
+
+    students  full rounds: GET /api/word, one POST /api/log_guess per guessed letter,
+              POST /api/log_game, GET /api/user/statistics
+    teachers  GET /api/v2/students_data every --poll-interval seconds
+
+Reports throughput and p50/p95/p99 latency per endpoint (requests of the --warmup
+period are not counted). --save writes the results as JSON, --compare reads such a
+file and flags endpoints whose p95 or throughput got worse by more than --tolerance
+(exit code 1), so a committed baseline turns regressions into diffs. Run from the
+backend directory:
+
+    python benchmarks/bench_load.py [--students 20] [--teachers 1] [--duration 30]
+        [--server dev|serve] [--save benchmarks/load_baseline.json]
+        [--compare benchmarks/load_baseline.json]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp = tempfile.mkdtemp(prefix='dazhangai-load-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'load.db')
+os.environ['WORDLISTS_DIR'] = os.path.join(_tmp, 'word_lists')
+os.environ['CSV_LOG_DIR'] = _tmp
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-only-secret-key-0123456789abcdef')
+os.environ.setdefault('TEACHER_USERNAME', 'Lehrer')
+os.environ.setdefault('TEACHER_PASSWORD', 'benchmark-teacher-password')
+
+LEVELS = ['a1', 'a2', 'b1', 'b2', 'c1']
+ALPHABET = 'abcdefghijklmnopqrstuvwxyzäöüß'
+WORD_LETTERS = 'aaabcdeeeefghiijklmnnoprrsssttuuvwzäöüß'
+TYPES = ['Nomen', 'Nomen', 'Verb', 'Adjektiv', 'Adverb']
+MOTHER_TONGUES = ['Arabisch', 'Türkisch', 'Ukrainisch', 'Englisch', 'Polnisch']
+PASSWORD = 'klasse-5b-passwort'
+MAX_WRONG_GUESSES = 6
+
+
+def write_word_lists(directory, per_level, seed=1):
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for level_number, level in enumerate(LEVELS):
+        words = set()
+        while len(words) < per_level:
+            length = rng.randint(3 + level_number, 8 + 2 * level_number)
+            words.add(''.join(rng.choice(WORD_LETTERS) for _ in range(length)))
+        entries = []
+        for word in sorted(words):
+            word_type = rng.choice(TYPES)
+            if word_type == 'Nomen':
+                word = rng.choice(['der ', 'die ', 'das ']) + word.capitalize()
+            entries.append({'word': word, 'type': word_type, 'category': 'Lasttest'})
+        with open(os.path.join(directory, f'{level}.json'), 'w', encoding='utf-8') as f:
+            json.dump({'words': entries}, f, ensure_ascii=False)
+
+
+def create_students(count, seed=1):
+    import app as dazhangai
+    rng = random.Random(seed)
+    with dazhangai.app.app_context():
+        password_hash = dazhangai.generate_password_hash(PASSWORD)
+        for i in range(count):
+            user = dazhangai.User(username=f'load{i}', password_hash=password_hash, role='student',
+                                  level=LEVELS[i % len(LEVELS)])
+            dazhangai.db.session.add(user)
+            dazhangai.db.session.flush()
+            dazhangai.db.session.add(dazhangai.UserProfile(
+                user_id=user.id, age=rng.randint(8, 16), mother_tongue=rng.choice(MOTHER_TONGUES)))
+        dazhangai.db.session.commit()
+        # The server process opens its own connections
+        dazhangai.db.engine.dispose()
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, port, workers, threads):
+    env = dict(os.environ)
+    if kind == 'serve':
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'serve', '--bind', f'127.0.0.1:{port}',
+                   '--workers', str(workers), '--threads', str(threads)]
+    else:
+        # Threaded werkzeug server, like `python app.py` minus the browser window
+        command = [sys.executable, '-c',
+                   'import logging, app; from werkzeug.serving import run_simple; '
+                   'logging.getLogger("werkzeug").setLevel(logging.ERROR); '
+                   f'run_simple("127.0.0.1", {port}, app.app, threaded=True)']
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError('server did not start')
+
+
+class Recorder:
+    """Latencies per endpoint, counted only inside the measurement window."""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.latencies = {}
+        self.errors = {}
+        self.rounds = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, started, elapsed, ok):
+        if not (self.start <= started < self.end):
+            return
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def round_finished(self):
+        if self.start <= time.monotonic() < self.end:
+            with self._lock:
+                self.rounds += 1
+
+
+class Client:
+    """One keep-alive connection, as a browser tab would hold."""
+
+    def __init__(self, port, recorder, token=None):
+        self.port = port
+        self.recorder = recorder
+        self.token = token
+        self.connection = None
+
+    def request(self, method, path, payload=None, endpoint=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        started = time.monotonic()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            data, status = b'', 599
+        elapsed = time.monotonic() - started
+        if self.recorder is not None:
+            self.recorder.record(endpoint or f"{method} {path.split('?')[0]}", started, elapsed, status < 400)
+        return status, data
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def login(port, username, password):
+    client = Client(port, None)
+    for _ in range(50):
+        status, body = client.request('POST', '/api/v2/login', {'username': username, 'password': password})
+        if status == 200:
+            client.close()
+            return json.loads(body)['token']
+        if status != 429:
+            raise RuntimeError(f'login of {username} failed with {status}: {body[:200]!r}')
+        time.sleep(0.5)
+    raise RuntimeError(f'login of {username} kept getting 429')
+
+
+def play_rounds(client, level, stop, think, rng):
+    while not stop.is_set():
+        status, body = client.request('GET', f'/api/word?level={level}')
+        if status != 200:
+            time.sleep(0.1)
+            continue
+        data = json.loads(body)
+        word = data['word'].lower()
+        guessed = set(data.get('pre_revealed_letters') or [])
+        missing = [letter for letter in set(word) if letter not in guessed]
+        wrong_pool = [letter for letter in ALPHABET
+                      if letter not in word and letter not in (data.get('excluded_letters') or [])]
+        rng.shuffle(missing)
+        rng.shuffle(wrong_pool)
+        wrong_letters = []
+        while missing and len(wrong_letters) < MAX_WRONG_GUESSES and not stop.is_set():
+            correct = rng.random() < 0.65 or not wrong_pool
+            letter = missing.pop() if correct else wrong_pool.pop()
+            if not correct:
+                wrong_letters.append(letter)
+            client.request('POST', '/api/log_guess', {'word': word, 'letter': letter, 'isCorrect': correct})
+            if think:
+                time.sleep(think)
+        client.request('POST', '/api/log_game', {
+            'word': word,
+            'wordType': data.get('type'),
+            'wasSuccessful': not missing,
+            'wrongGuesses': len(wrong_letters),
+            'wrongLetters': wrong_letters,
+        })
+        client.request('GET', '/api/user/statistics')
+        client.recorder.round_finished()
+        if think:
+            time.sleep(think)
+
+
+def poll_students(client, stop, interval):
+    while not stop.is_set():
+        client.request('GET', '/api/v2/students_data?limit=50&sort=last_played&order=desc')
+        stop.wait(interval)
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))]
+
+
+def summarize(recorder, seconds):
+    endpoints = {}
+    everything = []
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        everything.extend(latencies)
+        endpoints[endpoint] = {
+            'requests': len(latencies),
+            'errors': recorder.errors.get(endpoint, 0),
+            'throughput_rps': round(len(latencies) / seconds, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        }
+    everything.sort()
+    total = {
+        'requests': len(everything),
+        'errors': sum(recorder.errors.values()),
+        'throughput_rps': round(len(everything) / seconds, 2),
+        'rounds_per_s': round(recorder.rounds / seconds, 2),
+    }
+    if everything:
+        total.update({
+            'p50_ms': round(percentile(everything, 50) * 1000, 2),
+            'p95_ms': round(percentile(everything, 95) * 1000, 2),
+            'p99_ms': round(percentile(everything, 99) * 1000, 2),
+        })
+    return endpoints, total
+
+
+def print_table(endpoints, total):
+    print(f"{'endpoint':<30} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}   (ms)")
+    for endpoint, row in endpoints.items():
+        print(f"{endpoint:<30} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+    print(f"{'total':<30} {total['requests']:>9} {total['errors']:>7} {total['throughput_rps']:>8.1f} "
+          f"{total.get('p50_ms', 0):>8.1f} {total.get('p95_ms', 0):>8.1f} {total.get('p99_ms', 0):>8.1f}")
+    print(f"rounds per second: {total['rounds_per_s']:.2f}")
+
+
+def compare(endpoints, baseline_path, tolerance):
+    """Print the change against a saved run; returns the endpoints that regressed."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['endpoints']
+    regressions = []
+    print(f"\n{'endpoint':<30} {'p95 base':>9} {'p95 now':>9} {'change':>8} {'req/s base':>11} {'req/s now':>10} {'change':>8}")
+    for endpoint in sorted(set(endpoints) | set(baseline)):
+        now, base = endpoints.get(endpoint), baseline.get(endpoint)
+        if now is None or base is None:
+            print(f"{endpoint:<30} {'only in ' + ('baseline' if now is None else 'this run'):>30}")
+            continue
+        p95_change = (now['p95_ms'] - base['p95_ms']) / base['p95_ms'] if base['p95_ms'] else 0.0
+        rps_change = ((now['throughput_rps'] - base['throughput_rps']) / base['throughput_rps']
+                      if base['throughput_rps'] else 0.0)
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        if regressed:
+            regressions.append(endpoint)
+        print(f"{endpoint:<30} {base['p95_ms']:>9.1f} {now['p95_ms']:>9.1f} {p95_change:>+8.0%} "
+              f"{base['throughput_rps']:>11.1f} {now['throughput_rps']:>10.1f} {rps_change:>+8.0%}"
+              f"{'   REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--students', type=int, default=20)
+    parser.add_argument('--teachers', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5.0, help='seconds before measuring starts')
+    parser.add_argument('--think', type=float, default=0.0, help='seconds between a student\'s requests')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds between teacher polls')
+    parser.add_argument('--words', type=int, default=2000, help='synthetic words per level')
+    parser.add_argument('--server', choices=['dev', 'serve'], default='dev',
+                        help='dev: threaded werkzeug server; serve: `flask serve` (Gunicorn/Waitress)')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes for --server serve')
+    parser.add_argument('--threads', type=int, default=4, help='threads per worker for --server serve')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', help='write the results as JSON to this path')
+    parser.add_argument('--compare', help='JSON file of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    write_word_lists(os.environ['WORDLISTS_DIR'], args.words, args.seed)
+    create_students(args.students, args.seed)
+    port = free_port()
+    server = start_server(args.server, port, args.workers, args.threads)
+    try:
+        student_tokens = [login(port, f'load{i}', PASSWORD) for i in range(args.students)]
+        teacher_token = login(port, os.environ['TEACHER_USERNAME'], os.environ['TEACHER_PASSWORD'])
+
+        start = time.monotonic() + args.warmup
+        recorder = Recorder(start, start + args.duration)
+        stop = threading.Event()
+        threads, clients = [], []
+        for i, token in enumerate(student_tokens):
+            client = Client(port, recorder, token)
+            clients.append(client)
+            rng = random.Random(args.seed * 1000 + i)
+            threads.append(threading.Thread(
+                target=play_rounds, args=(client, LEVELS[i % len(LEVELS)], stop, args.think, rng)))
+        for _ in range(args.teachers):
+            client = Client(port, recorder, teacher_token)
+            clients.append(client)
+            threads.append(threading.Thread(target=poll_students, args=(client, stop, args.poll_interval)))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.warmup + args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        # Open keep-alive connections would hold up a graceful shutdown
+        for client in clients:
+            client.close()
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        shutil.rmtree(_tmp, ignore_errors=True)
+
+    endpoints, total = summarize(recorder, args.duration)
+    print(f"{args.students} students, {args.teachers} teacher(s), {args.server} server, "
+          f"{args.duration:.0f} s measured after {args.warmup:.0f} s warm-up")
+    print_table(endpoints, total)
+
+    if args.save:
+        result = {
+            'settings': {
+                'students': args.students,
+                'teachers': args.teachers,
+                'duration_s': args.duration,
+                'think_s': args.think,
+                'poll_interval_s': args.poll_interval,
+                'words_per_level': args.words,
+                'server': args.server,
+                'workers': args.workers if args.server == 'serve' else 1,
+                'threads': args.threads if args.server == 'serve' else None,
+            },
+            'machine': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'endpoints': endpoints,
+            'total': total,
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nResults written to {args.save}")
+
+    if args.compare:
+        regressions = compare(endpoints, args.compare, args.tolerance)
+        if regressions:
+            print(f"\nRegressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
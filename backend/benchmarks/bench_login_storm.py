@@ -0,0 +1,141 @@
+"""
+Login storm next to game traffic.
+
+Starts the app on a temporary SQLite database in a threaded werkzeug server, keeps a few
+players requesting /api/word, and lets --logins students log in at the same instant.
+Compares hashing inline on the request threads (the previous behaviour, no cap) with
+the process pool. Run from the backend directory:
+
+    python benchmarks/bench_login_storm.py [--logins 50] [--players 4] [--workers 2] [--max-pending 16]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix='dazhangai-bench-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'bench.db')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-only-secret-key-0123456789abcdef')
+
+from werkzeug.serving import make_server  # noqa: E402
+
+import app as dazhangai  # noqa: E402
+from password_hasher import PasswordHasher  # noqa: E402
+
+PASSWORD = 'klasse-5b-passwort'
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def request(base, path, payload=None, token=None):
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    req = urllib.request.Request(base + path, data=data, headers=headers, method='POST' if data else 'GET')
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        body = exc.read()
+        status = exc.code
+    return status, time.perf_counter() - started, body
+
+
+def create_students(count):
+    with dazhangai.app.app_context():
+        password_hash = dazhangai.generate_password_hash(PASSWORD)
+        for i in range(count):
+            user = dazhangai.User(username=f'bench{i}', password_hash=password_hash, role='student', level='a1')
+            dazhangai.db.session.add(user)
+            dazhangai.db.session.flush()
+            dazhangai.db.session.add(dazhangai.UserProfile(user_id=user.id))
+        dazhangai.db.session.commit()
+
+
+def run(base, label, hasher, logins, players, settle):
+    dazhangai.password_hasher = hasher
+    status, _, body = request(base, '/api/v2/login', {'username': 'bench0', 'password': PASSWORD})
+    assert status == 200, body
+    token = json.loads(body)['token']
+
+    stop = threading.Event()
+    storm = threading.Event()
+    word_before, word_during = [], []
+
+    def player():
+        while not stop.is_set():
+            status, elapsed, _ = request(base, '/api/word?level=a1', token=token)
+            if status == 200:
+                (word_during if storm.is_set() else word_before).append(elapsed)
+
+    login_results = []
+    barrier = threading.Barrier(logins)
+
+    def student(i):
+        barrier.wait()
+        status, elapsed, _ = request(base, '/api/v2/login', {'username': f'bench{i}', 'password': PASSWORD})
+        login_results.append((status, elapsed))
+
+    player_threads = [threading.Thread(target=player) for _ in range(players)]
+    for t in player_threads:
+        t.start()
+    time.sleep(settle)
+    storm.set()
+    student_threads = [threading.Thread(target=student, args=(i,)) for i in range(logins)]
+    for t in student_threads:
+        t.start()
+    for t in student_threads:
+        t.join()
+    stop.set()
+    for t in player_threads:
+        t.join()
+    hasher.shutdown()
+
+    ok = [elapsed for status, elapsed in login_results if status == 200]
+    busy = sum(1 for status, _ in login_results if status == 429)
+    print(f"{label:<8} {len(ok):>4} {busy:>5} {percentile(ok, 50) * 1000:>10.0f} {percentile(ok, 95) * 1000:>10.0f} "
+          f"{percentile(word_before, 95) * 1000:>12.1f} {percentile(word_during, 50) * 1000:>12.1f} "
+          f"{percentile(word_during, 95) * 1000:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=16)
+    parser.add_argument('--settle', type=float, default=1.0, help='seconds of game traffic before the storm')
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    create_students(args.logins)
+    server = make_server('127.0.0.1', 0, dazhangai.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    print(f"{'mode':<8} {'ok':>4} {'429':>5} {'login p50':>10} {'login p95':>10} "
+          f"{'word p95 pre':>12} {'word p50':>12} {'word p95':>12}   (ms)")
+    run(base, 'inline', PasswordHasher(workers=0, max_pending=10 ** 6), args.logins, args.players, args.settle)
+    run(base, 'pool', PasswordHasher(workers=args.workers, max_pending=args.max_pending),
+        args.logins, args.players, args.settle)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
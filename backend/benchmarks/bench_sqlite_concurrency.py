@@ -0,0 +1,156 @@
+"""
+Concurrency benchmark for the SQLite storage configuration.
+
+Simulates a class finishing rounds at the same time: writer threads run log_game-like
+transactions (insert a game row, update the player's profile) while reader threads
+run statistics-style COUNT queries. Each scenario runs on a fresh temporary database:
+
+    legacy      bare create_engine() as the app used before (rollback journal)
+    wal         storage.engine_options() + WAL / busy_timeout / synchronous pragmas
+    wal+serial  as wal, plus the in-process WriteSerializer
+
+Run from the backend directory:
+
+    python benchmarks/bench_sqlite_concurrency.py [--writers 30] [--readers 10] [--seconds 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, create_engine, func, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import declarative_base, sessionmaker, scoped_session  # noqa: E402
+
+import storage  # noqa: E402
+
+Base = declarative_base()
+
+
+class Profile(Base):
+    __tablename__ = 'profile'
+    id = Column(Integer, primary_key=True)
+    games = Column(Integer, nullable=False, default=0)
+
+
+class Game(Base):
+    __tablename__ = 'game'
+    id = Column(Integer, primary_key=True)
+    profile_id = Column(Integer, ForeignKey('profile.id'), nullable=False, index=True)
+    word = Column(String(200), nullable=False)
+    won = Column(Boolean, nullable=False)
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def build(scenario, url, pool_size):
+    # Every scenario gets one pooled connection per thread, so waiting for a pool
+    # checkout does not hide the difference between the journal/locking setups
+    if scenario == 'legacy':
+        engine = create_engine(url, pool_size=pool_size, max_overflow=0)
+    else:
+        options = storage.engine_options(url)
+        options.update(pool_size=pool_size, max_overflow=0)
+        engine = create_engine(url, **options)
+        storage.install_sqlite_pragmas(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    if scenario == 'wal+serial':
+        storage.WriteSerializer().install(session)
+    return engine, session
+
+
+def run(scenario, writers, readers, seconds):
+    directory = tempfile.mkdtemp(prefix='dazhangai-bench-')
+    url = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    engine, Session = build(scenario, url, writers + readers)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Profile.__table__.insert(), [{'id': i + 1, 'games': 0} for i in range(writers)])
+
+    stop = time.monotonic() + seconds
+    write_latencies, read_latencies = [], []
+    errors = {'locked': 0, 'other': 0}
+    lock = threading.Lock()
+
+    def writer(profile_id):
+        n = 0
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            session = Session()
+            try:
+                profile = session.get(Profile, profile_id)
+                session.add(Game(profile_id=profile_id, word=f'wort{n}', won=n % 2 == 0))
+                profile.games += 1
+                session.commit()
+                with lock:
+                    write_latencies.append(time.perf_counter() - started)
+            except OperationalError as exc:
+                session.rollback()
+                with lock:
+                    errors['locked' if 'locked' in str(exc) else 'other'] += 1
+            finally:
+                Session.remove()
+            n += 1
+
+    def reader(profile_id):
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            session = Session()
+            try:
+                session.execute(select(func.count(Game.id)).where(Game.profile_id == profile_id)).scalar()
+                with lock:
+                    read_latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                with lock:
+                    errors['locked'] += 1
+            finally:
+                Session.remove()
+
+    threads = [threading.Thread(target=writer, args=(i + 1,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i % writers + 1,)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    return {
+        'scenario': scenario,
+        'commits_per_s': len(write_latencies) / seconds,
+        'reads_per_s': len(read_latencies) / seconds,
+        'write_p50_ms': percentile(write_latencies, 50) * 1000,
+        'write_p95_ms': percentile(write_latencies, 95) * 1000,
+        'read_p95_ms': percentile(read_latencies, 95) * 1000,
+        'locked_errors': errors['locked'],
+        'other_errors': errors['other'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--writers', type=int, default=30)
+    parser.add_argument('--readers', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--scenarios', default='legacy,wal,wal+serial')
+    args = parser.parse_args()
+
+    header = f"{'scenario':<11} {'commit/s':>9} {'read/s':>9} {'w p50 ms':>9} {'w p95 ms':>9} {'r p95 ms':>9} {'locked':>7}"
+    print(header)
+    for scenario in args.scenarios.split(','):
+        r = run(scenario, args.writers, args.readers, args.seconds)
+        print(f"{r['scenario']:<11} {r['commits_per_s']:>9.1f} {r['reads_per_s']:>9.1f} {r['write_p50_ms']:>9.2f} "
+              f"{r['write_p95_ms']:>9.2f} {r['read_p95_ms']:>9.2f} {r['locked_errors']:>7}")
+    print(f"({args.writers} writer / {args.readers} reader threads, {args.seconds:g}s per scenario)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark.
+
+Measures how long a new process needs until the app can answer, on a first run (empty
+database, everything gets created and the teacher password hashed) and on a warm
+database (already at the current schema version). Every measurement is a fresh process:
+
+    import    python -c "import app"  (module import incl. init_db)
+    server    python app.py, the dev server / desktop entry point, until /api/hint answers
+    exe       the packaged DaZHangAI.exe until /api/hint answers (only with --exe)
+
+Run from the backend directory:
+
+    python benchmarks/bench_startup.py [--repeat 5] [--exe path/to/DaZHangAI.exe]
+"""
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(process, port, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    url = f'http://127.0.0.1:{port}/api/hint?word=Apfel'
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'process exited with {process.returncode}')
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError('server did not become ready')
+
+
+def environment(data_dir):
+    env = dict(os.environ)
+    env['DATABASE_URL'] = 'sqlite:///' + os.path.join(data_dir, 'database.db')
+    # The packaged build keeps its database under %LOCALAPPDATA%\DaZHangAI
+    env['LOCALAPPDATA'] = data_dir
+    env.setdefault('JWT_SECRET_KEY', 'benchmark-only-secret-key-0123456789abcdef')
+    # Keep the entry points from opening a real browser window
+    env['BROWSER'] = 'true' if os.name != 'nt' else 'cmd /c exit'
+    return env
+
+
+def start_import(data_dir):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=BACKEND_DIR, env=environment(data_dir),
+                   check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def start_server(command, data_dir):
+    port = free_port()
+    env = environment(data_dir)
+    env['PORT'] = str(port)
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(process, port)
+        return time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def measure(starter, repeat):
+    first_run, warm = [], []
+    for _ in range(repeat):
+        data_dir = tempfile.mkdtemp(prefix='dazhangai-startup-')
+        try:
+            first_run.append(starter(data_dir))
+            warm.append(starter(data_dir))
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return statistics.median(first_run), statistics.median(warm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--exe', help='path to the packaged DaZHangAI.exe')
+    args = parser.parse_args()
+
+    scenarios = [
+        ('import', start_import),
+        ('server', lambda data_dir: start_server([sys.executable, 'app.py'], data_dir)),
+    ]
+    if args.exe:
+        scenarios.append(('exe', lambda data_dir: start_server([os.path.abspath(args.exe)], data_dir)))
+
+    print(f"{'entry point':<12} {'first run s':>12} {'warm db s':>10}   (median of {args.repeat})")
+    for label, starter in scenarios:
+        first_run, warm = measure(starter, args.repeat)
+        print(f"{label:<12} {first_run:>12.2f} {warm:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Word selection on a large level.
+
+Writes a synthetic word list (--words entries) to a temporary directory, gives a test
+student --seen played words and --due due reviews, and times picking one word with the
+Python cascade and with the numpy scoring engine (cascade and adaptive presets). The
+"select_words" columns include the seen/due database reads; "engine" is the scoring
+step alone on a prepared state. Run from the backend directory:
+
+    python benchmarks/bench_word_selection.py [--words 50000] [--seen 2000] [--repeat 500]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix='dazhangai-bench-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'bench.db')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-only-secret-key-0123456789abcdef')
+
+import app as dazhangai  # noqa: E402
+from word_scoring import ScoringEngine, SelectionState  # noqa: E402
+
+LETTERS = 'aaabcdeeeefghiijklmnnoprrsssttuuvwzäöüß'
+TYPES = ['Nomen', 'Nomen', 'Verb', 'Adjektiv', 'Adverb']
+
+
+def synthetic_words(count, seed=1):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(LETTERS) for _ in range(rng.randint(3, 14))))
+    result = []
+    for word in sorted(words):
+        word_type = rng.choice(TYPES)
+        if word_type == 'Nomen':
+            word = rng.choice(['der ', 'die ', 'das ']) + word.capitalize()
+        result.append({'word': word, 'type': word_type, 'category': 'Benchmark'})
+    return result
+
+
+def timed(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+    return statistics.median(durations) * 1000, durations[int(0.95 * (len(durations) - 1))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--words', type=int, default=50000)
+    parser.add_argument('--seen', type=int, default=2000)
+    parser.add_argument('--due', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    words_dir = os.path.join(_tmp, 'word_lists')
+    os.makedirs(words_dir)
+    with open(os.path.join(words_dir, 'a1.json'), 'w', encoding='utf-8') as f:
+        json.dump({'words': synthetic_words(args.words)}, f, ensure_ascii=False)
+    dazhangai.WORDLISTS_DIR = words_dir
+
+    with dazhangai.app.app_context():
+        index = dazhangai.get_word_index('a1')
+        user = dazhangai.User(username='bench', password_hash='-', role='student', level='a1')
+        dazhangai.db.session.add(user)
+        dazhangai.db.session.flush()
+        profile = dazhangai.UserProfile(user_id=user.id, problem_letters=['ä', 'ö', 'ü'],
+                                        failed_word_types={'Verb': 2}, difficulty_modifier=1.3)
+        dazhangai.db.session.add(profile)
+        picked = random.sample(index.entries, min(len(index), args.seen + args.due))
+        for entry in picked[:args.seen]:
+            # Lowercased, like the game client logs them
+            dazhangai.db.session.add(dazhangai.SeenWord(user_id=user.id, word=entry.lower))
+        for entry in picked[args.seen:]:
+            dazhangai.db.session.add(dazhangai.ReviewSchedule(
+                user_id=user.id, word=entry.lower, count=1, next_review=dazhangai._utcnow() - timedelta(days=1)))
+        dazhangai.db.session.commit()
+
+        started = time.perf_counter()
+        features = dazhangai.get_word_features('a1')
+        build_ms = (time.perf_counter() - started) * 1000
+        state = SelectionState(
+            due_words=frozenset(dazhangai.get_due_review_words(user.id)),
+            seen_words=frozenset(dazhangai.get_seen_words(user.id)),
+            problem_type=None,
+            problem_letters=('ä', 'ö', 'ü'),
+            difficulty_modifier=1.3
+        )
+
+        print(f"{len(index)} words, {args.seen} seen, {args.due} due; feature matrix "
+              f"{features.matrix.shape[0]}x{features.matrix.shape[1]} built in {build_ms:.0f} ms")
+        print(f"{'engine':<18} {'select_words p50':>17} {'p95':>8} {'engine p50':>11} {'p95':>8}   (ms)")
+        for label, engine in [('python cascade', None),
+                              ('numpy cascade', ScoringEngine('cascade')),
+                              ('numpy adaptive', ScoringEngine('adaptive'))]:
+            dazhangai.scoring_engine = engine
+            total = timed(lambda: dazhangai.select_words(user.id, profile, 'a1', True), args.repeat)
+            if engine is None:
+                print(f"{label:<18} {total[0]:>17.2f} {total[1]:>8.2f} {'-':>11} {'-':>8}")
+                continue
+            alone = timed(lambda: engine.select(features, state, 1), args.repeat)
+            print(f"{label:<18} {total[0]:>17.2f} {total[1]:>8.2f} {alone[0]:>11.3f} {alone[1]:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
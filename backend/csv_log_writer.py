@@ -0,0 +1,166 @@
+"""
+Background writer for the CSV activity logs (guess_log.csv, game_log.csv).
+
+Request threads only enqueue rows. One writer thread per process drains a bounded
+queue, appends rows in batches (on a size or time threshold), rotates files by size
+or date, and flushes what is left at interpreter shutdown. Because a single thread
+owns the files, rows from concurrent requests can no longer interleave.
+"""
+import atexit
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+_STOP = object()
+
+
+class CsvLogWriter:
+    def __init__(self, directory, max_queue=10000, flush_interval=1.0, flush_size=200,
+                 max_bytes=10 * 1024 * 1024, rotate_daily=False):
+        self.directory = directory
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # 0 disables size-based rotation
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        atexit.register(self.close)
+
+    def write(self, file_name, row):
+        """Queue one row for file_name. Never blocks; returns False if the row was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((file_name, row))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logging.warning('CSV log queue full, %d row(s) dropped so far', self.dropped)
+            return False
+
+    def write_many(self, file_name, rows):
+        """Queue several rows for file_name as one queue entry; returns False if they were dropped."""
+        if not rows:
+            return True
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((file_name, list(rows)))
+            return True
+        except queue.Full:
+            before, self.dropped = self.dropped, self.dropped + len(rows)
+            if before == 0 or before // 1000 != self.dropped // 1000:
+                logging.warning('CSV log queue full, %d row(s) dropped so far', self.dropped)
+            return False
+
+    def flush(self, timeout=5.0):
+        """Block until every row queued so far is written."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write out pending rows and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._queue.put(_STOP)
+            self._thread = None
+        thread.join(timeout)
+
+    def _ensure_started(self):
+        # The thread is started lazily and per process, so forked server workers get their own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                            name='csv-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self, rows):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = rows.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP or isinstance(item, threading.Event):
+                self._write_batch(batch)
+                batch, deadline = [], None
+                if item is _STOP:
+                    return
+                item.set()
+                continue
+
+            if item is not None:
+                file_name, row = item
+                if isinstance(row, list):
+                    batch.extend((file_name, batch_row) for batch_row in row)
+                else:
+                    batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (len(batch) >= self.flush_size or time.monotonic() >= deadline):
+                self._write_batch(batch)
+                batch, deadline = [], None
+
+    def _write_batch(self, batch):
+        by_file = {}
+        for file_name, row in batch:
+            by_file.setdefault(file_name, []).append(row)
+        for file_name, file_rows in by_file.items():
+            path = os.path.join(self.directory, file_name)
+            try:
+                self._rotate_if_needed(path)
+                write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+                with open(path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=list(file_rows[0].keys()))
+                    if write_header:
+                        writer.writeheader()
+                    writer.writerows(file_rows)
+            except OSError:
+                logging.exception('Could not write %d row(s) to %s', len(file_rows), path)
+
+    def _rotate_if_needed(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        base, ext = os.path.splitext(path)
+        if self.rotate_daily:
+            last_write = datetime.fromtimestamp(stat.st_mtime).date()
+            if last_write != datetime.now().date():
+                self._rename_unique(path, f"{base}-{last_write.isoformat()}{ext}")
+                return
+        if self.max_bytes and stat.st_size >= self.max_bytes:
+            self._rename_unique(path, f"{base}-{datetime.now().strftime('%Y%m%d-%H%M%S')}{ext}")
+
+    @staticmethod
+    def _rename_unique(path, target):
+        candidate, n = target, 1
+        while os.path.exists(candidate):
+            root, ext = os.path.splitext(target)
+            candidate = f"{root}.{n}{ext}"
+            n += 1
+        os.replace(path, candidate)
@@ -0,0 +1,61 @@
+"""
+Short-lived cache of authenticated identities.
+
+The token decorators used to load the full User row on every request. They now keep a
+small snapshot per JWT user_id (role, level, profile id) for a few seconds. Handlers
+that change one of these fields, or delete the user, invalidate the entry explicitly;
+the TTL bounds staleness between server processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+
+class Identity(NamedTuple):
+    """What the token decorators hand to a view as current_user."""
+    id: int
+    username: str
+    role: str
+    level: Optional[str]
+    profile_id: Optional[int]
+
+
+class IdentityCache:
+    def __init__(self, ttl=30.0, max_size=1024):
+        # ttl <= 0 disables caching
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is None:
+                return None
+            identity, expires = item
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return identity
+
+    def put(self, identity):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[identity.id] = (identity, time.monotonic() + self.ttl)
+            self._entries.move_to_end(identity.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,6 +1,7 @@
 import json
 from werkzeug.security import check_password_hash
-from app import app, db, User, UserProfile
+from app import (app, db, User, UserProfile, migrate_failed_words, migrate_seen_words, recount_user_statistics,
+                 run_schema_migrations, get_applied_migrations, SCHEMA_MIGRATIONS, SCHEMA_VERSION)
 
 def migrate_users():
     """Migriert Benutzer von users.json zur SQLite-Datenbank."""
@@ -66,62 +67,30 @@ def migrate_profiles():
         db.session.commit()
         print("Profile erfolgreich in die Datenbank migriert.")
 
+        # failed_words aus dem JSON in die Wiederholungstabelle übernehmen
+        migrated = migrate_failed_words()
+        print(f"Wiederholungsplan für {migrated} Profil(e) übernommen.")
+        migrated = migrate_seen_words()
+        print(f"Gesehene Wörter für {migrated} Profil(e) übernommen.")
+        recounted = recount_user_statistics()
+        print(f"Statistikzähler für {recounted} Profil(e) neu berechnet.")
+
 
 def migrate_schema():
-    """Fügt neue Spalten zur bestehenden Datenbank hinzu, falls sie fehlen."""
+    """Bringt das Datenbankschema über die versionierten Migrationen auf den aktuellen Stand."""
     print("\nStarte Schema-Migration...")
-    from sqlalchemy import inspect, text
-    from sqlalchemy.exc import OperationalError
-
     with app.app_context():
-        inspector = inspect(db.engine)
-        
-        # Spalte 'difficulty_modifier' zur 'user_profile' Tabelle hinzufügen
-        try:
-            columns = [c['name'] for c in inspector.get_columns('user_profile')]
-            if 'difficulty_modifier' not in columns:
-                print("Füge Spalte 'difficulty_modifier' zur Tabelle 'user_profile' hinzu...")
-                with db.engine.connect() as connection:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN difficulty_modifier FLOAT NOT NULL DEFAULT 1.0;'))
-                print("Spalte 'difficulty_modifier' erfolgreich hinzugefügt.")
-            else:
-                print("Spalte 'difficulty_modifier' existiert bereits.")
-        except OperationalError as e:
-            # Dieser Fehler kann auftreten, wenn die Tabelle noch nicht existiert.
-            # db.create_all() wird sich darum kümmern.
-            print(f"Konnte Schema für 'user_profile' nicht prüfen/ändern: {e}")
-
-        # Spalte 'hint_credits' hinzufügen
-        try:
-            columns = [c['name'] for c in inspector.get_columns('user_profile')]
-            if 'hint_credits' not in columns:
-                print("Füge Spalte 'hint_credits' zur Tabelle 'user_profile' hinzu...")
-                with db.engine.connect() as connection:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN hint_credits INTEGER NOT NULL DEFAULT 0;'))
-                print("Spalte 'hint_credits' erfolgreich hinzugefügt.")
-            else:
-                print("Spalte 'hint_credits' existiert bereits.")
-        except OperationalError as e:
-            print(f"Konnte Spalte 'hint_credits' nicht hinzufügen/prüfen: {e}")
-
-        # Spalte 'wins_since_last_hint' hinzufügen
-        try:
-            columns = [c['name'] for c in inspector.get_columns('user_profile')]
-            if 'wins_since_last_hint' not in columns:
-                print("Füge Spalte 'wins_since_last_hint' zur Tabelle 'user_profile' hinzu...")
-                with db.engine.connect() as connection:
-                    connection.execute(text('ALTER TABLE user_profile ADD COLUMN wins_since_last_hint INTEGER NOT NULL DEFAULT 0;'))
-                print("Spalte 'wins_since_last_hint' erfolgreich hinzugefügt.")
-            else:
-                print("Spalte 'wins_since_last_hint' existiert bereits.")
-        except OperationalError as e:
-            print(f"Konnte Spalte 'wins_since_last_hint' nicht hinzufügen/prüfen: {e}")
+        applied = run_schema_migrations()
+        for version, name in applied:
+            print(f"Migration {version} angewendet: {name}")
+        applied_versions = get_applied_migrations() or set()
+        missing = [str(version) for version, _, _, _ in SCHEMA_MIGRATIONS if version not in applied_versions]
+        if missing:
+            print(f"Ausstehende Migrationen: {', '.join(missing)}. Details im Log.")
+        else:
+            print(f"Schema ist aktuell (Version {SCHEMA_VERSION}).")
 
 if __name__ == '__main__':
-    with app.app_context():
-        # Erstellt alle Tabellen, falls sie nicht existieren
-        db.create_all()
-    
     migrate_schema()
     migrate_users()
     migrate_profiles()
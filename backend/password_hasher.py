@@ -0,0 +1,153 @@
+"""
+Password hashing off the request threads.
+
+scrypt is deliberately CPU-heavy; when a whole class logs in at once, hashing on the
+request threads starves everything else. PasswordHasher runs hashes in a small process
+pool and caps how many may be queued or running. Callers beyond the cap get HasherBusy
+immediately, so the endpoint can answer 429 with Retry-After instead of piling up.
+A caller that waits longer than timeout seconds gets HasherBusy as well; its hash keeps
+its slot until the pool has finished (or dropped) it.
+
+The pool is created lazily and per process (forked server workers get their own). Its
+workers are spawned, not forked: the first hash arrives on a request thread, and forking
+a process that runs other threads can copy a lock one of them holds (logging, the DB
+driver) into the child, which then deadlocks on it.
+With workers=0 hashes run inline on the calling thread, still subject to the cap.
+"""
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """All hashing slots are taken; retry_after is a suggested wait in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Password hashing queue is full, retry in {retry_after}s')
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    def __init__(self, workers=2, max_pending=16, timeout=30.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.completed = 0
+        self.rejected = 0
+        # Hashes that raised, and callers that gave up waiting after timeout seconds
+        self.failed = 0
+        self.timed_out = 0
+        self._in_flight = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        # Recent durations of successful hashes (queue wait included) for the metrics snapshot
+        self._latencies = deque(maxlen=1000)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            snapshot = {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self._in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'failed': self.failed,
+                'timed_out': self.timed_out,
+            }
+        snapshot['latency_ms'] = {
+            'p50': round(_percentile(latencies, 50) * 1000, 1),
+            'p95': round(_percentile(latencies, 95) * 1000, 1),
+            'max': round((latencies[-1] if latencies else 0.0) * 1000, 1),
+        }
+        return snapshot
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy(self._retry_after())
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if self.workers <= 0:
+                result = fn(*args)
+            else:
+                future = self._get_executor().submit(fn, *args)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    # The hash is still queued or running in the pool. Its slot is freed only
+                    # once it is done, so timed-out callers cannot push more than max_pending
+                    # hashes into the pool; a hash that has not started yet is dropped.
+                    with self._lock:
+                        self.timed_out += 1
+                    future.cancel()
+                    future.add_done_callback(self._release)
+                    raise HasherBusy(self._retry_after()) from None
+        except HasherBusy:
+            raise
+        except BaseException as exc:
+            if isinstance(exc, BrokenProcessPool):
+                # A worker died; start a fresh pool for the next caller
+                with self._lock:
+                    self._executor = None
+            with self._lock:
+                self.failed += 1
+            self._release()
+            raise
+        with self._lock:
+            self.completed += 1
+            self._latencies.append(time.perf_counter() - started)
+        self._release()
+        return result
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _get_executor(self):
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                self._pid = os.getpid()
+            return self._executor
+
+    def _retry_after(self):
+        # Time for the queue ahead of the caller to drain, at least one second
+        with self._lock:
+            recent = list(self._latencies)[-50:]
+        typical = sum(recent) / len(recent) if recent else 0.1
+        return max(1, math.ceil(typical * self.max_pending / max(1, self.workers)))
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))]
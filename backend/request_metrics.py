@@ -0,0 +1,207 @@
+"""
+Request and SQL instrumentation in Prometheus text format.
+
+RequestMetrics hooks into Flask (before/after/teardown request) and the SQLAlchemy
+engine (before/after cursor execute) and keeps, per route template and method:
+
+    dazhangai_http_requests_total                 counter by status code
+    dazhangai_http_request_duration_seconds       histogram, time to build the response
+    dazhangai_sql_statements_per_request          histogram, statements issued per request
+    dazhangai_sql_statement_duration_seconds      histogram, time per statement
+
+Routes are labelled with the URL rule ('/api/word', '/<path:path>'), never the raw path,
+so label cardinality stays bounded; unmatched URLs share route="unmatched". Statements
+outside a request (CLI commands, startup, background threads) are labelled route="".
+
+The hot path is a few perf_counter() calls and list appends; everything is folded into
+fixed bucket arrays under one lock per request, so it can stay on in production. The
+counters are per process: behind several server workers each worker reports its own.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+from sqlalchemy import event
+
+# Seconds; Prometheus client defaults, which cover a fast JSON answer up to a slow export
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative-on-render bucket counts, sum and count; callers hold the lock."""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One slot per bound plus the +Inf overflow
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # bisect_left: a value equal to a bound belongs to that bucket (le = less or equal)
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+def format_metric(name, kind, help_text, samples):
+    """
+    Text exposition lines of one metric family. samples are (labels, value) pairs with
+    labels as a tuple of (name, value) pairs.
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{_labels(labels)} {_number(value)}' for labels, value in samples)
+    return lines
+
+
+def format_histograms(name, help_text, histograms):
+    """Text exposition lines of a histogram family; histograms maps label tuples to Histogram."""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {_number(histogram.sum)}')
+        lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+    return lines
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._requests = {}
+        self._latency = {}
+        self._sql_counts = {}
+        self._sql_durations = {}
+
+    def install(self, app, engine):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    # --- Flask hooks ---
+
+    def _before_request(self):
+        g._metrics_started = time.perf_counter()
+        # Statement durations of this request, folded in on teardown
+        self._local.statements = []
+
+    def _after_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            key = (request.method, _route())
+            with self._lock:
+                status_key = key + (response.status_code,)
+                self._requests[status_key] = self._requests.get(status_key, 0) + 1
+                histogram = self._latency.get(key)
+                if histogram is None:
+                    histogram = self._latency[key] = Histogram(LATENCY_BUCKETS)
+                histogram.observe(elapsed)
+        return response
+
+    def _teardown_request(self, exc):
+        # Runs after a streamed body is complete, so the statements of an export count too
+        statements = getattr(self._local, 'statements', None)
+        if statements is None:
+            return
+        self._local.statements = None
+        self._record_statements((request.method, _route()), statements, per_request=True)
+
+    # --- SQLAlchemy hooks ---
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get('_metrics_started')
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        statements = getattr(self._local, 'statements', None)
+        if statements is not None:
+            statements.append(elapsed)
+        else:
+            self._record_statements(('', ''), [elapsed], per_request=False)
+
+    def _record_statements(self, key, durations, per_request):
+        with self._lock:
+            if per_request:
+                histogram = self._sql_counts.get(key)
+                if histogram is None:
+                    histogram = self._sql_counts[key] = Histogram(SQL_COUNT_BUCKETS)
+                histogram.observe(len(durations))
+            if durations:
+                histogram = self._sql_durations.get(key)
+                if histogram is None:
+                    histogram = self._sql_durations[key] = Histogram(SQL_DURATION_BUCKETS)
+                for elapsed in durations:
+                    histogram.observe(elapsed)
+
+    # --- Exposition ---
+
+    def render(self):
+        """Prometheus text exposition lines of everything recorded so far."""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latency = {_route_labels(key): _copy(h) for key, h in self._latency.items()}
+            sql_counts = {_route_labels(key): _copy(h) for key, h in self._sql_counts.items()}
+            sql_durations = {_route_labels(key): _copy(h) for key, h in self._sql_durations.items()}
+        lines = format_metric(
+            'dazhangai_http_requests_total', 'counter', 'HTTP requests by route, method and status code.',
+            ((_route_labels((method, route)) + (('status', status),), count)
+             for (method, route, status), count in requests))
+        lines += format_histograms(
+            'dazhangai_http_request_duration_seconds',
+            'Time from receiving a request to returning its response.', latency)
+        lines += format_histograms(
+            'dazhangai_sql_statements_per_request', 'SQL statements executed while handling one request.',
+            sql_counts)
+        lines += format_histograms(
+            'dazhangai_sql_statement_duration_seconds',
+            'Execution time of single SQL statements (route="" outside requests).', sql_durations)
+        return lines
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _route_labels(key):
+    method, route = key
+    return (('method', method), ('route', route))
+
+
+def _copy(histogram):
+    copy = Histogram(histogram.bounds)
+    copy.counts = list(histogram.counts)
+    copy.sum = histogram.sum
+    copy.count = histogram.count
+    return copy
@@ -0,0 +1,201 @@
+"""
+Opt-in request profiling for production.
+
+Two independent modes, both off by default:
+
+    slow requests   A sampler thread records the Python stack of every request thread
+                    each PROFILE_INTERVAL_MS. Requests that take at least PROFILE_SLOW_MS
+                    are written as collapsed stacks (one "frame;frame;frame count" line
+                    per distinct stack, the format of flamegraph.pl, speedscope and
+                    inferno); faster ones are discarded. Cheap enough to leave on, so a
+                    spike is captured the first time it happens.
+    sampled         PROFILE_SAMPLE_RATE of the requests run under cProfile and are written
+                    as .pstats files (python -m pstats, snakeviz), whatever their duration.
+                    One at a time per process; a request sampled while another one is
+                    being profiled, or while a debugger or coverage tool is active, is not.
+
+PROFILE_ROUTES limits both modes to a comma-separated list of route rules (e.g.
+"/api/word,/api/log_game"). File names carry time, method, route, duration and user id;
+collapsed stacks additionally start with a "METHOD route status [user]" root frame. The oldest
+files are deleted once the directory exceeds PROFILE_MAX_MB.
+"""
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import g, request
+
+# Held while a sampled request runs under cProfile
+_cprofile_lock = threading.Lock()
+
+
+def _frame_name(frame):
+    # Module plus co_qualname (3.11+): "flask.app:Flask.wsgi_app", "word_index:WordIndex.get"
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_stack(frame):
+    """Root-first "module:function;module:function" string of a frame and its callers."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+class RequestProfiler:
+    def __init__(self, directory, slow_ms=0.0, sample_rate=0.0, interval_ms=5.0, routes=None,
+                 max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000.0
+        self.routes = frozenset(routes) if routes else None
+        self.max_bytes = max_bytes
+        self.written = 0
+        # thread id -> Counter of collapsed stacks of the request running on that thread
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler_pid = None
+
+    @property
+    def enabled(self):
+        return self.slow_ms > 0 or self.sample_rate > 0
+
+    def install(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    # --- Flask hooks ---
+
+    def _before_request(self):
+        rule = request.url_rule
+        if rule is None or (self.routes is not None and rule.rule not in self.routes):
+            return
+        g._profile_started = time.perf_counter()
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            self._start_cprofile()
+        if self.slow_ms > 0:
+            self._ensure_sampler()
+            with self._lock:
+                self._active[threading.get_ident()] = Counter()
+            self._wake.set()
+
+    def _after_request(self, response):
+        if '_profile_started' in g:
+            g._profile_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        started = g.pop('_profile_started', None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        profile = g.pop('_profile_cprofile', None)
+        if profile is not None:
+            profile.disable()
+            _cprofile_lock.release()
+        with self._lock:
+            stacks = self._active.pop(threading.get_ident(), None)
+        try:
+            if profile is not None:
+                profile.dump_stats(self._path(elapsed_ms, 'pstats'))
+                self._written()
+            if stacks and elapsed_ms >= self.slow_ms:
+                root = (f"{request.method} {request.url_rule.rule} {g.pop('_profile_status', '-')} "
+                        f"[{self._user_label()}]")
+                with open(self._path(elapsed_ms, 'collapsed'), 'w', encoding='utf-8') as f:
+                    for stack, count in stacks.most_common():
+                        f.write(f'{root};{stack} {count}\n')
+                self._written()
+        except OSError:
+            logging.warning('Could not write request profile to %s', self.directory, exc_info=True)
+
+    def _start_cprofile(self):
+        # Only one cProfile run per process: on 3.12+ it registers with sys.monitoring,
+        # which is process-wide, so a second enable() raises ValueError and the profile
+        # would include every other thread. Requests sampled meanwhile are skipped.
+        if not _cprofile_lock.acquire(blocking=False):
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, coverage, an outer cProfile) is active
+            _cprofile_lock.release()
+            return
+        g._profile_cprofile = profile
+
+    # --- Sampling ---
+
+    def _ensure_sampler(self):
+        # One sampler per process; forked server workers start their own
+        if self._sampler_pid == os.getpid():
+            return
+        with self._lock:
+            if self._sampler_pid == os.getpid():
+                return
+            self._sampler_pid = os.getpid()
+            threading.Thread(target=self._sample_loop, name='request-profiler', daemon=True).start()
+
+    def _sample_loop(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            # Under the lock, so a request that pops its Counter sees no further updates
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+                frames = sys._current_frames()
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[collapse_stack(frame)] += 1
+                del frames
+
+    # --- Files ---
+
+    def _user_label(self):
+        identity = g.get('identity')
+        return f'user {identity.id}' if identity is not None else 'anonymous'
+
+    def _path(self, elapsed_ms, extension):
+        identity = g.get('identity')
+        route = re.sub(r'[^A-Za-z0-9]+', '_', request.url_rule.rule).strip('_') or 'root'
+        name = (f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}_{request.method}_{route}"
+                f"_{elapsed_ms:.0f}ms_u{identity.id if identity is not None else 0}.{extension}")
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, name)
+
+    def _written(self):
+        self.written += 1
+        self._enforce_cap()
+
+    def _enforce_cap(self):
+        """Delete the oldest profiles until the directory fits into max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(('.collapsed', '.pstats')):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        total = sum(size for _, _, size in entries)
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
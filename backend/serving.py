@@ -0,0 +1,88 @@
+"""
+Production serving helpers for the `flask --app app serve` command.
+
+Gunicorn (POSIX) runs several worker processes with threads each; the app is loaded
+once in the master, so database initialization and word list warm-up happen before
+the workers fork. Waitress is the fallback for Windows or when Gunicorn is missing
+and serves with threads in a single process. Both are optional dependencies.
+"""
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive inter-process lock on path, held for the duration of the with block."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            # LK_LOCK retries for about ten seconds, keep trying until we get it
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def available_server(preferred='auto'):
+    """Name of the WSGI server to use: 'gunicorn' or 'waitress'. Raises RuntimeError if none fits."""
+    candidates = ['gunicorn', 'waitress'] if preferred == 'auto' else [preferred]
+    for name in candidates:
+        if name == 'gunicorn' and os.name == 'nt':
+            continue
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        return name
+    wanted = 'gunicorn oder waitress' if preferred == 'auto' else preferred
+    raise RuntimeError(f"Kein passender WSGI-Server installiert. Bitte `pip install {wanted}` ausführen.")
+
+
+def run_gunicorn(app, bind, workers, threads, timeout, post_fork=None):
+    from gunicorn.app.base import BaseApplication
+
+    class _Application(BaseApplication):
+        def load_config(self):
+            settings = {
+                'bind': bind,
+                'workers': workers,
+                'threads': threads,
+                'worker_class': 'gthread' if threads > 1 else 'sync',
+                'timeout': timeout,
+                # The app object below is already imported and initialized in this process
+                'preload_app': True,
+                'accesslog': '-',
+            }
+            if post_fork is not None:
+                settings['post_fork'] = lambda server, worker: post_fork()
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    _Application().run()
+
+
+def run_waitress(app, bind, threads):
+    import waitress
+    waitress.serve(app, listen=bind, threads=threads)
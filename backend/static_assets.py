@@ -0,0 +1,97 @@
+"""
+In-memory manifest of the React production build.
+
+The build directory is walked once; every file is read, fingerprinted and, if it is
+text-like, compressed with gzip and (when the optional `brotli` package is installed)
+brotli. Requests are then answered from the manifest without touching the filesystem:
+the best encoding the client accepts is chosen, ETags are per encoding, and files
+with a content hash in their name (CRA's static/js/main.1a2b3c4d.js) are cached by
+browsers for a year.
+
+A new `npm run build` is picked up on the next server start. With compress=False (the
+packaged desktop build, which only serves localhost) the files are kept as they are.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import NamedTuple, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# e.g. main.1a2b3c4d.js, 787.0f3e2a1b.chunk.js, logo.6ce24c58023cc2f8fd88fe9d219db6c6.svg
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/manifest+json',
+                      'image/svg+xml', 'application/xml', 'application/wasm')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class StaticFile(NamedTuple):
+    path: str
+    mimetype: str
+    etag: str
+    immutable: bool
+    # encoding ('identity', 'gzip', 'br') -> body; None for files served from disk
+    bodies: Optional[dict]
+    disk_path: str
+
+
+class StaticManifest:
+    def __init__(self, root, files):
+        self.root = root
+        self.files = files
+
+    def __len__(self):
+        return len(self.files)
+
+    def get(self, path):
+        return self.files.get(path)
+
+    @classmethod
+    def build(cls, root, min_compress_size=512, max_cached_size=20 * 1024 * 1024, brotli_quality=5,
+              compress=True):
+        """Manifest of root; compress=False keeps only the identity bodies (no gzip/brotli work)."""
+        files = {}
+        if not root or not os.path.isdir(root):
+            return cls(root, files)
+        for directory, _, names in os.walk(root):
+            for name in names:
+                disk_path = os.path.join(directory, name)
+                path = os.path.relpath(disk_path, root).replace(os.sep, '/')
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                immutable = bool(HASHED_NAME.search(name))
+                size = os.path.getsize(disk_path)
+                if size > max_cached_size:
+                    # Too big to keep in memory; streamed from disk, still with an ETag
+                    etag = hashlib.blake2b(f'{path}:{size}:{os.path.getmtime(disk_path)}'.encode(),
+                                           digest_size=12).hexdigest()
+                    files[path] = StaticFile(path, mimetype, etag, immutable, None, disk_path)
+                    continue
+                with open(disk_path, 'rb') as f:
+                    data = f.read()
+                bodies = {'identity': data}
+                if compress and len(data) >= min_compress_size and mimetype.startswith(COMPRESSIBLE_TYPES):
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                    if len(compressed) < len(data):
+                        bodies['gzip'] = compressed
+                    if brotli is not None:
+                        compressed = brotli.compress(data, quality=brotli_quality)
+                        if len(compressed) < len(data):
+                            bodies['br'] = compressed
+                etag = hashlib.blake2b(data, digest_size=12).hexdigest()
+                files[path] = StaticFile(path, mimetype, etag, immutable, bodies, disk_path)
+        return cls(root, files)
+
+
+def choose_encoding(static_file, accept_encodings):
+    """Best available encoding for a werkzeug Accept-Encoding header: br, then gzip, then identity."""
+    if static_file.bodies is None:
+        return 'identity'
+    for encoding in ('br', 'gzip'):
+        if encoding in static_file.bodies and accept_encodings[encoding] > 0:
+            return encoding
+    return 'identity'
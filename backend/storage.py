@@ -0,0 +1,134 @@
+"""
+Storage engine configuration.
+
+Builds the SQLAlchemy URL and engine options from the environment, applies the SQLite
+pragmas that make concurrent classroom traffic workable (WAL journaling, a busy
+timeout, relaxed fsync), and can optionally serialize ORM writes inside a process so
+only one thread at a time holds SQLite's write lock.
+
+Environment variables:
+    DATABASE_URL            any SQLAlchemy URL; defaults to sqlite:///<data dir>/database.db
+    SQLITE_JOURNAL_MODE     default WAL
+    SQLITE_SYNCHRONOUS      default NORMAL (safe with WAL)
+    SQLITE_BUSY_TIMEOUT_MS  default 5000
+    DB_POOL_SIZE            default 10
+    DB_MAX_OVERFLOW         default 20
+    DB_POOL_RECYCLE         seconds, default 1800 (server databases only)
+    DB_SERIALIZE_WRITES     'true' to funnel ORM writes through one lock per process
+"""
+import os
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def database_url(data_dir):
+    """DATABASE_URL if set, otherwise the SQLite file in the data directory."""
+    return os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(data_dir, 'database.db')
+
+
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def engine_options(url):
+    """Engine keyword arguments (SQLALCHEMY_ENGINE_OPTIONS) for the given URL."""
+    options = {'pool_pre_ping': not is_sqlite(url)}
+    if is_sqlite(url):
+        database = make_url(url).database
+        if not database or database == ':memory:':
+            # In-memory databases live in a single connection; keep SQLAlchemy's defaults
+            return {}
+        options['connect_args'] = {
+            # Python's sqlite3 timeout is the busy handler used while waiting for a lock
+            'timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000.0,
+            # Pooled connections are handed between request threads
+            'check_same_thread': False,
+        }
+        options['pool_size'] = _env_int('DB_POOL_SIZE', 10)
+        options['max_overflow'] = _env_int('DB_MAX_OVERFLOW', 20)
+    else:
+        options['pool_size'] = _env_int('DB_POOL_SIZE', 10)
+        options['max_overflow'] = _env_int('DB_MAX_OVERFLOW', 20)
+        options['pool_recycle'] = _env_int('DB_POOL_RECYCLE', 1800)
+    return options
+
+
+def install_sqlite_pragmas(engine):
+    """Apply journal mode, synchronous and busy_timeout pragmas on every new SQLite connection."""
+    if engine.dialect.name != 'sqlite':
+        return
+    journal_mode = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL').upper()
+    synchronous = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+    busy_timeout = _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    in_memory = engine.url.database in (None, '', ':memory:')
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not in_memory:
+                cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+            cursor.execute(f'PRAGMA synchronous={synchronous}')
+            cursor.execute(f'PRAGMA busy_timeout={busy_timeout}')
+        finally:
+            cursor.close()
+
+
+class WriteSerializer:
+    """
+    Process-wide lock around ORM write transactions. The lock is taken on the first flush
+    (or bulk UPDATE/DELETE) of a transaction and released when the transaction ends, so
+    writers queue in Python instead of contending for SQLite's lock. Readers are unaffected.
+    """
+
+    def __init__(self, timeout=None):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Waiting longer than SQLite's own busy timeout is pointless; fall back to it afterwards
+        self.timeout = timeout if timeout is not None else _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000.0
+
+    def install(self, session):
+        event.listen(session, 'before_flush', self._on_flush)
+        event.listen(session, 'do_orm_execute', self._on_execute)
+        event.listen(session, 'after_transaction_end', self._on_transaction_end)
+
+    def _acquire(self):
+        if getattr(self._local, 'held', False):
+            return
+        self._local.held = self._lock.acquire(timeout=self.timeout)
+
+    def _on_flush(self, session, flush_context, instances):
+        self._acquire()
+
+    def _on_execute(self, orm_execute_state):
+        if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+            self._acquire()
+
+    def _on_transaction_end(self, session, transaction):
+        if transaction.parent is None and getattr(self._local, 'held', False):
+            self._local.held = False
+            self._lock.release()
+
+
+def configure_storage(app, data_dir):
+    """Set the database URL and engine options on the Flask config (before SQLAlchemy(app))."""
+    url = database_url(data_dir)
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(url)
+
+
+def init_storage(app, db):
+    """Install engine and session hooks once the Flask-SQLAlchemy extension exists."""
+    with app.app_context():
+        install_sqlite_pragmas(db.engine)
+        if os.environ.get('DB_SERIALIZE_WRITES', 'false').lower() == 'true':
+            WriteSerializer().install(db.session)
@@ -0,0 +1,76 @@
+"""
+Shared test setup. app.py configures itself from the environment when it is imported,
+so the environment is set here, before any test module imports it: a scratch copy of the
+checked-in database.db (which predates the schema migrations, so importing the app
+migrates it), a scratch directory for the CSV logs and inline password hashing.
+
+Run from the backend directory:
+
+    python -m pytest tests
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DB = os.path.join(BACKEND_DIR, 'database.db')
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp = tempfile.mkdtemp(prefix='dazhangai-tests-')
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+shutil.copyfile(BASELINE_DB, os.path.join(_tmp, 'database.db'))
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'database.db')
+os.environ['CSV_LOG_DIR'] = _tmp
+os.environ['JWT_SECRET_KEY'] = 'test-only-secret-key-0123456789abcdef'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+
+import app as dazhangai  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return dazhangai.app.test_client()
+
+
+@pytest.fixture
+def app_context():
+    with dazhangai.app.app_context():
+        yield
+
+
+@pytest.fixture(scope='session')
+def auth_headers():
+    """Bearer headers for a user, with a token as /api/v2/login issues it."""
+    def headers(user):
+        token = jwt.encode({
+            'user_id': user.id,
+            'username': user.username,
+            'role': user.role,
+            'exp': datetime.now(timezone.utc) + timedelta(hours=1)
+        }, dazhangai.app.config['SECRET_KEY'], algorithm='HS256')
+        return {'Authorization': f'Bearer {token}'}
+    return headers
+
+
+@pytest.fixture(scope='session')
+def make_user():
+    """Create a user (a student unless role is given) without hashing a password."""
+    def make(role='student', level='a1', mother_tongue=None, username=None):
+        with dazhangai.app.app_context():
+            user = dazhangai.User(username=username or f'test-{uuid.uuid4().hex[:12]}',
+                                  password_hash='-', role=role, level=level)
+            dazhangai.db.session.add(user)
+            dazhangai.db.session.flush()
+            dazhangai.db.session.add(dazhangai.UserProfile(user_id=user.id, mother_tongue=mother_tongue))
+            dazhangai.db.session.commit()
+            dazhangai.db.session.refresh(user)
+            dazhangai.db.session.expunge(user)
+            return user
+    return make
@@ -0,0 +1,66 @@
+"""Batched event ingestion on /api/v2/events, including retried batches."""
+import app as dazhangai
+
+BATCH = [
+    {'type': 'game', 'id': 'game-1', 'word': 'Apfel', 'wasSuccessful': False, 'wrongLetters': ['z', 'q']},
+    {'type': 'guess', 'word': 'Apfel', 'letter': 'z', 'isCorrect': False},
+    {'type': 'game', 'id': 'game-2', 'word': 'Haus', 'wasSuccessful': True, 'wrongLetters': []},
+    {'type': 'game', 'word': 'Baum', 'wasSuccessful': True, 'wrongLetters': ['x']},
+]
+
+
+def post_events(client, headers, events):
+    return client.post('/api/v2/events', headers=headers, json={'events': events})
+
+
+def game_log_count(user_id):
+    with dazhangai.app.app_context():
+        return dazhangai.GameLog.query.filter_by(user_id=user_id).count()
+
+
+def test_batch_is_applied(client, auth_headers, make_user):
+    user = make_user()
+    response = post_events(client, auth_headers(user), BATCH)
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['accepted'] == len(BATCH)
+    assert body['duplicate_games'] == 0
+    statistics = body['statistics']
+    assert (statistics['wins'], statistics['losses'], statistics['failed_words']) == (2, 1, 1)
+    assert game_log_count(user.id) == 3
+
+
+def test_replayed_batch_only_applies_games_without_id(client, auth_headers, make_user):
+    user = make_user()
+    headers = auth_headers(user)
+    first = post_events(client, headers, BATCH).get_json()
+    replay = post_events(client, headers, BATCH).get_json()
+    # game-1 and game-2 were applied before; the game without an id cannot be recognised
+    assert replay['duplicate_games'] == 2
+    assert replay['statistics']['losses'] == first['statistics']['losses']
+    assert replay['statistics']['wins'] == first['statistics']['wins'] + 1
+    assert game_log_count(user.id) == 4
+
+
+def test_repeated_id_within_a_batch_is_applied_once(client, auth_headers, make_user):
+    user = make_user()
+    game = {'type': 'game', 'id': 'same', 'word': 'Haus', 'wasSuccessful': True}
+    body = post_events(client, auth_headers(user), [game, dict(game)]).get_json()
+    assert body['duplicate_games'] == 1
+    assert body['statistics']['wins'] == 1
+
+
+def test_ids_are_per_user(client, auth_headers, make_user):
+    game = {'type': 'game', 'id': 'shared', 'word': 'Haus', 'wasSuccessful': True}
+    for user in (make_user(), make_user()):
+        assert post_events(client, auth_headers(user), [game]).get_json()['duplicate_games'] == 0
+
+
+def test_invalid_batches_are_rejected(client, auth_headers, make_user):
+    user = make_user()
+    headers = auth_headers(user)
+    assert post_events(client, headers, [{'type': 'game', 'id': 5, 'word': 'Haus'}]).status_code == 400
+    assert post_events(client, headers, [{'type': 'game', 'id': 'x' * 65, 'word': 'Haus'}]).status_code == 400
+    assert post_events(client, headers, [{'type': 'move'}]).status_code == 400
+    assert client.post('/api/v2/events', headers=headers, json={'events': 'game'}).status_code == 400
+    assert game_log_count(user.id) == 0
@@ -0,0 +1,76 @@
+"""Class-wide letter confusion counters and /api/v2/letter_confusion."""
+import uuid
+
+import pytest
+
+import app as dazhangai
+
+# (level, [(won, wrong letters), ...]) per student of one mother tongue
+STUDENTS = [
+    ('b1', [(False, ['e', 'e', 'r']), (True, [])]),
+    ('b1', [(True, ['e'])]),
+    ('a2', [(False, ['x'])]),
+]
+
+
+@pytest.fixture(scope='module')
+def mother_tongue(make_user, auth_headers):
+    tongue = f'tongue-{uuid.uuid4().hex[:8]}'
+    client = dazhangai.app.test_client()
+    for level, games in STUDENTS:
+        student = make_user(level=level, mother_tongue=tongue)
+        events = [{'type': 'game', 'word': 'Haus', 'wasSuccessful': won, 'wrongLetters': letters}
+                  for won, letters in games]
+        assert client.post('/api/v2/events', headers=auth_headers(student), json=events).status_code == 201
+    return tongue
+
+
+@pytest.fixture(scope='module')
+def teacher_headers(make_user, auth_headers):
+    return auth_headers(make_user(role='teacher'))
+
+
+def letter_confusion(client, headers, **params):
+    response = client.get('/api/v2/letter_confusion', headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_group_totals_and_letters(client, teacher_headers, mother_tongue):
+    body = letter_confusion(client, teacher_headers, mother_tongue=mother_tongue)
+    assert body['by_mother_tongue'][mother_tongue]['games'] == 4
+    assert body['by_mother_tongue'][mother_tongue]['wrong_guesses'] == 5
+    groups = {group['level']: group for group in body['groups']}
+    assert set(groups) == {'a2', 'b1'}
+    # The won game without wrong letters still counts as a game of the group
+    assert (groups['b1']['games'], groups['b1']['wrong_guesses']) == (3, 4)
+    assert groups['b1']['letters'] == [
+        {'letter': 'e', 'errors': 3, 'games': 2, 'errors_per_game': 1.0, 'game_share': 0.667},
+        {'letter': 'r', 'errors': 1, 'games': 1, 'errors_per_game': 0.333, 'game_share': 0.333},
+    ]
+    assert [letter['letter'] for letter in groups['a2']['letters']] == ['x']
+
+
+def test_filters_and_limit(client, teacher_headers, mother_tongue):
+    body = letter_confusion(client, teacher_headers, mother_tongue=mother_tongue, level='B1', limit=1)
+    assert [(group['level'], group['mother_tongue']) for group in body['groups']] == [('b1', mother_tongue)]
+    assert body['class']['games'] == 3
+    assert [letter['letter'] for letter in body['class']['letters']] == ['e']
+
+
+def test_letter_table_only_holds_letters(app_context, mother_tongue):
+    letters = dazhangai.db.session.query(dazhangai.ClassLetterStat.letter).distinct()
+    assert all(len(letter) == 1 for letter, in letters)
+
+
+def test_backfill_rebuilds_the_live_counters(client, teacher_headers, mother_tongue):
+    live = letter_confusion(client, teacher_headers, mother_tongue=mother_tongue, limit=50)
+    with dazhangai.app.app_context():
+        dazhangai.backfill_class_letter_stats()
+    assert letter_confusion(client, teacher_headers, mother_tongue=mother_tongue, limit=50) == live
+
+
+def test_invalid_parameters_are_rejected(client, teacher_headers):
+    for params in ({'level': 'z9'}, {'limit': 'all'}):
+        response = client.get('/api/v2/letter_confusion', headers=teacher_headers, query_string=params)
+        assert response.status_code == 400
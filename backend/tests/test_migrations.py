@@ -0,0 +1,93 @@
+"""
+The schema migrations on the checked-in database.db, which predates all of them:
+conftest.py imports the app on a copy, which runs every step. What a student sees must
+be what the pre-migration code computed from the same rows.
+"""
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pytest
+
+import app as dazhangai
+from conftest import BASELINE_DB
+
+
+def baseline_rows(sql, *params):
+    with closing(sqlite3.connect(f'file:{BASELINE_DB}?mode=ro', uri=True)) as connection:
+        return connection.execute(sql, params).fetchall()
+
+
+BASELINE_PROFILES = {
+    user_id: {
+        'seen_words': json.loads(seen_words or '[]'),
+        'failed_words': json.loads(failed_words or '{}'),
+        'problem_letters': json.loads(problem_letters or '[]'),
+        'hint_credits': hint_credits,
+    }
+    for user_id, seen_words, failed_words, problem_letters, hint_credits in baseline_rows(
+        'SELECT user_id, seen_words, failed_words, problem_letters, hint_credits FROM user_profile')
+}
+
+
+@pytest.fixture
+def student_statistics(app_context):
+    def statistics(user_id):
+        return dazhangai.build_user_statistics(user_id, dazhangai.get_user_profile(user_id))
+    return statistics
+
+
+def test_baseline_is_migrated_to_the_current_version(app_context):
+    assert BASELINE_PROFILES
+    assert dazhangai.get_applied_migrations() == {step[0] for step in dazhangai.SCHEMA_MIGRATIONS}
+    assert dazhangai.run_schema_migrations() == []
+
+
+@pytest.mark.parametrize('user_id', sorted(BASELINE_PROFILES))
+def test_game_counts_and_problem_letters_are_unchanged(student_statistics, user_id):
+    (wins,), = baseline_rows('SELECT count(*) FROM game_log WHERE user_id = ? AND was_successful = 1', user_id)
+    (losses,), = baseline_rows('SELECT count(*) FROM game_log WHERE user_id = ? AND was_successful = 0', user_id)
+    statistics = student_statistics(user_id)
+    assert (statistics['wins'], statistics['losses']) == (wins, losses)
+    assert statistics['problem_letters'] == BASELINE_PROFILES[user_id]['problem_letters']
+    assert statistics['hint_credits'] == BASELINE_PROFILES[user_id]['hint_credits']
+
+
+@pytest.mark.parametrize('user_id', sorted(BASELINE_PROFILES))
+def test_failed_words_move_to_the_review_schedule(student_statistics, user_id):
+    failed_words = BASELINE_PROFILES[user_id]['failed_words']
+    schedule = {
+        row.word: (row.count, row.next_review)
+        for row in dazhangai.ReviewSchedule.query.filter_by(user_id=user_id)
+    }
+    assert schedule == {
+        word: (entry['count'],
+               datetime.fromisoformat(entry['next_review']).astimezone(timezone.utc).replace(tzinfo=None))
+        for word, entry in failed_words.items()
+    }
+    assert student_statistics(user_id)['failed_words'] == len(failed_words)
+
+
+@pytest.mark.parametrize('user_id', sorted(BASELINE_PROFILES))
+def test_feedback_is_unchanged(client, auth_headers, user_id):
+    baseline = BASELINE_PROFILES[user_id]
+    total_failures = sum(entry['count'] for entry in baseline['failed_words'].values())
+    with dazhangai.app.app_context():
+        user = dazhangai.db.session.get(dazhangai.User, user_id)
+        headers = auth_headers(user)
+    response = client.get('/api/feedback', headers=headers)
+    assert response.status_code == 200
+    feedback = response.get_json()['feedback']
+    if baseline['problem_letters'] and total_failures >= 3:
+        assert ', '.join(baseline['problem_letters']) in feedback
+    else:
+        assert feedback is None
+
+
+@pytest.mark.parametrize('user_id', sorted(BASELINE_PROFILES))
+def test_seen_words_move_to_their_own_table(student_statistics, user_id):
+    seen_words = BASELINE_PROFILES[user_id]['seen_words']
+    rows = [row.word for row in dazhangai.SeenWord.query.filter_by(user_id=user_id)]
+    assert sorted(rows) == sorted(set(seen_words))
+    assert student_statistics(user_id)['seen_words'] == len(seen_words)
@@ -0,0 +1,47 @@
+"""Request validation and the combined log-and-draw of /api/v2/next_round."""
+import pytest
+
+import app as dazhangai
+
+
+def next_round(client, headers, **body):
+    return client.post('/api/v2/next_round', headers=headers, json=body)
+
+
+@pytest.mark.parametrize('value', [True, False, 'true', 'false', 'FALSE', None])
+def test_boolean_flags_are_accepted(client, auth_headers, make_user, value):
+    headers = auth_headers(make_user())
+    response = next_round(client, headers, use_model=value)
+    assert response.status_code == 200
+    assert response.get_json()['word']['word']
+
+
+@pytest.mark.parametrize('field', ['use_model', 'next_word'])
+@pytest.mark.parametrize('value', ['0', 0, 1, 'yes', '', [], {}])
+def test_other_flag_values_are_rejected(client, auth_headers, make_user, field, value):
+    user = make_user()
+    game = {'id': 'game-1', 'word': 'Haus', 'wasSuccessful': True}
+    response = next_round(client, auth_headers(user), game=game, **{field: value})
+    assert response.status_code == 400
+    with dazhangai.app.app_context():
+        assert dazhangai.GameLog.query.filter_by(user_id=user.id).count() == 0
+
+
+@pytest.mark.parametrize('value', [False, 'false'])
+def test_next_word_false_only_logs_the_game(client, auth_headers, make_user, value):
+    headers = auth_headers(make_user())
+    game = {'id': 'game-1', 'word': 'Haus', 'wasSuccessful': False, 'wrongLetters': ['q']}
+    response = next_round(client, headers, game=game, next_word=value)
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['word'] is None
+    assert body['statistics']['losses'] == 1
+    # The same game id is not applied twice
+    assert next_round(client, headers, game=game, next_word=value).get_json()['statistics']['losses'] == 1
+
+
+def test_invalid_game_and_level_are_rejected(client, auth_headers, make_user):
+    headers = auth_headers(make_user())
+    assert next_round(client, headers, game='Haus').status_code == 400
+    assert next_round(client, headers, game={'id': 7, 'word': 'Haus'}).status_code == 400
+    assert next_round(client, headers, level='d1').status_code == 400
@@ -0,0 +1,68 @@
+"""Keyset pagination of the teacher overview on /api/v2/students_data."""
+import pytest
+
+import app as dazhangai
+
+# (level, wins, losses) per student; duplicates on purpose so every sort key has ties
+STUDENTS = [('a1', 0, 0), ('a1', 1, 0), ('b1', 1, 1), ('b1', 2, 0), ('a1', 0, 1), ('b1', 1, 0), ('a2', 2, 0)]
+
+
+@pytest.fixture(scope='module')
+def teacher_headers(make_user, auth_headers):
+    client = dazhangai.app.test_client()
+    for level, wins, losses in STUDENTS:
+        student = make_user(level=level)
+        games = [{'type': 'game', 'word': 'Haus', 'wasSuccessful': True}] * wins
+        games += [{'type': 'game', 'word': 'Apfel', 'wasSuccessful': False}] * losses
+        if games:
+            client.post('/api/v2/events', headers=auth_headers(student), json=games)
+    return auth_headers(make_user(role='teacher'))
+
+
+def sort_value(student, sort):
+    return {
+        'username': student['username'],
+        'level': student['level'] or '',
+        'last_played': student['games']['last_played'] or '',
+        'wins': student['games']['wins'],
+        'losses': student['games']['losses'],
+        'games': student['games']['wins'] + student['games']['losses'],
+    }[sort]
+
+
+def fetch_pages(client, headers, limit, **params):
+    students, cursor = [], None
+    while True:
+        query = dict(params, limit=limit, **({'cursor': cursor} if cursor else {}))
+        response = client.get('/api/v2/students_data', headers=headers, query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['students']) <= limit
+        students += body['students']
+        cursor = body['next_cursor']
+        if cursor is None:
+            return students
+        assert len(students) < 1000
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+@pytest.mark.parametrize('sort', dazhangai.STUDENT_SORT_KEYS)
+@pytest.mark.parametrize('level', [None, 'a1'])
+def test_pages_concatenate_to_the_full_ordering(client, teacher_headers, sort, order, level):
+    params = {'sort': sort, 'order': order, **({'level': level} if level else {})}
+    full = fetch_pages(client, teacher_headers, 200, **params)
+    assert len(full) >= (3 if level else len(STUDENTS))
+    values = [sort_value(student, sort) for student in full]
+    assert values == sorted(values, reverse=order == 'desc')
+    if level:
+        assert {student['level'] for student in full} == {level}
+
+    for limit in (1, 2, 3):
+        paged = fetch_pages(client, teacher_headers, limit, **params)
+        assert [s['username'] for s in paged] == [s['username'] for s in full]
+
+
+def test_invalid_parameters_are_rejected(client, teacher_headers):
+    for params in ({'sort': 'age'}, {'limit': 'many'}, {'cursor': 'not-a-cursor'}):
+        response = client.get('/api/v2/students_data', headers=teacher_headers, query_string=params)
+        assert response.status_code == 400
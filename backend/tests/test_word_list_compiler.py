@@ -0,0 +1,113 @@
+"""Compiled word lists against the JSON loader, and the checks that guard them."""
+import json
+import os
+import shutil
+import unicodedata
+
+import pytest
+
+import word_list_compiler
+from word_index import WordIndex
+from word_list_compiler import WordListError, compile_index, compile_word_list, load_compiled, load_json_index
+
+WORD_LISTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'word_lists')
+LEVELS = sorted(os.path.splitext(name)[0] for name in os.listdir(WORD_LISTS_DIR) if name.endswith('.json'))
+
+
+def assert_same_index(compiled, loaded):
+    assert compiled.level == loaded.level
+    assert compiled.entries == loaded.entries
+    assert dict(compiled.letter_bits) == dict(loaded.letter_bits)
+    # by_type keeps the word list order of the types
+    assert list(compiled.by_type.items()) == list(loaded.by_type.items())
+    assert dict(compiled.by_letter) == dict(loaded.by_letter)
+    assert dict(compiled.by_word) == dict(loaded.by_word)
+    assert dict(compiled.by_lower) == dict(loaded.by_lower)
+
+
+def write_words(path, words):
+    path.write_text(json.dumps({'words': words}, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_bundled_lists_round_trip(tmp_path, level):
+    json_path = shutil.copy(os.path.join(WORD_LISTS_DIR, f'{level}.json'), tmp_path)
+    output_path, count, _ = compile_word_list(level, json_path)
+    compiled = load_compiled(level, output_path, json_path)
+    assert len(compiled) == count
+    assert_same_index(compiled, load_json_index(level, json_path))
+
+
+def test_normalization_is_shared(tmp_path):
+    json_path = write_words(tmp_path / 'a1.json', [
+        {'word': '  die   Katze ', 'type': 'Nomen', 'category': 'Tiere'},
+        {'word': 'die KATZE', 'type': 'Nomen', 'category': 'Tiere'},
+        {'word': unicodedata.normalize('NFD', 'schön'), 'type': 'Adjektiv', 'category': 'Eigenschaften'},
+        {'word': 'laufen', 'type': 'Verb', 'category': 'Bewegung'},
+    ])
+    output_path, count, duplicates = compile_word_list('a1', json_path)
+    assert (count, duplicates) == (3, 1)
+    compiled = load_compiled('a1', output_path, json_path)
+    assert [entry.word for entry in compiled] == ['Katze', 'schön', 'laufen']
+    assert_same_index(compiled, load_json_index('a1', json_path))
+
+
+def test_invalid_entries_fail_the_compiler_but_not_the_loader(tmp_path):
+    json_path = write_words(tmp_path / 'a1.json', [
+        {'word': 'Haus', 'type': 'Nomen', 'category': 'Wohnen'},
+        {'word': ' ', 'type': 'Nomen', 'category': 'Wohnen'},
+        'Baum',
+    ])
+    with pytest.raises(WordListError) as excinfo:
+        compile_word_list('a1', json_path)
+    assert len(excinfo.value.problems) == 2
+    assert [entry.word for entry in load_json_index('a1', json_path)] == ['Haus']
+
+
+def test_values_outside_their_column_are_reported():
+    index = WordIndex.from_words('c1', [
+        {'word': 'Haus', 'type': 'Nomen', 'category': 'Wohnen'},
+        {'word': 'ab' * 800, 'type': 'Nomen', 'category': 'Test'},
+    ])
+    with pytest.raises(WordListError) as excinfo:
+        compile_index(index)
+    assert len(excinfo.value.problems) == 1
+    assert 'hint_reveal' in excinfo.value.problems[0]
+
+    index = WordIndex.from_words('c1', [
+        {'word': ''.join(chr(0x4E00 + i) for i in range(70)), 'type': 'Nomen', 'category': 'Test'},
+    ])
+    with pytest.raises(WordListError) as excinfo:
+        compile_index(index)
+    assert 'at most 64' in excinfo.value.problems[0]
+
+
+def test_changed_source_is_detected(tmp_path):
+    words = [{'word': 'Haus', 'type': 'Nomen', 'category': 'Wohnen'}]
+    json_path = write_words(tmp_path / 'a1.json', words)
+    output_path, _, _ = compile_word_list('a1', json_path)
+    stat = os.stat(json_path)
+
+    # Same size and content, newer mtime: hashed again and still accepted
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert len(load_compiled('a1', output_path, json_path)) == 1
+
+    # Same size, other content
+    write_words(tmp_path / 'a1.json', [{'word': 'Maus', 'type': 'Nomen', 'category': 'Wohnen'}])
+    assert os.path.getsize(json_path) == stat.st_size
+    with pytest.raises(WordListError) as excinfo:
+        load_compiled('a1', output_path, json_path)
+    assert 'changed since it was compiled' in excinfo.value.problems[0]
+    with pytest.raises(WordListError):
+        load_compiled('a2', output_path)
+
+
+def test_unchanged_source_is_not_hashed(tmp_path, monkeypatch):
+    json_path = write_words(tmp_path / 'a1.json', [{'word': 'Haus', 'type': 'Nomen', 'category': 'Wohnen'}])
+    output_path, _, _ = compile_word_list('a1', json_path)
+
+    def fail(path):
+        raise AssertionError('an unchanged source must not be hashed')
+    monkeypatch.setattr(word_list_compiler, 'source_digest', fail)
+    assert len(load_compiled('a1', output_path, json_path)) == 1
@@ -0,0 +1,102 @@
+"""The vectorized word selection: cascade tiers and the per-user row cache."""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from word_index import WordIndex  # noqa: E402
+from word_scoring import ScoringEngine, SelectionState, UserRowCache, UserRows, WordFeatures  # noqa: E402
+
+WORDS = [
+    {'word': 'das Haus', 'type': 'Nomen', 'category': 'Wohnen'},
+    {'word': 'der Baum', 'type': 'Nomen', 'category': 'Natur'},
+    {'word': 'laufen', 'type': 'Verb', 'category': 'Bewegung'},
+    {'word': 'gehen', 'type': 'Verb', 'category': 'Bewegung'},
+    {'word': 'schnell', 'type': 'Adjektiv', 'category': 'Eigenschaften'},
+    {'word': 'rot', 'type': 'Adjektiv', 'category': 'Farben'},
+]
+NOW = datetime(2025, 10, 1, 12, 0)
+
+
+@pytest.fixture(scope='module')
+def features():
+    return WordFeatures(WordIndex.from_words('a1', WORDS))
+
+
+def state(due=(), seen=(), problem_type=None, problem_letters=()):
+    return SelectionState(frozenset(due), frozenset(seen), problem_type, tuple(problem_letters), 1.0)
+
+
+def select_words(features, selection_state, count=10, runs=20):
+    """Every (word, unseen_only) pair the cascade picks over a few seeded runs."""
+    picks = set()
+    for seed in range(runs):
+        engine = ScoringEngine('cascade', seed=seed)
+        selected = engine.select(features, selection_state, count=count)
+        assert len({entry.word for entry, _ in selected}) == len(selected)
+        picks.update((entry.word, unseen_only) for entry, unseen_only in selected)
+    return picks
+
+
+def test_due_reviews_come_first(features):
+    picks = select_words(features, state(due={'rot', 'Haus'}, seen={'rot', 'Haus'},
+                                         problem_type='Verb', problem_letters='s'))
+    assert picks == {('rot', False), ('Haus', False)}
+
+
+def test_problem_type_beats_problem_letters(features):
+    picks = select_words(features, state(seen={'laufen'}, problem_type='Verb', problem_letters='s'))
+    assert picks == {('gehen', True)}
+
+
+def test_problem_letters_beat_other_unseen_words(features):
+    picks = select_words(features, state(seen={'Haus'}, problem_letters='s'))
+    assert picks == {('schnell', True)}
+
+
+def test_unseen_words_beat_seen_ones(features):
+    picks = select_words(features, state(seen={'Haus', 'Baum', 'laufen', 'gehen'}, problem_type='Verb'))
+    assert picks == {('schnell', True), ('rot', True)}
+
+
+def test_anything_once_everything_was_played(features):
+    picks = select_words(features, state(seen=[word['word'].split()[-1] for word in WORDS]))
+    assert picks == {(word['word'].split()[-1], False) for word in WORDS}
+
+
+def test_row_masks_stand_in_for_the_word_sets(features):
+    rows = UserRows.build(features, features.mask({'laufen', 'schnell'}), {'rot': NOW, 'Baum': NOW + timedelta(days=1)})
+    selection_state = state(problem_type='Verb')._replace(seen_rows=rows.seen, due_rows=rows.due(features, NOW))
+    assert select_words(features, selection_state) == {('rot', False)}
+
+
+def test_recorded_games_match_a_fresh_load(features):
+    cache = UserRowCache()
+    reviews = {'Haus': NOW - timedelta(days=1), 'gehen': NOW + timedelta(days=2)}
+    cache.get(1, 7, 'a1', features, lambda: ({'Haus', 'gehen'}, reviews))
+    cache.record(1, 8, ['rot', 'laufen'], {'laufen': NOW})
+
+    def fail():
+        raise AssertionError('the recorded version must not be reloaded')
+    cached = cache.get(1, 8, 'a1', features, fail)
+    fresh = UserRows.build(features, features.mask({'Haus', 'gehen', 'rot', 'laufen'}), {**reviews, 'laufen': NOW})
+    assert (cached.seen == fresh.seen).all()
+    assert (cached.due(features, NOW) == fresh.due(features, NOW)).all()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_versions_are_reloaded(features):
+    cache = UserRowCache(max_users=1)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return {'Haus'}, {}
+    cache.get(1, 1, 'a1', features, load)
+    # A game committed elsewhere skipped version 2
+    cache.record(1, 3, ['rot'], {})
+    cache.get(1, 3, 'a1', features, load)
+    cache.get(2, 1, 'a1', features, load)
+    cache.get(1, 3, 'a1', features, load)
+    assert len(loads) == 4
@@ -0,0 +1,196 @@
+"""
+Precompiled, read-only word lists.
+
+A WordIndex is built once per level when the JSON word list is loaded and is never
+mutated afterwards, so it can be shared freely between request threads. Endpoints
+build their responses from fresh dicts (WordEntry.to_dict) instead of copying or
+updating cached entries.
+"""
+from types import MappingProxyType
+from typing import NamedTuple, FrozenSet, Optional
+
+
+def separate_article_from_noun(word_with_article):
+    """
+    Separates German articles from nouns and returns both the clean word and the article.
+    """
+    word_with_article = word_with_article.strip()
+
+    # Check for definite articles
+    if word_with_article.startswith('der '):
+        return word_with_article[4:], 'der'
+    elif word_with_article.startswith('die '):
+        return word_with_article[4:], 'die'
+    elif word_with_article.startswith('das '):
+        return word_with_article[4:], 'das'
+
+    # If no article found, return the word as is
+    return word_with_article, None
+
+
+def hint_base_counts(word_lower, level):
+    """
+    (letters to reveal, letters to exclude) of a word before the learner's difficulty
+    modifier is applied: fewer hints on higher levels and for words longer than ten letters.
+    """
+    word_length = len(word_lower)
+
+    # Define difficulty based on level and word length
+    if level in ['a1', 'a2']:
+        difficulty = 'easy'
+    elif level in ['b1']:
+        difficulty = 'medium'
+    else:
+        difficulty = 'hard'
+
+    # Adjust difficulty based on word length
+    if word_length > 10:
+        if difficulty == 'easy':
+            difficulty = 'medium'
+        elif difficulty == 'medium':
+            difficulty = 'hard'
+
+    # Determine base number of letters to reveal and exclude
+    if difficulty == 'easy':
+        return max(1, word_length // 4), min(8, 26 - len(set(word_lower)))
+    elif difficulty == 'medium':
+        return max(1, word_length // 5), min(6, 26 - len(set(word_lower)))
+    else:  # hard
+        return max(1, word_length // 6), min(4, 26 - len(set(word_lower)))
+
+
+class WordEntry(NamedTuple):
+    """One word of a level with everything the hot path needs precomputed."""
+    id: int
+    word: str
+    type: str
+    # Display category; nouns with an article get it appended, e.g. "Essen (der)"
+    category: str
+    article: Optional[str]
+    lower: str
+    letters: FrozenSet[str]
+    # Bitmask of the distinct letters, bit positions assigned per level (WordIndex.letter_bits)
+    mask: int
+    # hint_base_counts() for the word's level
+    hint_reveal: int = 1
+    hint_exclude: int = 0
+
+    def to_dict(self):
+        """Fresh response dict; callers may add hints to it without touching the index."""
+        return {'word': self.word, 'type': self.type, 'category': self.category}
+
+
+class WordIndex:
+    """Immutable index over the words of one level."""
+    __slots__ = ('level', 'entries', 'by_word', 'by_lower', 'by_type', 'letter_bits', 'by_letter')
+
+    def __init__(self, level, entries=(), letter_bits=None, type_ids=None, letter_ids=None):
+        """
+        type_ids and letter_ids (ascending entry ids per word type and per letter) can be
+        passed in when they are already known, e.g. from a compiled word list.
+        """
+        entries = tuple(entries)
+        if type_ids is None or letter_ids is None:
+            type_ids = {}
+            letter_ids = {}
+            for entry in entries:
+                type_ids.setdefault(entry.type, []).append(entry.id)
+                for letter in entry.letters:
+                    letter_ids.setdefault(letter, []).append(entry.id)
+        # First occurrence wins, like the previous linear search did
+        by_word = {entry.word: entry for entry in reversed(entries)}
+        by_lower = {entry.lower: entry for entry in reversed(entries)}
+        object.__setattr__(self, 'level', level)
+        object.__setattr__(self, 'entries', entries)
+        object.__setattr__(self, 'by_word', MappingProxyType(by_word))
+        object.__setattr__(self, 'by_lower', MappingProxyType(by_lower))
+        object.__setattr__(self, 'by_type', MappingProxyType(
+            {t: tuple(map(entries.__getitem__, ids)) for t, ids in type_ids.items()}))
+        object.__setattr__(self, 'letter_bits', MappingProxyType(dict(letter_bits or {})))
+        # Inverted index: letter -> ascending ids of the words containing it
+        object.__setattr__(self, 'by_letter', MappingProxyType(
+            {letter: tuple(ids) for letter, ids in letter_ids.items()}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('WordIndex is immutable')
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def get(self, word):
+        # The game client reports words lowercased, so fall back to a lowercase match
+        entry = self.by_word.get(word)
+        if entry is None and word:
+            entry = self.by_lower.get(word.lower())
+        return entry
+
+    def letter_mask(self, letters):
+        """Bitmask for a set of letters; letters that occur in no word of the level map to 0."""
+        mask = 0
+        for letter in letters:
+            mask |= self.letter_bits.get(letter, 0)
+        return mask
+
+    def with_any_letter(self, letters):
+        """
+        Entries containing at least one of the given letters, in word list order.
+        Uses the inverted index, so the cost depends on the matching words only.
+        """
+        postings = [self.by_letter[letter] for letter in set(letters) if letter in self.by_letter]
+        if not postings:
+            return []
+        if len(postings) == 1:
+            ids = postings[0]
+        else:
+            ids = sorted(set().union(*postings))
+        entries = self.entries
+        return [entries[i] for i in ids]
+
+    @classmethod
+    def from_words(cls, level, raw_words):
+        """Build an index from the raw word dicts of a word list file."""
+        entries = []
+        letter_bits = {}
+        for word_data in raw_words:
+            clean_word, article = separate_article_from_noun(word_data['word'])
+            category = word_data['category']
+            # If it's a noun with an article, include the article in the category display
+            if article and word_data['type'] == 'Nomen':
+                category = f"{category} ({article})"
+            lower = clean_word.lower()
+            letters = frozenset(lower)
+            hint_reveal, hint_exclude = hint_base_counts(lower, level)
+            mask = 0
+            # Sorted so bit positions only depend on the word list, not on hash seeds
+            for letter in sorted(letters):
+                bit = letter_bits.get(letter)
+                if bit is None:
+                    bit = letter_bits[letter] = 1 << len(letter_bits)
+                mask |= bit
+            entries.append(WordEntry(
+                id=len(entries),
+                word=clean_word,
+                type=word_data['type'],
+                category=category,
+                article=article,
+                lower=lower,
+                letters=letters,
+                mask=mask,
+                hint_reveal=hint_reveal,
+                hint_exclude=hint_exclude
+            ))
+        return cls(level, entries, letter_bits)
+
+def build_word_lookup(indexes):
+    """
+    Case-folded word -> (WordEntry, level) over several level indexes. Earlier indexes win
+    on duplicates, matching a search that walks the levels in order.
+    """
+    lookup = {}
+    for index in indexes:
+        for entry in index.entries:
+            lookup.setdefault(entry.word.casefold(), (entry, index.level))
+    return MappingProxyType(lookup)
@@ -0,0 +1,357 @@
+"""
+Compiled word lists.
+
+`flask --app app compile-word-lists` validates, deduplicates and normalizes the JSON
+word lists and writes <level>.bin next to each of them. get_word_index prefers the
+compiled file, so loading a level no longer runs json.load, article splitting, letter
+masks, hint counts and the inverted index word by word: the file is memory-mapped and
+every per-word field is a column that is read with a single array copy. The file
+records the size, mtime and SHA-1 of the JSON it was built from; the JSON is only hashed
+again when its size or mtime differ, and once its content changed the compiled file is
+ignored (with a warning) until it is compiled again. Without a compiled file the JSON is
+loaded through the same normalization (load_json_index).
+
+File layout: HEADER (magic, format version, level, source SHA-1, entry count, source
+size and mtime in ns), a table of (offset, size) pairs for SECTIONS, then the sections
+themselves:
+
+    tables           JSON: word types, categories (each stored once), letters in bit order
+    words            UTF-8 words, concatenated
+    word_offsets     character offsets into the decoded words, one more than entries
+    type_ids, category_ids, article_ids, hint_reveal, hint_exclude, masks
+                     one value per entry (see WordEntry)
+    type_offsets     per word type, offsets into type_postings
+    type_postings    ascending entry ids of each word type
+    letter_offsets   per letter, offsets into letter_postings
+    letter_postings  ascending entry ids of the words containing each letter
+
+Numbers are little-endian; a list whose values do not fit their column (e.g. more than
+65535 word types, or a word too long for the hint counts) is rejected with a
+WordListError. Normalization: Unicode NFC, surrounding and repeated whitespace removed.
+An entry whose word (ignoring case) and type repeat an earlier entry is dropped; the
+first one wins, as it does in WordIndex lookups.
+"""
+import gc
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+
+from word_index import WordEntry, WordIndex, separate_article_from_noun
+
+MAGIC = b'DZWL'
+FORMAT_VERSION = 2
+COMPILED_SUFFIX = '.bin'
+HEADER = struct.Struct('<4sHH8s20sIQq')
+SECTION = struct.Struct('<II')
+# Section name -> array typecode (None: raw bytes)
+SECTIONS = {
+    'tables': None,
+    'words': None,
+    'word_offsets': 'I',
+    'type_ids': 'H',
+    'category_ids': 'I',
+    'article_ids': 'B',
+    'hint_reveal': 'B',
+    'hint_exclude': 'b',
+    'masks': 'Q',
+    'type_offsets': 'I',
+    'type_postings': 'I',
+    'letter_offsets': 'I',
+    'letter_postings': 'I',
+}
+ENTRY_COLUMNS = ('type_ids', 'category_ids', 'article_ids', 'hint_reveal', 'hint_exclude', 'masks')
+ARTICLES = (None, 'der', 'die', 'das')
+REQUIRED_FIELDS = ('word', 'type', 'category')
+
+
+class WordListError(ValueError):
+    """A word list that cannot be compiled or loaded; problems lists every offending entry."""
+
+    def __init__(self, source, problems):
+        super().__init__(f"{source}: {len(problems)} problem(s)")
+        self.source = source
+        self.problems = problems
+
+
+def _normalize_text(value):
+    return ' '.join(unicodedata.normalize('NFC', value).split())
+
+
+def normalize_words(raw_words, source='word list', skip_invalid=False):
+    """
+    Validated and normalized word dicts plus the number of dropped duplicates.
+    Raises WordListError listing all invalid entries, unless skip_invalid drops them.
+    """
+    if not isinstance(raw_words, list):
+        raise WordListError(source, ['expected a list of words or {"words": [...]}'])
+    words = []
+    seen = set()
+    duplicates = 0
+    problems = []
+    for position, word_data in enumerate(raw_words, start=1):
+        if not isinstance(word_data, dict):
+            problems.append(f"entry {position}: expected an object")
+            continue
+        missing = [field for field in REQUIRED_FIELDS
+                   if not isinstance(word_data.get(field), str) or not word_data[field].strip()]
+        if missing:
+            problems.append(f"entry {position}: missing or empty {', '.join(missing)}")
+            continue
+        normalized = {field: _normalize_text(word_data[field]) for field in REQUIRED_FIELDS}
+        clean_word, _ = separate_article_from_noun(normalized['word'])
+        # lower(), not casefold(): "Maße" and "Masse" are different words
+        key = (clean_word.lower(), normalized['type'])
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        words.append(normalized)
+    if problems and not skip_invalid:
+        raise WordListError(source, problems)
+    return words, duplicates
+
+
+def source_digest(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def _parse_json_words(data):
+    words_data = json.loads(data.decode('utf-8'))
+    return words_data.get('words', []) if isinstance(words_data, dict) else words_data
+
+
+def read_json_words(file_path):
+    with open(file_path, 'rb') as f:
+        return _parse_json_words(f.read())
+
+
+def load_json_index(level, json_path):
+    """
+    WordIndex straight from a JSON word list, normalized and deduplicated like
+    compile_word_list() so both yield the same words. Entries the compiler would reject
+    are skipped instead of failing the whole level.
+    """
+    words, _ = normalize_words(read_json_words(json_path), source=json_path, skip_invalid=True)
+    return WordIndex.from_words(level, words)
+
+
+def _column_range(typecode):
+    bits = 8 * array(typecode).itemsize
+    if typecode.islower():
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+    return 0, (1 << bits) - 1
+
+
+def _column(typecode, values, source='word list', name=None, entries=None):
+    """
+    Little-endian bytes of a column. Raises WordListError if a value does not fit the
+    typecode, naming the offending words when the column has one value per entry.
+    """
+    try:
+        column = array(typecode, values)
+    except OverflowError:
+        low, high = _column_range(typecode)
+        if entries is None:
+            raise WordListError(source, [f"{name}: values outside {low}..{high}; the word list is too large"])
+        raise WordListError(source, [f"{entry.word!r}: {name} {value} outside {low}..{high}"
+                                     for entry, value in zip(entries, values) if not low <= value <= high])
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _postings(groups, source, name):
+    """(offsets, postings) columns of a list of ascending id lists."""
+    offsets = [0]
+    postings = []
+    for ids in groups:
+        postings.extend(ids)
+        offsets.append(len(postings))
+    return (_column(SECTIONS[f'{name}_offsets'], offsets, source, f'{name}_offsets'),
+            _column(SECTIONS[f'{name}_postings'], postings, source, f'{name}_postings'))
+
+
+def compile_index(index, digest=b'', source_size=0, source_mtime_ns=0):
+    """
+    Binary representation of a WordIndex. digest, source_size and source_mtime_ns identify
+    the source it was built from. Raises WordListError if the index does not fit the format.
+    """
+    entries = index.entries
+    letters = sorted(index.letter_bits, key=index.letter_bits.get)
+    if len(letters) > 64:
+        raise WordListError(index.level, [f"{len(letters)} distinct letters, at most 64 fit the letter mask"])
+    # Word list order, so by_type keeps the order of the JSON loader
+    types = list(index.by_type)
+    type_ids = {word_type: i for i, word_type in enumerate(types)}
+    category_ids = {}
+    for entry in entries:
+        category_ids.setdefault(entry.category, len(category_ids))
+
+    word_offsets = [0]
+    for entry in entries:
+        word_offsets.append(word_offsets[-1] + len(entry.word))
+    columns = {
+        'type_ids': [type_ids[entry.type] for entry in entries],
+        'category_ids': [category_ids[entry.category] for entry in entries],
+        'article_ids': [ARTICLES.index(entry.article) for entry in entries],
+        'hint_reveal': [entry.hint_reveal for entry in entries],
+        'hint_exclude': [entry.hint_exclude for entry in entries],
+        'masks': [entry.mask for entry in entries],
+    }
+    sections = {
+        'tables': json.dumps({'types': types, 'categories': list(category_ids), 'letters': letters},
+                             ensure_ascii=False).encode('utf-8'),
+        'words': ''.join(entry.word for entry in entries).encode('utf-8'),
+        'word_offsets': _column('I', word_offsets, index.level, 'word_offsets'),
+    }
+    problems = []
+    for name, values in columns.items():
+        try:
+            sections[name] = _column(SECTIONS[name], values, index.level, name, entries)
+        except WordListError as exc:
+            problems.extend(exc.problems)
+    if problems:
+        raise WordListError(index.level, problems)
+    sections['type_offsets'], sections['type_postings'] = _postings(
+        [[entry.id for entry in index.by_type[word_type]] for word_type in types], index.level, 'type')
+    sections['letter_offsets'], sections['letter_postings'] = _postings(
+        [index.by_letter.get(letter, ()) for letter in letters], index.level, 'letter')
+
+    offset = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    for name in SECTIONS:
+        table.append(SECTION.pack(offset, len(sections[name])))
+        offset += len(sections[name])
+    if offset > 0xFFFFFFFF:
+        raise WordListError(index.level, ['more than 4 GiB of sections; the word list is too large'])
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, index.level.encode('ascii'), digest, len(entries),
+                         source_size, source_mtime_ns)
+    return b''.join([header] + table + [sections[name] for name in SECTIONS])
+
+
+def compile_word_list(level, json_path, output_path=None):
+    """
+    Compile one JSON word list; returns (output path, word count, dropped duplicates).
+    The file is written next to the JSON unless output_path is given, atomically.
+    """
+    # Stat before reading: an edit in between leaves a newer mtime, which makes loading hash again
+    stat = os.stat(json_path)
+    with open(json_path, 'rb') as f:
+        source = f.read()
+    try:
+        raw_words = _parse_json_words(source)
+    except ValueError as exc:
+        raise WordListError(json_path, [f"invalid JSON: {exc}"])
+    words, duplicates = normalize_words(raw_words, source=json_path)
+    data = compile_index(WordIndex.from_words(level, words), hashlib.sha1(source).digest(),
+                         stat.st_size, stat.st_mtime_ns)
+    output_path = output_path or compiled_path(json_path)
+    tmp_path = f'{output_path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
+    return output_path, len(words), duplicates
+
+
+def compiled_path(json_path):
+    return os.path.splitext(json_path)[0] + COMPILED_SUFFIX
+
+
+def _read_sections(file_path, level, source_path):
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < HEADER.size + SECTION.size * len(SECTIONS):
+                raise WordListError(file_path, ['truncated file; recompile it'])
+            magic, version, _, stored_level, digest, count, source_size, source_mtime_ns = \
+                HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise WordListError(file_path, ['not a compiled word list of this version; recompile it'])
+            stored_level = stored_level.rstrip(b'\0').decode('ascii')
+            if stored_level != level:
+                raise WordListError(file_path, [f"compiled for level {stored_level}, not {level}"])
+            if source_path is not None and not _source_matches(source_path, digest, source_size, source_mtime_ns):
+                raise WordListError(file_path, [f"{os.path.basename(source_path)} changed since it was compiled"])
+            sections = {}
+            view = memoryview(mapped)
+            try:
+                for i, (name, typecode) in enumerate(SECTIONS.items()):
+                    offset, size = SECTION.unpack_from(mapped, HEADER.size + SECTION.size * i)
+                    if offset + size > len(mapped):
+                        raise WordListError(file_path, ['truncated file; recompile it'])
+                    if typecode is None:
+                        sections[name] = bytes(view[offset:offset + size])
+                    else:
+                        column = array(typecode)
+                        column.frombytes(view[offset:offset + size])
+                        if sys.byteorder != 'little':
+                            column.byteswap()
+                        sections[name] = column
+            finally:
+                view.release()
+    return count, sections
+
+
+def _source_matches(source_path, digest, size, mtime_ns):
+    """False if source_path exists with other content; hashed only if its size or mtime changed."""
+    try:
+        stat = os.stat(source_path)
+    except FileNotFoundError:
+        return True
+    if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+        return True
+    return stat.st_size == size and source_digest(source_path) == digest
+
+
+def load_compiled(level, file_path, source_path=None):
+    """
+    WordIndex from a compiled word list. Raises WordListError for foreign or truncated
+    files, and if source_path exists but is not the JSON the file was compiled from.
+    """
+    count, sections = _read_sections(file_path, level, source_path)
+    word_offsets = sections['word_offsets']
+    if len(word_offsets) != count + 1 or any(len(sections[name]) != count for name in ENTRY_COLUMNS):
+        raise WordListError(file_path, ['inconsistent columns; recompile it'])
+    tables = json.loads(sections['tables'])
+    types, categories, letters = tables['types'], tables['categories'], tables['letters']
+
+    # Column by column, so the per-word work happens in C. The new objects cannot form
+    # reference cycles, so the cyclic collector is paused instead of rescanning them
+    # again and again while the entry list grows.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        pool = sections['words'].decode('utf-8')
+        words = list(map(pool.__getitem__, map(slice, word_offsets[:-1], word_offsets[1:])))
+        lowers = list(map(str.lower, words))
+        entries = list(map(
+            WordEntry,
+            range(count),
+            words,
+            map(types.__getitem__, sections['type_ids']),
+            map(categories.__getitem__, sections['category_ids']),
+            map(ARTICLES.__getitem__, sections['article_ids']),
+            lowers,
+            map(frozenset, lowers),
+            sections['masks'],
+            sections['hint_reveal'],
+            sections['hint_exclude'],
+        ))
+        return WordIndex(
+            level, entries,
+            letter_bits={letter: 1 << bit for bit, letter in enumerate(letters)},
+            type_ids=_postings_by_name(types, sections['type_offsets'], sections['type_postings']),
+            letter_ids=_postings_by_name(letters, sections['letter_offsets'], sections['letter_postings'])
+        )
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _postings_by_name(names, offsets, ids):
+    return {name: ids[offsets[i]:offsets[i + 1]] for i, name in enumerate(names)}
@@ -0,0 +1,57 @@
+"""
+Per-user queue of prefetched words.
+
+Picking a word needs the user's seen words and a pass over the level's candidates. When
+that work is done anyway, a few more words are drawn from the same priority tier and
+kept here, so the following rounds only need to check that nothing relevant changed.
+Each queue carries the fingerprint of the selection inputs it was computed from (level,
+training mode, due reviews, problem word type and letters); a different fingerprint or
+an expired queue is discarded and recomputed by the caller.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class WordQueue:
+    def __init__(self, size=5, ttl=600.0, max_users=1024):
+        # size <= 0 disables prefetching
+        self.size = size
+        self.ttl = ttl
+        self.max_users = max_users
+        self.hits = 0
+        self.misses = 0
+        self._queues = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pop(self, user_id, fingerprint):
+        """Next queued item for the fingerprint, or None if there is none (or it is stale)."""
+        with self._lock:
+            item = self._queues.get(user_id)
+            if item is not None:
+                queued_fingerprint, items, expires = item
+                if queued_fingerprint != fingerprint or expires < time.monotonic() or not items:
+                    del self._queues[user_id]
+                else:
+                    self._queues.move_to_end(user_id)
+                    self.hits += 1
+                    return items.popleft()
+            self.misses += 1
+            return None
+
+    def put(self, user_id, fingerprint, items):
+        if self.size <= 0 or not items:
+            return
+        with self._lock:
+            self._queues[user_id] = (fingerprint, deque(items[:self.size]), time.monotonic() + self.ttl)
+            self._queues.move_to_end(user_id)
+            while len(self._queues) > self.max_users:
+                self._queues.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._queues.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._queues.clear()
@@ -0,0 +1,328 @@
+"""
+Vectorized word selection.
+
+A level is turned into a feature matrix once, one row per word: the letters it contains,
+its word type, its length and how often it was lost across all players. A selection then
+scores every word of the level in one pass against weights derived from the user's state
+and samples from the scores, instead of rebuilding candidate lists tier by tier.
+
+Presets:
+    cascade   the classic get_word rules: due reviews, then unseen words of the problem
+              word type, then (training mode) unseen words with problem letters, then
+              unseen words, then anything; uniform within the best non-empty tier
+    adaptive  the same signals as soft preferences, plus shorter and easier words while
+              the difficulty modifier says the learner is struggling (and longer, harder
+              ones when they are not); weighted sampling without replacement
+
+NumPy is optional; without it app.py keeps using the pure Python cascade.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, FrozenSet, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PRESETS = ('cascade', 'adaptive')
+
+# Adaptive preset: added to a word's score per matching feature
+ADAPTIVE_WEIGHTS = {
+    'due': 3.0,
+    'unseen': 2.0,
+    'problem_type': 1.5,
+    # per problem letter contained in the word
+    'problem_letter': 1.0,
+    # multiplied by the learner's strain (difficulty modifier - 1, clipped to [-0.5, 1])
+    'length': -1.5,
+    'difficulty': -3.0,
+}
+
+
+class SelectionState(NamedTuple):
+    """Per-user inputs of a selection."""
+    due_words: FrozenSet[str]
+    seen_words: FrozenSet[str]
+    # Only set when it is a clear problem field (more than three failures)
+    problem_type: Optional[str]
+    # Empty unless the training mode is on
+    problem_letters: Tuple[str, ...]
+    difficulty_modifier: float
+    # Row masks from UserRowCache; when set, they stand in for the word sets above
+    seen_rows: Optional[Any] = None
+    due_rows: Optional[Any] = None
+
+
+class WordFeatures:
+    """Feature matrix of one WordIndex: letter columns, type columns, length, difficulty."""
+
+    def __init__(self, index, difficulty=None):
+        """difficulty maps lowercase words to (games, losses) over all players."""
+        entries = index.entries
+        self.index = index
+        # Word as listed and lowercased -> row id (first occurrence, like WordIndex.get)
+        self.ids_by_word = {word: entry.id for word, entry in index.by_lower.items()}
+        for word, entry in index.by_word.items():
+            self.ids_by_word.setdefault(word, entry.id)
+        self.letter_columns = {letter: i for i, letter in enumerate(sorted(index.by_letter))}
+        offset = len(self.letter_columns)
+        self.type_columns = {word_type: offset + i for i, word_type in enumerate(sorted(index.by_type))}
+        self.length_column = offset + len(self.type_columns)
+        self.difficulty_column = self.length_column + 1
+
+        # Row ids per letter and per type, for building masks without touching the matrix
+        self.letter_ids = {letter: np.asarray(ids, dtype=np.intp) for letter, ids in index.by_letter.items()}
+        self.type_ids = {word_type: np.fromiter((entry.id for entry in typed_entries), dtype=np.intp)
+                         for word_type, typed_entries in index.by_type.items()}
+
+        # Column-major: scoring reads whole columns
+        matrix = np.zeros((len(entries), self.difficulty_column + 1), dtype=np.float32, order='F')
+        for letter, ids in self.letter_ids.items():
+            matrix[ids, self.letter_columns[letter]] = 1.0
+        for word_type, ids in self.type_ids.items():
+            matrix[ids, self.type_columns[word_type]] = 1.0
+        if entries:
+            lengths = np.fromiter((len(entry.lower) for entry in entries), dtype=np.float32, count=len(entries))
+            matrix[:, self.length_column] = lengths / lengths.max()
+            # Smoothed loss rate; words nobody has played yet sit at 0.5
+            difficulty = difficulty or {}
+            matrix[:, self.difficulty_column] = np.fromiter(
+                ((losses + 1) / (games + 2) for games, losses in
+                 (difficulty.get(entry.lower, (0, 0)) for entry in entries)),
+                dtype=np.float32, count=len(entries))
+        self.matrix = matrix
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def row_id(self, word):
+        """Row id of a word matched case-insensitively, or -1 if it is not in the level."""
+        i = self.ids_by_word.get(word, -1)
+        return i if i >= 0 else self.ids_by_word.get(word.lower(), -1)
+
+    def row_ids(self, words):
+        """Row ids of those of the given words that are in the level."""
+        lookup = self.ids_by_word
+        words = list(words)
+        ids = [lookup.get(word, -1) for word in words]
+        # Words are stored as listed or lowercased; only the rest (other levels, odd casing) pay for lower()
+        ids.extend([lookup.get(word.lower(), -1) for word, i in zip(words, ids) if i < 0])
+        ids = np.asarray(ids, dtype=np.intp)
+        return ids[ids >= 0]
+
+    def mask(self, words):
+        """Boolean row mask of the given words, matched case-insensitively."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.row_ids(words)] = True
+        return mask
+
+    def any_letter(self, letters):
+        mask = np.zeros(len(self), dtype=bool)
+        for letter in set(letters):
+            ids = self.letter_ids.get(letter)
+            if ids is not None:
+                mask[ids] = True
+        return mask
+
+    def of_type(self, word_type):
+        mask = np.zeros(len(self), dtype=bool)
+        ids = self.type_ids.get(word_type)
+        if ids is not None:
+            mask[ids] = True
+        return mask
+
+
+class UserRows:
+    """One user's seen words and review schedule as rows of one WordFeatures. Not mutated once built."""
+
+    def __init__(self, seen, review_ids, review_times):
+        self.seen = seen
+        self.review_ids = review_ids
+        self.review_times = review_times
+
+    @classmethod
+    def build(cls, features, seen, reviews):
+        """seen is a boolean row mask, reviews maps words to their next review (naive UTC)."""
+        pairs = [(features.row_id(word), next_review) for word, next_review in reviews.items()]
+        pairs = [(i, next_review) for i, next_review in pairs if i >= 0]
+        return cls(seen,
+                   np.fromiter((i for i, _ in pairs), dtype=np.intp, count=len(pairs)),
+                   np.array([next_review for _, next_review in pairs], dtype='datetime64[us]'))
+
+    def due(self, features, now):
+        """Boolean row mask of the words whose review is due at now."""
+        mask = np.zeros(len(features), dtype=bool)
+        mask[self.review_ids[self.review_times <= np.datetime64(now, 'us')]] = True
+        return mask
+
+
+class UserRowCache:
+    """
+    Seen words and review schedules of recently active users, with their UserRows per
+    level, so a selection neither reloads every SeenWord row nor rebuilds the masks each
+    round. An entry belongs to the profile stats_version it was read at: record() carries
+    it over to the version of newly committed games, any other version (a hint, a game
+    committed by another worker) makes get() load it again.
+    """
+
+    def __init__(self, max_users=1024):
+        # max_users <= 0 disables the cache
+        self.max_users = max_users
+        self.hits = 0
+        self.misses = 0
+        # user id -> (stats version, seen words, word -> next review, level -> (features, UserRows))
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version, level, features, load):
+        """
+        The user's UserRows over features. load() returns (seen words, word -> next review)
+        from the database and is only called when the cached entry is missing or stale.
+        """
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._users.move_to_end(user_id)
+                cached = entry[3].get(level)
+                if cached is not None and cached[0] is features:
+                    self.hits += 1
+                    return cached[1]
+            self.misses += 1
+        if entry is None or entry[0] != version:
+            seen_words, reviews = load()
+            entry = (version, frozenset(seen_words), dict(reviews), {})
+        rows = UserRows.build(features, features.mask(entry[1]), entry[2])
+        if self.max_users > 0:
+            with self._lock:
+                current = self._users.get(user_id)
+                if current is not None and current[0] == version:
+                    entry = current
+                entry[3][level] = (features, rows)
+                self._users[user_id] = entry
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        return rows
+
+    def record(self, user_id, version, words, reviews):
+        """
+        Games that took the user's profile from version - 1 to version were committed:
+        words were played and reviews (word -> next review) rescheduled. Updates the
+        user's rows in place of reloading them; an entry at another version is dropped.
+        """
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return
+            if entry[0] != version - 1:
+                del self._users[user_id]
+                return
+            _, seen_words, all_reviews, levels = entry
+            seen_words = seen_words.union(word for word in words if word)
+            all_reviews = {**all_reviews, **reviews}
+            updated = {}
+            for level, (features, rows) in levels.items():
+                seen = rows.seen.copy()
+                seen[features.row_ids(words)] = True
+                if reviews:
+                    updated[level] = (features, UserRows.build(features, seen, all_reviews))
+                else:
+                    updated[level] = (features, UserRows(seen, rows.review_ids, rows.review_times))
+            self._users[user_id] = (version, seen_words, all_reviews, updated)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+class ScoringEngine:
+    def __init__(self, preset='cascade', temperature=0.5, seed=None):
+        if np is None:
+            raise RuntimeError('The vectorized word selection needs numpy (pip install numpy).')
+        if preset not in PRESETS:
+            raise ValueError(f"preset must be one of {', '.join(PRESETS)}")
+        self.preset = preset
+        self.temperature = temperature
+        self.rng = np.random.default_rng(seed)
+
+    def select(self, features, state, count=1):
+        """
+        Up to count distinct (WordEntry, unseen_only) pairs, best first. unseen_only marks
+        words picked while unplayed, which a prefetch queue should drop once they are played.
+        """
+        if not len(features) or count <= 0:
+            return []
+        due = state.due_rows if state.due_rows is not None else features.mask(state.due_words)
+        unseen = ~(state.seen_rows if state.seen_rows is not None else features.mask(state.seen_words))
+        if self.preset == 'cascade':
+            ids = self._cascade(features, state, due, unseen, count)
+        else:
+            ids = self._adaptive(features, state, due, unseen, count)
+        entries = features.index.entries
+        return [(entries[i], bool(unseen[i] and not due[i])) for i in ids]
+
+    def _cascade(self, features, state, due, unseen, count):
+        # Later assignments win, so each word ends up in its highest tier
+        tier = unseen.astype(np.int8)
+        if state.problem_letters:
+            tier[unseen & features.any_letter(state.problem_letters)] = 2
+        if state.problem_type is not None:
+            tier[unseen & features.of_type(state.problem_type)] = 3
+        tier[due] = 4
+        candidates = np.flatnonzero(tier == tier.max())
+        return self.rng.choice(candidates, size=min(count, len(candidates)), replace=False).tolist()
+
+    def _adaptive(self, features, state, due, unseen, count):
+        weights = {}
+        for letter in set(state.problem_letters):
+            column = features.letter_columns.get(letter)
+            if column is not None:
+                weights[column] = ADAPTIVE_WEIGHTS['problem_letter']
+        column = features.type_columns.get(state.problem_type)
+        if column is not None:
+            weights[column] = ADAPTIVE_WEIGHTS['problem_type']
+        strain = min(1.0, max(-0.5, float(state.difficulty_modifier or 1.0) - 1.0))
+        weights[features.length_column] = ADAPTIVE_WEIGHTS['length'] * strain
+        weights[features.difficulty_column] = ADAPTIVE_WEIGHTS['difficulty'] * strain
+
+        # matrix @ weights, but only over the handful of columns with a weight
+        scores = unseen.astype(np.float32)
+        scores *= ADAPTIVE_WEIGHTS['unseen']
+        scores[due] += ADAPTIVE_WEIGHTS['due']
+        for column, weight in weights.items():
+            if weight:
+                scores += np.float32(weight) * features.matrix[:, column]
+        # Softmax weights exp((score - max) / T), computed in place
+        scores -= scores.max()
+        scores *= np.float32(1.0 / self.temperature)
+        return self._sample(np.exp(scores, out=scores), count)
+
+    def _sample(self, weights, count):
+        """
+        count distinct row ids drawn with probability proportional to weights, one after
+        the other. Draws with replacement from the CDF and skips repeats, which yields the
+        same distribution as sampling without replacement; a few binary searches instead
+        of random keys for every word.
+        """
+        cdf = np.cumsum(weights, dtype=np.float64)
+        count = min(count, len(cdf))
+        picks = []
+        for _ in range(4):
+            draws = np.searchsorted(cdf, self.rng.random(2 * count) * cdf[-1], side='right')
+            for i in np.minimum(draws, len(cdf) - 1).tolist():
+                if i not in picks:
+                    picks.append(i)
+                    if len(picks) == count:
+                        return picks
+        # Weight concentrated on very few words: fill up with the heaviest remaining ones
+        for i in np.argsort(-weights, kind='stable').tolist():
+            if i not in picks:
+                picks.append(i)
+                if len(picks) == count:
+                    break
+        return picks
@@ -8,8 +8,20 @@ export interface LoginResponse {
   token: string;
 }
 
+// Login and registration answer 429 with Retry-After while many passwords are being hashed;
+// wait as told (at most 10 s per attempt) and try again a few times before giving up.
+const fetchWithRetryAfter = async (url: string, init: RequestInit, attempts = 3): Promise<Response> => {
+  let response = await fetch(url, init);
+  for (let attempt = 1; attempt < attempts && response.status === 429; attempt++) {
+    const retryAfter = Number(response.headers.get('Retry-After')) || 1;
+    await new Promise(resolve => setTimeout(resolve, Math.min(retryAfter, 10) * 1000));
+    response = await fetch(url, init);
+  }
+  return response;
+};
+
 export const login = async (username: string, password: string): Promise<LoginResponse> => {
-  const response = await fetch(`${API_BASE_URL}/login`, {
+  const response = await fetchWithRetryAfter(`${API_BASE_URL}/login`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ username, password }),
@@ -25,7 +37,7 @@ export const login = async (username: string, password: string): Promise<LoginRe
 };
 
 export const register = async (username: string, password: string, age: string, motherTongue: string): Promise<{success: boolean, message?: string}> => {
-    const response = await fetch(`${API_BASE_URL}/register`, {
+    const response = await fetchWithRetryAfter(`${API_BASE_URL}/register`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json'
@@ -77,8 +89,22 @@ export const deleteStudent = async (username: string, token: string): Promise<{
     }
 };
 
-export const fetchStudentsData = async (token: string) => {
-    const response = await fetch(`${API_BASE_URL}/students_data`, {
+export interface StudentsQuery {
+    cursor?: string | null;
+    limit?: number;
+    sort?: 'username' | 'level' | 'last_played' | 'wins' | 'losses' | 'games';
+    order?: 'asc' | 'desc';
+    level?: string;
+}
+
+export const fetchStudentsData = async (token: string, query: StudentsQuery = {}) => {
+    const params = new URLSearchParams();
+    Object.entries(query).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            params.set(key, String(value));
+        }
+    });
+    const response = await fetch(`${API_BASE_URL}/students_data?${params.toString()}`, {
         headers: {
             'Authorization': `Bearer ${token}`
         }
@@ -90,3 +116,106 @@ export const fetchStudentsData = async (token: string) => {
     }
     return response.json();
 };
+
+export interface LetterConfusionSummary {
+    games: number;
+    wrong_guesses: number;
+    letters: { letter: string; errors: number; games: number; errors_per_game: number; game_share: number }[];
+}
+
+export interface LetterConfusionData {
+    class: LetterConfusionSummary;
+    by_level: Record<string, LetterConfusionSummary>;
+    by_mother_tongue: Record<string, LetterConfusionSummary>;
+    groups: (LetterConfusionSummary & { level: string; mother_tongue: string })[];
+}
+
+// Klassenweite Problembuchstaben nach Niveau und Muttersprache
+export const fetchLetterConfusion = async (
+    token: string,
+    query: { level?: string; mother_tongue?: string; limit?: number } = {}
+): Promise<LetterConfusionData> => {
+    const params = new URLSearchParams();
+    Object.entries(query).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            params.set(key, String(value));
+        }
+    });
+    const response = await fetch(`${API_BASE_URL}/letter_confusion?${params.toString()}`, {
+        headers: {
+            'Authorization': `Bearer ${token}`
+        }
+    });
+    if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.message || 'Buchstabenstatistik konnte nicht geladen werden');
+    }
+    return response.json();
+};
+
+export interface ClassProgressData {
+    students: number;
+    most_failed_words: { word: string; failures: number }[];
+    students_by_failed_words: { username: string; failed_words: number }[];
+    failed_word_types: Record<string, number>;
+}
+
+// Klassenweite Fehlerstatistik über alle Schüler (nicht nur die geladene Seite)
+export const fetchClassProgress = async (
+    token: string,
+    query: { level?: string; limit?: number } = {}
+): Promise<ClassProgressData> => {
+    const params = new URLSearchParams();
+    Object.entries(query).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            params.set(key, String(value));
+        }
+    });
+    const response = await fetch(`${API_BASE_URL}/class_progress?${params.toString()}`, {
+        headers: {
+            'Authorization': `Bearer ${token}`
+        }
+    });
+    if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.message || 'Klassenstatistik konnte nicht geladen werden');
+    }
+    return response.json();
+};
+
+export interface GameExportQuery {
+    format?: 'csv' | 'ndjson';
+    from?: string;
+    to?: string;
+    student?: string;
+    level?: string;
+}
+
+// Lädt den Spielverlauf als Datei herunter (der Server streamt die Zeilen)
+export const downloadGameExport = async (token: string, query: GameExportQuery = {}) => {
+    const params = new URLSearchParams();
+    Object.entries({ format: 'csv', ...query }).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            params.set(key, String(value));
+        }
+    });
+    const response = await fetch(`${API_BASE_URL}/export/games?${params.toString()}`, {
+        headers: {
+            'Authorization': `Bearer ${token}`
+        }
+    });
+    if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.message || 'Export fehlgeschlagen');
+    }
+    const disposition = response.headers.get('Content-Disposition') || '';
+    const filename = /filename="([^"]+)"/.exec(disposition)?.[1] || `spielverlauf.${params.get('format')}`;
+    const url = URL.createObjectURL(await response.blob());
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = filename;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    URL.revokeObjectURL(url);
+};
@@ -1,6 +1,6 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { User, Word } from '../types';
-import { getWord, logGame, getUserStatistics, consumeHintCredit } from '../gameApi'; // Korrigierte Imports
+import { getWord, nextRound, getUserStatistics, consumeHintCredit, queueEvent, flushEvents, newEventId, isRetryable, WordData, FinishedGame } from '../gameApi';
 import './Hangman.css';
 
 const MAX_WRONG_GUESSES = 6;
@@ -67,16 +67,20 @@ const Hangman: React.FC<HangmanProps> = ({ user, token, initialWord, onGameEnd,
     const [hintCredits, setHintCredits] = useState<number>(0);
     // Add state for progress
     const [progress, setProgress] = useState({ wins: 0, losses: 0 });
+    // Next word, delivered together with the result of the finished round
+    const pendingWordRef = useRef<WordData | null>(null);
 
     const wrongLetters = guessedLetters.filter(letter => !word.includes(letter));
     const isWordGuessed = word && word.split('').every(letter => guessedLetters.includes(letter));
 
     const fetchNewWord = useCallback(async () => {
-        setLoading(true);
+        const pendingWord = pendingWordRef.current;
+        pendingWordRef.current = null;
+        setLoading(!pendingWord);
         setError(null);
         try {
             if (!token) throw new Error("Kein Authentifizierungstoken gefunden.");
-            const data = await getWord(user.level || 'a1', useModel, token);
+            const data = pendingWord ?? await getWord(user.level || 'a1', useModel, token);
             setWord(data.word.toLowerCase());
             setWordType(data.type); // 'type' statt 'wordType'
             setCategory(data.category);
@@ -141,20 +145,45 @@ const Hangman: React.FC<HangmanProps> = ({ user, token, initialWord, onGameEnd,
 
     const handleGameEnd = useCallback(async (won: boolean) => {
         if (!token) return;
+        const game: FinishedGame = { id: newEventId(), word, wordType, wasSuccessful: won, wrongGuesses: wrongLetters.length, wrongLetters };
         try {
-            await logGame(word, wordType, won, wrongLetters.length, token, wrongLetters);
-            // Update progress after game ends
-            const stats = await getUserStatistics(token);
-            setProgress({ wins: stats.wins, losses: stats.losses });
+            // Log the game and get the updated progress plus the next word in one request
+            const { word: upcoming, statistics } = await nextRound(token, {
+                game,
+                level: user.level || 'a1',
+                useModel,
+                nextWord: !isPlacementTest,
+            });
+            pendingWordRef.current = upcoming;
+            setProgress({ wins: statistics.wins, losses: statistics.losses });
+            if (typeof statistics.hint_credits === 'number') {
+                setHintCredits(statistics.hint_credits);
+            }
+            // The guesses of the round (and games that could not be sent before) as one batch
+            flushEvents(token)
+                .then((result) => {
+                    if (result) {
+                        setProgress({ wins: result.statistics.wins, losses: result.statistics.losses });
+                        if (typeof result.statistics.hint_credits === 'number') {
+                            setHintCredits(result.statistics.hint_credits);
+                        }
+                    }
+                })
+                .catch((error) => console.error("Fehler beim Senden der Spielereignisse:", error));
         } catch (error) {
             console.error("Fehler beim Loggen des Spiels oder beim Aktualisieren der Statistiken:", error);
+            // Send the game with the next batch of events instead; its id keeps the server
+            // from counting it twice if this request was applied after all
+            if (isRetryable(error)) {
+                queueEvent({ type: 'game', ...game, id: game.id as string });
+            }
         }
         // Only call onGameEnd automatically if NOT in placement test mode
         // In placement test mode, the user must click the "Weiter" button
         if (onGameEnd && !isPlacementTest) {
             onGameEnd(won);
         }
-    }, [word, wordType, wrongLetters, token, onGameEnd, isPlacementTest]);
+    }, [word, wordType, wrongLetters, token, onGameEnd, isPlacementTest, user.level, useModel]);
 
 
     useEffect(() => {
@@ -175,7 +204,21 @@ const Hangman: React.FC<HangmanProps> = ({ user, token, initialWord, onGameEnd,
             return;
         }
         setGuessedLetters(prev => [...prev, letter]);
-    }, [gameStatus, guessedLetters, excludedLetters]);
+        queueEvent({ type: 'guess', id: newEventId(), word, letter, isCorrect: word.includes(letter) });
+    }, [gameStatus, guessedLetters, excludedLetters, word]);
+
+    // Send what is still queued when the page is closed or the game is left
+    useEffect(() => {
+        if (!token) return;
+        const flushOnExit = () => {
+            flushEvents(token, { keepalive: true }).catch(() => undefined);
+        };
+        window.addEventListener('pagehide', flushOnExit);
+        return () => {
+            window.removeEventListener('pagehide', flushOnExit);
+            flushOnExit();
+        };
+    }, [token]);
     
     useEffect(() => {
         const handleKeyDown = (event: KeyboardEvent) => {
@@ -240,7 +283,11 @@ const Hangman: React.FC<HangmanProps> = ({ user, token, initialWord, onGameEnd,
                             <input
                                 type="checkbox"
                                 checked={useModel}
-                                onChange={() => setUseModel(!useModel)}
+                                onChange={() => {
+                                    // The prefetched word was picked for the other mode
+                                    pendingWordRef.current = null;
+                                    setUseModel(!useModel);
+                                }}
                             />
                             <span className="toggle-track" aria-hidden="true">
                                 <span className="toggle-thumb"></span>
@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useMemo, useCallback } from 'react';
-import { fetchStudentsData, deleteStudent } from '../authApi';
+import { fetchStudentsData, deleteStudent, downloadGameExport, fetchLetterConfusion, fetchClassProgress, StudentsQuery, GameExportQuery, LetterConfusionData, ClassProgressData } from '../authApi';
 import './TeacherDashboard.css';
 import { User } from '../types';
 import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend, ArcElement } from 'chart.js';
@@ -7,10 +7,18 @@ import { Bar, Pie } from 'react-chartjs-2';
 
 ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend, ArcElement);
 
+const PAGE_SIZE = 50;
+
 interface StudentData {
     username: string;
+    level?: string | null;
     age: number;
     motherTongue: string;
+    games?: {
+        wins: number;
+        losses: number;
+        last_played: string | null;
+    };
     progress: {
         failed_words: number;
         problem_letters: string[];
@@ -19,6 +27,33 @@ interface StudentData {
     };
 }
 
+const wordTypePieData = (failedWordTypes: Record<string, number>) => ({
+    labels: Object.keys(failedWordTypes),
+    datasets: [
+        {
+            label: 'Häufigkeit',
+            data: Object.values(failedWordTypes),
+            backgroundColor: [
+                'rgba(255, 99, 132, 0.2)',
+                'rgba(54, 162, 235, 0.2)',
+                'rgba(255, 206, 86, 0.2)',
+                'rgba(75, 192, 192, 0.2)',
+                'rgba(153, 102, 255, 0.2)',
+                'rgba(255, 159, 64, 0.2)',
+            ],
+            borderColor: [
+                'rgba(255, 99, 132, 1)',
+                'rgba(54, 162, 235, 1)',
+                'rgba(255, 206, 86, 1)',
+                'rgba(75, 192, 192, 1)',
+                'rgba(153, 102, 255, 1)',
+                'rgba(255, 159, 64, 1)',
+            ],
+            borderWidth: 1,
+        },
+    ],
+});
+
 interface TeacherDashboardProps {
     user: User;
     token: string;
@@ -26,6 +61,13 @@ interface TeacherDashboardProps {
 
 const TeacherDashboard: React.FC<TeacherDashboardProps> = ({ user, token }) => {
     const [students, setStudents] = useState<StudentData[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [levelFilter, setLevelFilter] = useState('');
+    const [sortKey, setSortKey] = useState<NonNullable<StudentsQuery['sort']>>('username');
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [exporting, setExporting] = useState(false);
+    const [letterConfusion, setLetterConfusion] = useState<LetterConfusionData | null>(null);
+    const [classProgress, setClassProgress] = useState<ClassProgressData | null>(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [selectedStudentUsername, setSelectedStudentUsername] = useState<string | null>(null);
@@ -37,62 +79,45 @@ const TeacherDashboard: React.FC<TeacherDashboardProps> = ({ user, token }) => {
         return students.find((student) => student.username === selectedStudentUsername) ?? null;
     }, [students, selectedStudentUsername]);
 
+    // Charts of the selected student; the class-wide ones come from /api/v2/class_progress,
+    // because the loaded students are only the first page(s)
     const chartData = useMemo(() => {
-        const dataSource = selectedStudentUsername
-            ? students.filter((student) => student.username === selectedStudentUsername)
-            : students;
-
-        if (!dataSource.length) {
+        if (!selectedStudent) {
             return { barData: null, pieData: null };
         }
 
         const barData = {
-            labels: dataSource.map((student) => student.username),
+            labels: [selectedStudent.username],
             datasets: [
                 {
                     label: 'Anzahl falscher Wörter',
-                    data: dataSource.map((student) => student.progress.failed_words),
+                    data: [selectedStudent.progress.failed_words],
                     backgroundColor: 'rgba(255, 99, 132, 0.5)',
                 },
             ],
         };
 
-        const allProblemTypes: Record<string, number> = {};
-        dataSource.forEach((student) => {
-            Object.entries(student.progress.failed_word_types).forEach(([type, count]) => {
-                allProblemTypes[type] = (allProblemTypes[type] || 0) + count;
-            });
-        });
+        return { barData, pieData: wordTypePieData(selectedStudent.progress.failed_word_types || {}) };
+    }, [selectedStudent]);
 
-        const pieData = {
-            labels: Object.keys(allProblemTypes),
+    const classChartData = useMemo(() => {
+        if (!classProgress) {
+            return { barData: null, pieData: null };
+        }
+
+        const barData = classProgress.most_failed_words.length ? {
+            labels: classProgress.most_failed_words.map((item) => item.word),
             datasets: [
                 {
-                    label: 'Häufigkeit',
-                    data: Object.values(allProblemTypes),
-                    backgroundColor: [
-                        'rgba(255, 99, 132, 0.2)',
-                        'rgba(54, 162, 235, 0.2)',
-                        'rgba(255, 206, 86, 0.2)',
-                        'rgba(75, 192, 192, 0.2)',
-                        'rgba(153, 102, 255, 0.2)',
-                        'rgba(255, 159, 64, 0.2)',
-                    ],
-                    borderColor: [
-                        'rgba(255, 99, 132, 1)',
-                        'rgba(54, 162, 235, 1)',
-                        'rgba(255, 206, 86, 1)',
-                        'rgba(75, 192, 192, 1)',
-                        'rgba(153, 102, 255, 1)',
-                        'rgba(255, 159, 64, 1)',
-                    ],
-                    borderWidth: 1,
+                    label: 'Fehlversuche',
+                    data: classProgress.most_failed_words.map((item) => item.failures),
+                    backgroundColor: 'rgba(255, 99, 132, 0.5)',
                 },
             ],
-        };
+        } : null;
 
-        return { barData, pieData };
-    }, [students, selectedStudentUsername]);
+        return { barData, pieData: wordTypePieData(classProgress.failed_word_types) };
+    }, [classProgress]);
 
     const loadData = useCallback(async () => {
         if (!token) {
@@ -101,20 +126,61 @@ const TeacherDashboard: React.FC<TeacherDashboardProps> = ({ user, token }) => {
             return;
         }
         try {
-            const data = await fetchStudentsData(token);
-            setStudents(data);
+            const data = await fetchStudentsData(token, {
+                limit: PAGE_SIZE,
+                sort: sortKey,
+                order: sortKey === 'username' || sortKey === 'level' ? 'asc' : 'desc',
+                level: levelFilter,
+            });
+            setStudents(data.students);
+            setNextCursor(data.next_cursor);
             setError('');
         } catch (err: any) {
             setError(err.message || 'Daten konnten nicht geladen werden.');
         } finally {
             setLoading(false);
         }
-    }, [token]);
+    }, [token, sortKey, levelFilter]);
+
+    const loadMore = useCallback(async () => {
+        if (!token || !nextCursor) {
+            return;
+        }
+        setLoadingMore(true);
+        try {
+            const data = await fetchStudentsData(token, {
+                cursor: nextCursor,
+                limit: PAGE_SIZE,
+                sort: sortKey,
+                order: sortKey === 'username' || sortKey === 'level' ? 'asc' : 'desc',
+                level: levelFilter,
+            });
+            setStudents((prev) => [...prev, ...data.students]);
+            setNextCursor(data.next_cursor);
+        } catch (err: any) {
+            setError(err.message || 'Daten konnten nicht geladen werden.');
+        } finally {
+            setLoadingMore(false);
+        }
+    }, [token, nextCursor, sortKey, levelFilter]);
 
     useEffect(() => {
         loadData();
     }, [loadData]);
 
+    useEffect(() => {
+        if (!token) {
+            return;
+        }
+        // Optional panel: the student list stays usable if this request fails
+        fetchLetterConfusion(token, { level: levelFilter, limit: 5 })
+            .then(setLetterConfusion)
+            .catch(() => setLetterConfusion(null));
+        fetchClassProgress(token, { level: levelFilter, limit: 10 })
+            .then(setClassProgress)
+            .catch(() => setClassProgress(null));
+    }, [token, levelFilter]);
+
     useEffect(() => {
         if (selectedStudentUsername && !students.some((student) => student.username === selectedStudentUsername)) {
             setSelectedStudentUsername(null);
@@ -130,6 +196,20 @@ const TeacherDashboard: React.FC<TeacherDashboardProps> = ({ user, token }) => {
         setError('');
     };
 
+    const handleExport = async (query: GameExportQuery) => {
+        if (!token) {
+            return;
+        }
+        setExporting(true);
+        try {
+            await downloadGameExport(token, query);
+        } catch (err: any) {
+            setError(err.message || 'Export fehlgeschlagen.');
+        } finally {
+            setExporting(false);
+        }
+    };
+
     const handleBackToSelection = () => {
         setSelectedStudentUsername(null);
     };
@@ -198,6 +278,31 @@ const TeacherDashboard: React.FC<TeacherDashboardProps> = ({ user, token }) => {
             {!selectedStudent ? (
                 <>
                     <h2>Schüler auswählen</h2>
+                    <div className="student-filter-row">
+                        <label>
+                            Niveau:{' '}
+                            <select value={levelFilter} onChange={(event) => setLevelFilter(event.target.value)}>
+                                <option value="">Alle</option>
+                                {['a1', 'a2', 'b1', 'b2', 'c1'].map((level) => (
+                                    <option key={level} value={level}>{level.toUpperCase()}</option>
+                                ))}
+                            </select>
+                        </label>
+                        <label>
+                            Sortierung:{' '}
+                            <select value={sortKey} onChange={(event) => setSortKey(event.target.value as NonNullable<StudentsQuery['sort']>)}>
+                                <option value="username">Name</option>
+                                <option value="level">Niveau</option>
+                                <option value="last_played">Zuletzt gespielt</option>
+                                <option value="games">Anzahl Spiele</option>
+                                <option value="wins">Siege</option>
+                                <option value="losses">Niederlagen</option>
+                            </select>
+                        </label>
+                        <button className="back-button" onClick={() => handleExport({ level: levelFilter })} disabled={exporting}>
+                            {exporting ? 'Exportiere...' : 'Spielverlauf exportieren (CSV)'}
+                        </button>
+                    </div>
                     {students.length ? (
                         <>
                             <p className="selector-intro">Bitte wählen Sie den Schüler, den Sie sich ansehen möchten, um die größten Lernfortschritte zu vergleichen.</p>
@@ -220,13 +325,69 @@ const TeacherDashboard: React.FC<TeacherDashboardProps> = ({ user, token }) => {
                                         <p><strong>Alter:</strong> {student.age ?? 'k.A.'}</p>
                                         <p><strong>Muttersprache:</strong> {student.motherTongue ?? 'k.A.'}</p>
                                         <p><strong>Letzte Schwierigkeit:</strong> {student.progress.difficulty_modifier.toFixed(1)}</p>
+                                        {student.games && (
+                                            <p><strong>Spiele:</strong> {student.games.wins} Siege / {student.games.losses} Niederlagen</p>
+                                        )}
                                     </div>
                                 ))}
                             </div>
+                            {nextCursor && (
+                                <div className="load-more-row">
+                                    <button className="back-button" onClick={loadMore} disabled={loadingMore}>
+                                        {loadingMore ? 'Lade...' : 'Weitere Schüler laden'}
+                                    </button>
+                                </div>
+                            )}
                         </>
                     ) : (
                         <p className="selector-intro">Es sind derzeit keine Schüler verknüpft.</p>
                     )}
+                    {classProgress && (classChartData.barData || (classChartData.pieData && classChartData.pieData.labels.length > 0)) && (
+                        <>
+                            <h3>Klassenübersicht ({classProgress.students} Schüler{levelFilter ? `, Niveau ${levelFilter.toUpperCase()}` : ''})</h3>
+                            <div className="charts-container">
+                                {classChartData.barData && (
+                                    <div className="chart-wrapper">
+                                        <h3>Häufigste Fehlerwörter</h3>
+                                        <Bar data={classChartData.barData} />
+                                    </div>
+                                )}
+                                {classChartData.pieData && classChartData.pieData.labels.length > 0 && (
+                                    <div className="chart-wrapper">
+                                        <h3>Größte Problem-Wortarten</h3>
+                                        <Pie data={classChartData.pieData} />
+                                    </div>
+                                )}
+                            </div>
+                        </>
+                    )}
+                    {letterConfusion && Object.keys(letterConfusion.by_mother_tongue).length > 0 && (
+                        <>
+                            <h3>Problembuchstaben der Klasse nach Muttersprache</h3>
+                            <table className="students-table">
+                                <thead>
+                                    <tr>
+                                        <th>Muttersprache</th>
+                                        <th>Spiele</th>
+                                        <th>Häufigste Fehlbuchstaben (Fehler pro Spiel)</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    {Object.entries(letterConfusion.by_mother_tongue).map(([motherTongue, summary]) => (
+                                        <tr key={motherTongue}>
+                                            <td>{motherTongue || 'k.A.'}</td>
+                                            <td>{summary.games}</td>
+                                            <td>
+                                                {summary.letters
+                                                    .map((item) => `${item.letter} (${item.errors_per_game.toFixed(2)})`)
+                                                    .join(', ') || 'Keine'}
+                                            </td>
+                                        </tr>
+                                    ))}
+                                </tbody>
+                            </table>
+                        </>
+                    )}
                 </>
             ) : (
                 <>
@@ -239,6 +400,9 @@ const TeacherDashboard: React.FC<TeacherDashboardProps> = ({ user, token }) => {
                             <span>Ausgewählter Schüler:</span>
                             <span className="pill-name">{selectedStudent.username}</span>
                         </div>
+                        <button className="back-button" onClick={() => handleExport({ student: selectedStudent.username })} disabled={exporting}>
+                            {exporting ? 'Exportiere...' : 'Spielverlauf exportieren (CSV)'}
+                        </button>
                     </div>
 
                     <div className="charts-container">
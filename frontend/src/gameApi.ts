@@ -1,11 +1,28 @@
 const API_BASE_URL = '/api'; // Relative URL verwenden
 const API_BASE_URL_V2 = '/api/v2';
 
+// Fehlerantwort des Servers; retryAfter in Sekunden aus dem Retry-After-Header
+export class ApiError extends Error {
+    status: number;
+    retryAfter: number | null;
+
+    constructor(message: string, status: number, retryAfter: number | null) {
+        super(message);
+        this.status = status;
+        this.retryAfter = retryAfter;
+    }
+}
+
 async function handleResponse<T>(response: Response): Promise<T> {
     if (!response.ok) {
         const errorText = await response.text();
         console.error("API Error Response:", errorText);
-        throw new Error(`API-Fehler: ${response.status} ${response.statusText}. Server-Antwort: ${errorText}`);
+        const retryAfter = Number(response.headers.get('Retry-After'));
+        throw new ApiError(
+            `API-Fehler: ${response.status} ${response.statusText}. Server-Antwort: ${errorText}`,
+            response.status,
+            Number.isFinite(retryAfter) && retryAfter > 0 ? retryAfter : null
+        );
     }
     // Sicherstellen, dass die Antwort auch wirklich JSON enthält, bevor wir parsen
     const contentType = response.headers.get("content-type");
@@ -19,7 +36,26 @@ async function handleResponse<T>(response: Response): Promise<T> {
     }
 }
 
-export const getWord = async (level: string, useModel: boolean, token: string): Promise<{ word: string, type: string, category: string, pre_revealed_letters?: string[], excluded_letters?: string[] }> => {
+export interface WordData {
+    word: string;
+    type: string;
+    category: string;
+    pre_revealed_letters?: string[];
+    excluded_letters?: string[];
+}
+
+export interface UserStatistics {
+    wins: number;
+    losses: number;
+    total_games: number;
+    win_rate: number;
+    seen_words: number;
+    failed_words: number;
+    problem_letters: string[];
+    hint_credits?: number;
+}
+
+export const getWord = async (level: string, useModel: boolean, token: string): Promise<WordData> => {
     const response = await fetch(`${API_BASE_URL}/word?level=${level}&use_model=${useModel}`, {
         headers: {
             'Authorization': `Bearer ${token}`
@@ -47,6 +83,117 @@ export const logGame = async (
     return handleResponse(response);
 };
 
+export interface FinishedGame {
+    // Vom Client erzeugt; der Server übernimmt jede id nur einmal
+    id?: string;
+    word: string;
+    wordType: string;
+    wasSuccessful: boolean;
+    wrongGuesses: number;
+    wrongLetters?: string[];
+}
+
+// Spiel speichern und das nächste Wort samt Statistik in einer Anfrage holen
+export const nextRound = async (
+    token: string,
+    options: { game?: FinishedGame; level?: string; useModel?: boolean; nextWord?: boolean }
+): Promise<{ word: WordData | null, statistics: UserStatistics }> => {
+    const response = await fetch(`${API_BASE_URL_V2}/next_round`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${token}`
+        },
+        body: JSON.stringify({
+            game: options.game,
+            level: options.level,
+            use_model: options.useModel ?? false,
+            next_word: options.nextWord ?? true
+        }),
+    });
+    return handleResponse(response);
+};
+
+export type GameEvent =
+    | { type: 'guess'; id: string; word: string; letter: string; isCorrect: boolean }
+    | ({ type: 'game'; id: string } & FinishedGame);
+
+export const newEventId = (): string => {
+    if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`;
+};
+
+// Lohnt ein erneuter Versuch? Netzwerkfehler, Zeitüberschreitung, Überlastung (429) und
+// Serverfehler (5xx); dank der Ereignis-ids zählt der Server nichts doppelt.
+export const isRetryable = (error: unknown): boolean => {
+    if (error instanceof ApiError) {
+        return error.status === 429 || error.status >= 500;
+    }
+    return error instanceof TypeError || (error instanceof DOMException && error.name === 'AbortError');
+};
+
+// Höchstens so viele Ereignisse pro Anfrage (der Server nimmt bis zu 500 an)
+const EVENTS_PER_REQUEST = 200;
+// Ältere Rate-Ereignisse werden verworfen, wenn der Server lange nicht erreichbar ist
+const MAX_PENDING_EVENTS = 1000;
+const EVENTS_TIMEOUT_MS = 15000;
+// Ohne Retry-After wird nach einem Fehlschlag so lange gewartet
+const DEFAULT_RETRY_DELAY_SECONDS = 5;
+const pendingEvents: GameEvent[] = [];
+// Vor diesem Zeitpunkt (ms) wird nicht erneut gesendet
+let retryNotBefore = 0;
+
+// Ereignis für den nächsten Sammelversand an /api/v2/events vormerken
+export const queueEvent = (event: GameEvent) => {
+    pendingEvents.push(event);
+    if (pendingEvents.length > MAX_PENDING_EVENTS) {
+        const dropIndex = pendingEvents.findIndex((pending) => pending.type === 'guess');
+        pendingEvents.splice(dropIndex === -1 ? 0 : dropIndex, 1);
+    }
+};
+
+// Vorgemerkte Ereignisse in einer Anfrage senden. Schlägt sie so fehl, dass sich ein neuer
+// Versuch lohnt (isRetryable), bleiben sie vorgemerkt und werden frühestens nach
+// Retry-After erneut gesendet; abgelehnte Stapel werden verworfen. keepalive lässt die
+// Anfrage auch beim Schließen der Seite zu Ende laufen.
+export const flushEvents = async (
+    token: string,
+    options: { keepalive?: boolean } = {}
+): Promise<{ accepted: number; duplicate_games: number; statistics: UserStatistics } | null> => {
+    if (!pendingEvents.length || (!options.keepalive && Date.now() < retryNotBefore)) {
+        return null;
+    }
+    const events = pendingEvents.splice(0, EVENTS_PER_REQUEST);
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), EVENTS_TIMEOUT_MS);
+    try {
+        const response = await fetch(`${API_BASE_URL_V2}/events`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${token}`
+            },
+            body: JSON.stringify({ events }),
+            keepalive: options.keepalive,
+            signal: controller.signal,
+        });
+        const result = await handleResponse<{ accepted: number; duplicate_games: number; statistics: UserStatistics }>(response);
+        retryNotBefore = 0;
+        return result;
+    } catch (error) {
+        if (isRetryable(error)) {
+            pendingEvents.unshift(...events);
+            const delay = error instanceof ApiError && error.retryAfter ? error.retryAfter : DEFAULT_RETRY_DELAY_SECONDS;
+            retryNotBefore = Date.now() + delay * 1000;
+        }
+        throw error;
+    } finally {
+        clearTimeout(timeout);
+    }
+};
+
 export const getFeedback = async (token: string): Promise<{ feedback: string | null }> => {
     const response = await fetch(`${API_BASE_URL}/feedback`, {
         headers: {
@@ -93,7 +240,7 @@ export const getHintForWord = async (word: string): Promise<{ hint: string }> =>
     return handleResponse(response);
 };
 
-export const getUserStatistics = async (token: string): Promise<{ wins: number, losses: number, total_games: number, win_rate: number, seen_words: number, failed_words: number, problem_letters: string[] }> => {
+export const getUserStatistics = async (token: string): Promise<UserStatistics> => {
     const response = await fetch(`${API_BASE_URL}/user/statistics`, {
         headers: {
             'Authorization': `Bearer ${token}`